@@ -0,0 +1,270 @@
+"""
+HTTP and WebSocket entry point for the interview engine.
+
+One process serves many sessions from a single event loop; each step's
+blocking work runs in worker threads (see utils/engine.py). Sessions are
+kept in memory up to API_MAX_LIVE_SESSIONS and persisted through
+utils.session_store, so they survive a restart and can be resumed here
+or in the Streamlit app (?session=<id>).
+
+    uvicorn api:app --port 8000
+
+    POST /sessions                   {"role", "experience", "difficulty"} -> first question
+    GET  /sessions/{id}              current stage and question
+    POST /sessions/{id}/answer       raw audio body (WAV) -> transcript and next question
+    POST /sessions/{id}/feedback     final feedback
+    WS   /sessions/{id}/ws           answers in, JSON events out (see below)
+
+Over the WebSocket an answer is either one binary message holding the
+whole recording, or streamed while it is recorded:
+{"type": "audio_start", "sample_rate": 48000, "channels": 1}, then binary
+PCM16 frames, then {"type": "audio_end"}. Streamed answers are transcribed
+segment by segment (utils/streaming_stt.py) and captioned with "partial"
+events, so the decision call starts as soon as the candidate stops.
+Every answer gets a "turn" event; the end of the interview streams
+"feedback_field" events and then "feedback".
+
+Audio is returned as [{"audio": <base64>, "format": "wav"|"mp3"}].
+Requires fastapi (and uvicorn to serve it).
+"""
+import asyncio
+import base64
+import json
+import os
+from collections import OrderedDict
+
+try:
+    from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+    from pydantic import BaseModel
+except Exception:
+    FastAPI = None
+
+from utils import token_usage
+from utils.engine import InterviewEngine, new_session, current_question
+from utils.session_store import get_store, snapshot_session, restore_session, offload_session, is_finished
+from utils.streaming_stt import StreamingTranscriber
+from utils.voice import TranscriptionError
+
+MAX_LIVE_SESSIONS = int(os.getenv("API_MAX_LIVE_SESSIONS", "1000"))
+
+
+def encode_audio(parts) -> list:
+    return [{"audio": base64.b64encode(audio).decode("ascii"), "format": fmt} for audio, fmt in parts or []]
+
+
+def session_view(state) -> dict:
+    return {
+        "session_id": state["session_id"],
+        "role": state["role"],
+        "stage": state["stage"],
+        "question": current_question(state),
+        "answers": len(state["history"]),
+        "feedback": state["feedback_data"],
+    }
+
+
+class LiveSessions:
+    """
+    Sessions in memory, least recently used first out, backed by the
+    session store. Each session has an asyncio.Lock so its steps run one
+    at a time while different sessions proceed concurrently.
+    """
+
+    def __init__(self, max_sessions=MAX_LIVE_SESSIONS, store=None):
+        self.max_sessions = max_sessions
+        self.store = store or get_store()
+        self.sessions = OrderedDict()
+        self.locks = {}
+
+    def create(self, role, experience, difficulty) -> dict:
+        state = new_session(role, experience, difficulty)
+        self._add(state)
+        return state
+
+    def get(self, session_id):
+        """The live session, loaded from the store if needed; None if unknown."""
+        state = self.sessions.get(session_id)
+        if state is not None:
+            self.sessions.move_to_end(session_id)
+            return state
+        snapshot = self.store.load(session_id)
+        if snapshot is None:
+            return None
+        state = new_session(snapshot.get("role"), session_id=session_id)
+        restore_session(state, snapshot)
+        if is_finished(snapshot):
+            offload_session(state)
+        self._add(state)
+        return state
+
+    def lock(self, session_id) -> asyncio.Lock:
+        return self.locks.setdefault(session_id, asyncio.Lock())
+
+    def save(self, state):
+        if not state.get("offloaded"):
+            self.store.save(state["session_id"], snapshot_session(state))
+
+    def _add(self, state):
+        self.sessions[state["session_id"]] = state
+        while len(self.sessions) > self.max_sessions:
+            old_id, old = self.sessions.popitem(last=False)
+            lock = self.locks.get(old_id)
+            if lock is not None and lock.locked():
+                # Mid-step; keep it and evict it next time.
+                self.sessions[old_id] = old
+                break
+            self.save(old)
+            self.locks.pop(old_id, None)
+
+
+def create_app(engine=None, sessions=None):
+    if FastAPI is None:
+        raise RuntimeError("api.py needs fastapi: pip install fastapi uvicorn")
+
+    engine = engine or InterviewEngine()
+    sessions = sessions or LiveSessions()
+    app = FastAPI(title="Interview Practice Partner")
+
+    class NewSession(BaseModel):
+        role: str
+        experience: str = "1-2 years"
+        difficulty: str = "Medium"
+
+    def live(session_id):
+        state = sessions.get(session_id)
+        if state is None:
+            raise HTTPException(404, f"unknown session {session_id}")
+        token_usage.set_session(session_id)
+        return state
+
+    async def answer(state, audio_bytes=None, transcriber=None):
+        if transcriber is not None:
+            result = await engine.answer_stream(state, transcriber)
+        else:
+            result = await engine.answer(state, audio_bytes)
+        sessions.save(state)
+        return dict(result, audio=encode_audio(result["audio"]), warnings=state.pop("warnings", []))
+
+    async def feedback(state, on_field=None):
+        data = await engine.feedback(state, on_field=on_field)
+        sessions.save(state)
+        return data
+
+    @app.post("/sessions")
+    async def create_session(body: NewSession):
+        if body.role not in engine.roles:
+            raise HTTPException(404, f"unknown role {body.role}")
+        state = sessions.create(body.role, body.experience, body.difficulty)
+        token_usage.set_session(state["session_id"])
+        async with sessions.lock(state["session_id"]):
+            result = await engine.start(state)
+            sessions.save(state)
+        return dict(session_view(state), audio=encode_audio(result["audio"]))
+
+    @app.get("/sessions/{session_id}")
+    async def get_session(session_id: str):
+        return session_view(live(session_id))
+
+    @app.post("/sessions/{session_id}/answer")
+    async def post_answer(session_id: str, request: Request):
+        state = live(session_id)
+        audio_bytes = await request.body()
+        if not audio_bytes:
+            raise HTTPException(400, "empty audio body")
+        async with sessions.lock(session_id):
+            if state["stage"] not in ("warmup", "interview"):
+                raise HTTPException(409, f"no answer expected in the {state['stage']} stage")
+            try:
+                return await answer(state, audio_bytes)
+            except TranscriptionError as e:
+                raise HTTPException(422, f"could not transcribe the answer: {e}")
+
+    @app.post("/sessions/{session_id}/feedback")
+    async def post_feedback(session_id: str):
+        state = live(session_id)
+        async with sessions.lock(session_id):
+            if state["stage"] != "feedback" and state["feedback_data"] is None:
+                # Ending early is allowed; feedback covers the answers so far.
+                state["stage"] = "feedback"
+            return await feedback(state)
+
+    @app.websocket("/sessions/{session_id}/ws")
+    async def session_socket(websocket: WebSocket, session_id: str):
+        state = sessions.get(session_id)
+        if state is None:
+            await websocket.close(code=4404)
+            return
+        token_usage.set_session(session_id)
+        await websocket.accept()
+        try:
+            async with sessions.lock(session_id):
+                result = await engine.start(state)
+            await websocket.send_json(
+                {"type": "question", "stage": state["stage"], "question": result["question"],
+                 "audio": encode_audio(result["audio"])}
+            )
+            transcriber, captioned = None, ""
+            while state["stage"] in ("warmup", "interview"):
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    raise WebSocketDisconnect(message.get("code", 1000))
+                if message.get("text") is not None:
+                    try:
+                        command = json.loads(message["text"])
+                    except ValueError:
+                        command = {}
+                    kind = command.get("type") if isinstance(command, dict) else None
+                    if kind == "audio_start":
+                        transcriber, captioned = StreamingTranscriber(
+                            command.get("sample_rate", 48000), command.get("channels", 1)
+                        ), ""
+                        continue
+                    if kind != "audio_end" or transcriber is None:
+                        await websocket.send_json({"type": "error", "error": f"unexpected message {message['text'][:100]!r}"})
+                        continue
+                    streamed, transcriber = transcriber, None
+                    step = answer(state, transcriber=streamed)
+                elif transcriber is not None:
+                    # A frame of the answer being recorded; caption what is transcribed so far.
+                    # Downmix, resample and VAD are numpy work, kept off the loop.
+                    await asyncio.to_thread(transcriber.feed, message["bytes"])
+                    text = transcriber.ready_text()
+                    if text != captioned:
+                        captioned = text
+                        await websocket.send_json({"type": "partial", "transcript": text})
+                    continue
+                else:
+                    step = answer(state, message["bytes"])
+                async with sessions.lock(session_id):
+                    try:
+                        turn = await step
+                    except TranscriptionError as e:
+                        await websocket.send_json({"type": "error", "error": f"could not transcribe the answer: {e}"})
+                        continue
+                await websocket.send_json(dict(turn, type="turn"))
+
+            # Stream feedback sections as they complete.
+            events = asyncio.Queue()
+
+            def on_field(path, value):
+                events.put_nowait({"type": "feedback_field", "path": list(path), "value": value})
+
+            async def send_events():
+                while (event := await events.get()) is not None:
+                    await websocket.send_json(event)
+
+            sender = asyncio.ensure_future(send_events())
+            async with sessions.lock(session_id):
+                data = await feedback(state, on_field=on_field)
+            events.put_nowait(None)
+            await sender
+            await websocket.send_json({"type": "feedback", "feedback": data})
+            await websocket.close()
+        except WebSocketDisconnect:
+            # The session is saved after every step; the client can reconnect.
+            pass
+
+    return app
+
+
+app = create_app() if FastAPI is not None else None
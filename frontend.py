@@ -1,22 +1,36 @@
 import streamlit as st
-import json
-import tempfile
-import os
+import asyncio
 import base64
+import os
+import queue
+import time
+import uuid
 from pathlib import Path
 from typing import Optional
 
-from utils.voice import transcribe_audio_bytes, synthesize_speech_bytes
-from utils.llm_client import call_agent_llm
-from utils.json_prompts import (
-    WARMUP_PROMPT,
-    WARMUP_CONTINUE_PROMPT,
-    INTERVIEW_DECISION_PROMPT,
-    FINAL_FEEDBACK_PROMPT,
-)
+from utils.voice import synthesize_speech_chunks, concat_audio, TranscriptionError
+from utils.memo import MemoCache, content_hash
+from utils.json_extract import parse_stats
+from utils.history import InterviewHistory
+from utils.role_registry import get_registry, RoleRegistryError, EXPERIENCE_LEVELS
+from utils.answer_scoring import AnswerScorer
+from utils.answer_classifier import fast_path_stats
+from utils.engine import InterviewEngine, current_question, feedback_speech_text
+from utils.streaming_stt import StreamingTranscriber
+from utils.session_store import get_store, snapshot_session, restore_session, offload_session
+from utils.groq_scheduler import scheduler_stats
+from utils.lazy_import import preload, optional_module
+from utils import token_usage, metrics
+
+# Pulls in aiortc and av; imported when the first answer is recorded.
+streamlit_webrtc = optional_module("streamlit_webrtc")
 
 ASSIGNMENT_PDF_PATH = "/mnt/data/AI Agent Building Assignment - Eightfold.pdf"
-MIN_INTERVIEW_QUESTIONS = 3
+FEEDBACK_SECTIONS = ["scores", "strengths", "improvements", "sample_answer", "summary"]
+# Stream the microphone and transcribe while the candidate speaks (needs streamlit-webrtc).
+STREAMING_CAPTURE = bool(streamlit_webrtc) and os.getenv("STREAMING_CAPTURE", "1") != "0"
+
+RUN_STARTED = time.perf_counter()
 
 st.set_page_config(page_title="Interview Practice Partner", layout="centered")
 st.title("Interview Practice Partner")
@@ -24,14 +38,20 @@ st.title("Interview Practice Partner")
 def ensure_session_keys():
     defaults = {
         "stage": "warmup",            
-        "history": [],                
+        "history": InterviewHistory(),
         "warmup_turn": 0,
         "warmup_question": None,
         "q_index": 0,
+        "asked_questions": [],
         "current_question": None,
         "debug": None,
         "feedback_data": None,
+        "scorer": AnswerScorer(),
         "followup_count": 0,          
+        "memo": MemoCache(max_entries=64),
+        "last_turn": None,
+        "last_answer": None,
+        "session_id": uuid.uuid4().hex,
     }
     for k, v in defaults.items():
         if k not in st.session_state:
@@ -40,34 +60,92 @@ def ensure_session_keys():
 ensure_session_keys()
 
 
+def resume_session():
+    """Restore the session named by ?session=<id>, then point the URL at this session."""
+    requested = st.query_params.get("session")
+    if requested and requested != st.session_state.session_id:
+        snapshot = get_store().load(requested)
+        if snapshot is not None:
+            restore_session(st.session_state, snapshot)
+            st.session_state.session_id = requested
+    if st.query_params.get("session") != st.session_state.session_id:
+        st.query_params["session"] = st.session_state.session_id
+
+
+def persist_session():
+    """Queue this session's state for the SQLite store (written in batches)."""
+    if not st.session_state.get("offloaded"):
+        get_store().save(st.session_state.session_id, snapshot_session(st.session_state))
+
+
+resume_session()
+token_usage.set_session(st.session_state.session_id)
+RUN_STAGE = st.session_state.stage
+
+
 with st.sidebar:
     st.header("Session Settings")
-    roles_path = Path("utils/roles.json")
     try:
-        roles = json.loads(roles_path.read_text())
-    except Exception:
-        roles = {
-            "software_engineer": {
-                "display_name": "Software Engineer",
-                "base_questions": ["Tell me about yourself.", "Explain a project you built.", "What are your strengths?"],
-            }
-        }
-
-    role = st.selectbox("Choose role", list(roles.keys()), format_func=lambda k: roles[k]["display_name"])
-    experience = st.selectbox("Experience level", ["Fresher", "1-2 years", "3-5 years", "Senior"])
-    difficulty = st.selectbox("Difficulty", ["Easy", "Medium", "Hard"])
+        roles = get_registry()
+        role_ids = roles.role_ids()
+    except RoleRegistryError as e:
+        st.error(f"Could not load roles: {e}")
+        st.stop()
+
+    if st.session_state.get("role") not in role_ids:
+        st.session_state.pop("role", None)
+    role = st.selectbox("Choose role", role_ids, format_func=roles.display_name, key="role")
+    experience = st.selectbox("Experience level", EXPERIENCE_LEVELS, key="experience")
+    difficulty = st.selectbox("Difficulty", ["Easy", "Medium", "Hard"], key="difficulty")
 
     st.markdown("---")
     if Path(ASSIGNMENT_PDF_PATH).exists():
         st.markdown(f"[View assignment PDF]({ASSIGNMENT_PDF_PATH})")
 
+    memo_stats = st.session_state.memo.stats()
+    st.caption(f"Memo cache: {memo_stats['hits']} hits / {memo_stats['misses']} misses")
+    usage = token_usage.session_usage()
+    st.caption(
+        f"Tokens this session: {usage.prompt_tokens} in / {usage.completion_tokens} out "
+        f"({usage.system_tokens_saved} system-prompt tokens saved)"
+    )
+    for stage_name, paths in parse_stats().items():
+        st.caption(f"JSON {stage_name}: " + ", ".join(f"{k} {v}" for k, v in sorted(paths.items())))
+    fast_stats = fast_path_stats()
+    st.caption(f"Decisions made locally: {fast_stats['llm_calls_saved']} (LLM consulted {fast_stats['deferred']})")
+
+    if st.checkbox("Show timings"):
+        rows = [
+            {"span": name, "n": s["count"], "p50 ms": round(s["p50"] * 1000), "p95 ms": round(s["p95"] * 1000)}
+            for name, s in metrics.summary().items()
+        ]
+        st.table(rows)
+        st.table([{"endpoint": op, **s} for op, s in scheduler_stats().items()])
+
+    st.caption(f"Session {st.session_state.session_id} (reopen with ?session=<id> to resume)")
     if st.button("Reset session"):
         st.session_state.clear()
         ensure_session_keys()
+        st.query_params["session"] = st.session_state.session_id
         st.rerun()
 
-def save_bytes_to_wav_and_play(bts: bytes):
-    """Save raw WAV/MP3 bytes to temp file and play via st.audio."""
+def rerun(turn_started: Optional[float] = None):
+    """
+    st.rerun(), first recording this script run, the answered turn (from
+    receiving the audio) and any stage transition.
+    """
+    now = time.perf_counter()
+    persist_session()
+    metrics.record(f"script.{RUN_STAGE}", now - RUN_STARTED)
+    if turn_started is not None:
+        metrics.record(f"turn.{RUN_STAGE}", now - turn_started)
+    if st.session_state.stage != RUN_STAGE:
+        metrics.record(f"transition.{RUN_STAGE}->{st.session_state.stage}", now - RUN_STARTED)
+    st.rerun()
+
+
+def save_bytes_to_wav_and_play(bts: bytes, fmt: str = "wav"):
+    """Play raw WAV/MP3 bytes via st.audio."""
     if not bts:
         return
     if isinstance(bts, str):
@@ -75,280 +153,277 @@ def save_bytes_to_wav_and_play(bts: bytes):
             bts = base64.b64decode(bts)
         except Exception:
             return
-    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".wav")
-    tmp.write(bts)
-    tmp.flush()
-    tmp.close()
-    try:
-        st.audio(tmp.name)
-    finally:
-        try:
-            os.remove(tmp.name)
-        except Exception:
-            pass
+    st.audio(bts, format=f"audio/{fmt or 'wav'}")
 
 def speak_text(text: str):
-    """Silent TTS. If TTS fails, no logs, no warnings, no UI messages."""
+    """
+    Silent TTS. If TTS fails, no logs, no warnings, no UI messages.
+    Long texts are synthesized as parallel sentence chunks and played as
+    one joined clip, which is memoized for reruns.
+    """
     if not text:
         return
 
-    try:
-        audio_data = synthesize_speech_bytes(text)
-    except Exception:
-        return  
+    memo = st.session_state.memo
+    key = ("tts", content_hash(text))
+    parts = memo.get(key)
+    if parts is None:
+        try:
+            parts = list(synthesize_speech_chunks(text))
+        except Exception:
+            return
+        if len(parts) > 1:
+            joined = concat_audio(parts)
+            if joined[0]:
+                parts = [joined]
+        if parts:
+            memo.put(key, parts)
 
-    if not audio_data:
-        return 
+    # One player; separate parts only remain if their formats can't be joined.
+    for audio_data, fmt in parts:
+        save_bytes_to_wav_and_play(audio_data, fmt)
 
-    if isinstance(audio_data, (bytes, bytearray)):
-        save_bytes_to_wav_and_play(bytes(audio_data))
-        return
-    if isinstance(audio_data, str):
+
+def read_audio(audio_file) -> Optional[bytes]:
+    try:
+        return audio_file.getvalue()
+    except Exception:
         try:
-            decoded = base64.b64decode(audio_data)
-            save_bytes_to_wav_and_play(decoded)
+            return audio_file.read()
         except Exception:
-            pass  
-        return
-
+            return None
 
-    if isinstance(audio_data, dict):
-        for key in ("audio", "content", "data"):
-            val = audio_data.get(key)
-            if val:
-                try:
-                    if isinstance(val, (bytes, bytearray)):
-                        save_bytes_to_wav_and_play(bytes(val))
-                    elif isinstance(val, str):
-                        save_bytes_to_wav_and_play(base64.b64decode(val))
-                except Exception:
-                    pass
-                return
 
+def show_warnings():
+    for message in st.session_state.pop("warnings", None) or []:
+        st.warning(message)
 
 
-if st.session_state.stage == "warmup":
-    st.header("Warmup Phase")
-    st.write("Purpose: Help you relax and share background.")
+def show_last_answer():
+    last = st.session_state.last_answer
+    if last:
+        st.markdown("**Your last answer:**")
+        st.write(last["transcript"])
+        st.caption(last["prep"])
 
-    if st.session_state.warmup_turn == 0 and not st.session_state.warmup_question:
-        raw_q = call_agent_llm(WARMUP_PROMPT.format(role=role, experience=experience))
-        try:
-            parsed = json.loads(raw_q)
-            wq = parsed.get("question", "Hi — could you introduce yourself?")
-        except Exception:
-            wq = "Hi — could you introduce yourself?"
-        st.session_state.warmup_question = wq
-        st.session_state.warmup_turn = 1
-        speak_text(wq)
 
+def show_question(question: str):
     st.markdown(
     f"<div style='font-size:20px; font-weight:700; color:#1a237e; "
     "padding:12px 16px; background:#eef2ff; border-left:6px solid #4b6bff; "
     "border-radius:8px; margin:10px 0;'>"
-    f"Interviewer: {st.session_state.warmup_question}"
+    f"Interviewer: {question}"
     "</div>",
     unsafe_allow_html=True
 )
+    speak_text(question)
 
-    audio_key = f"warmup_audio_{st.session_state.warmup_turn}"
-    audio_file = st.audio_input("🎙️ Record your warmup answer (press Stop when done)", key=audio_key)
 
-    if audio_file is not None:
-        try:
-            audio_bytes = audio_file.getvalue()
-        except Exception:
-            try:
-                audio_bytes = audio_file.read()
-            except Exception:
-                audio_bytes = None
+def frame_pcm(frame) -> bytes:
+    """Interleaved PCM16 bytes of an av.AudioFrame."""
+    samples = frame.to_ndarray()
+    if frame.format.is_planar:
+        samples = samples.T
+    if samples.dtype.kind == "f":
+        samples = samples * 32767
+    return samples.astype("<i2").tobytes()
 
-        if not audio_bytes:
-            st.error("Could not read recorded audio. Try again.")
-        else:
-            save_bytes_to_wav_and_play(audio_bytes)
-            with st.spinner("Transcribing..."):
-                transcript = transcribe_audio_bytes(audio_bytes)
 
-            st.markdown("**Transcript:**")
-            st.write(transcript)
+def feed_frames(frames, audio_key: str, transcriber):
+    """Feed webrtc frames to the answer's transcriber, creating it at the first frame."""
+    for frame in frames:
+        if transcriber is None:
+            transcriber = StreamingTranscriber(frame.sample_rate, len(frame.layout.channels))
+            st.session_state.stream = (audio_key, transcriber)
+        transcriber.feed(frame_pcm(frame))
+    return transcriber
 
-            st.session_state.history.append({"q": st.session_state.warmup_question, "a": transcript})
 
-            decision_raw = call_agent_llm(
-                WARMUP_CONTINUE_PROMPT.format(
-                    warmup_turn=st.session_state.warmup_turn,
-                    user_answer=transcript,
-                    history=json.dumps(st.session_state.history, indent=2),
-                )
-            )
+def drain_receiver(ctx, audio_key: str, transcriber):
+    """Feed the frames still queued in the receiver, e.g. those that arrived after the last loop pass."""
+    try:
+        while True:
+            transcriber = feed_frames(ctx.audio_receiver.get_frames(timeout=0), audio_key, transcriber)
+    except Exception:
+        # queue.Empty once drained; no receiver once the connection is gone.
+        pass
+    return transcriber
+
+
+def streaming_answer_turn(audio_key: str, hint: str):
+    """
+    Record through streamlit-webrtc. Frames go to a StreamingTranscriber
+    while the candidate speaks; on Stop the rerun hands the (by then
+    mostly transcribed) answer to the engine.
+    """
+    ctx = streamlit_webrtc.webrtc_streamer(
+        key=audio_key,
+        mode=streamlit_webrtc.WebRtcMode.SENDONLY,
+        audio_receiver_size=1024,
+        media_stream_constraints={"audio": True, "video": False},
+    )
+    stream = st.session_state.get("stream")
+    if stream is not None and stream[0] != audio_key:
+        stream = st.session_state.stream = None
+    transcriber = stream[1] if stream else None
+    if ctx.state.playing:
+        caption = st.empty()
+        while ctx.state.playing:
             try:
-                decision = json.loads(decision_raw)
-            except Exception:
-                repair = call_agent_llm("Return warmup JSON only: " + decision_raw)
-                try:
-                    decision = json.loads(repair)
-                except Exception:
-                    decision = {"next": "start_interview"}
-
-            nxt = decision.get("next", "start_interview")
-
-            if st.session_state.warmup_turn >= 3:
-                nxt = "start_interview"
-
-            if nxt == "ask_more":
-                st.session_state.warmup_turn += 1
-                st.session_state.warmup_question = decision.get("question", "Tell me more about your recent project.")
-                speak_text(st.session_state.warmup_question)
-                st.rerun()
-            else:
-                st.session_state.stage = "interview"
-                st.session_state.current_question = None
-                st.session_state.followup_count = 0
-                st.rerun()
-    else:
-        st.info("Click the record button above to speak your answer, then press Stop. The app will transcribe and continue the flow.")
+                transcriber = feed_frames(ctx.audio_receiver.get_frames(timeout=1), audio_key, transcriber)
+            except queue.Empty:
+                pass
+            # Touch the page every pass: this is where Stop's rerun interrupts the loop.
+            text = transcriber.ready_text() if transcriber is not None else ""
+            caption.caption(text or "Listening...")
+        return
+    transcriber = drain_receiver(ctx, audio_key, transcriber)
+    if transcriber is None:
+        st.info(hint)
+        return
+    turn_started = time.perf_counter()
+    st.session_state.stream = None
+    with st.spinner("Thinking..."):
+        try:
+            result = asyncio.run(engine.answer_stream(st.session_state, transcriber))
+        except TranscriptionError as e:
+            st.error(f"Could not transcribe your answer ({e}). Please record it again.")
+            st.stop()
+    st.session_state.last_answer = {"transcript": result["transcript"], "prep": result["prep"]}
+    rerun(turn_started)
+
+
+def answer_turn(audio_key: str, prompt: str, hint: str):
+    """Record an answer and hand it to the engine, which advances the session."""
+    if STREAMING_CAPTURE:
+        streaming_answer_turn(audio_key, hint)
+        return
+    audio_file = st.audio_input(prompt, key=audio_key)
+    if audio_file is None:
+        st.info(hint)
+        return
+    turn_started = time.perf_counter()
+    audio_bytes = read_audio(audio_file)
+    if not audio_bytes:
+        st.error("Could not read recorded audio. Try again.")
+        return
+    save_bytes_to_wav_and_play(audio_bytes)
+    with st.spinner("Thinking..."):
+        try:
+            result = asyncio.run(
+                engine.answer(st.session_state, audio_bytes, turn_id=content_hash(audio_key, audio_bytes))
+            )
+        except TranscriptionError as e:
+            st.error(f"Could not transcribe your answer ({e}). Please record it again.")
+            st.stop()
+    st.session_state.last_answer = {"transcript": result["transcript"], "prep": result["prep"]}
+    rerun(turn_started)
+
+
+def render_feedback_section(slot, name: str, value):
+    with slot.container():
+        if name == "scores":
+            st.markdown("### Scores")
+            for k, v in value.items():
+                st.write(f"- **{k.capitalize()}:** {v}/5")
+        elif name == "strengths":
+            st.markdown("### Strengths")
+            for s in value:
+                st.write(f"- {s}")
+        elif name == "improvements":
+            st.markdown("### Improvements")
+            for imp in value:
+                st.write(f"- {imp}")
+        elif name == "sample_answer":
+            st.markdown("### Sample Improved Answer")
+            st.write(value)
+        elif name == "summary":
+            st.markdown("### Summary")
+            st.write(value)
+
+
+@st.cache_resource
+def interview_engine(_roles):
+    """One engine per process, shared by every session and rerun."""
+    # Warm the packages the first answer needs while this page renders.
+    preload("httpx", "groq", "numpy")
+    return InterviewEngine(_roles, speak=False)
+
+
+# The UI only renders; the engine owns the stages and their transitions.
+engine = interview_engine(roles)
+
+if st.session_state.stage in ("warmup", "interview") and current_question(st.session_state) is None:
+    with st.spinner("Preparing your question..."):
+        asyncio.run(engine.start(st.session_state))
+    if st.session_state.stage != RUN_STAGE:
+        rerun()
+
+if st.session_state.stage == "warmup":
+    st.header("Warmup Phase")
+    st.write("Purpose: Help you relax and share background.")
+    show_warnings()
+    show_last_answer()
+    show_question(st.session_state.warmup_question)
+    answer_turn(
+        f"warmup_audio_{st.session_state.warmup_turn}",
+        "🎙️ Record your warmup answer (press Stop when done)",
+        "Click the record button above to speak your answer, then press Stop. The app will transcribe and continue the flow.",
+    )
 
 elif st.session_state.stage == "interview":
     st.header("Interview Phase")
     st.write("The AI agent will ask role-specific technical questions.")
+    show_warnings()
+    show_last_answer()
+    show_question(st.session_state.current_question)
+    answer_turn(
+        f"interview_audio_q{st.session_state.q_index}_f{st.session_state.followup_count}",
+        "Record your answer (Stop to finish)",
+        "Click the record button above to speak your answer, then press Stop. The app will transcribe and continue the interview.",
+    )
 
-    questions = roles.get(role, {}).get("base_questions", ["Tell me about yourself."])
-
-    if st.session_state.current_question is None:
-        if st.session_state.q_index >= len(questions):
-            st.session_state.stage = "feedback"
-            st.rerun()
-        st.session_state.current_question = questions[st.session_state.q_index]
-        speak_text(st.session_state.current_question)
-
-    st.markdown(
-    f"<div style='font-size:20px; font-weight:700; color:#1a237e; "
-    "padding:12px 16px; background:#eef2ff; border-left:6px solid #4b6bff; "
-    "border-radius:8px; margin:10px 0;'>"
-    f"Interviewer: {st.session_state.current_question}"
-    "</div>",
-    unsafe_allow_html=True
-)
+else:
+    st.header("Final Feedback")
 
+    # Checked before any work so the click's own rerun doesn't regenerate feedback.
+    if st.button("Restart interview"):
+        st.session_state.clear()
+        ensure_session_keys()
+        st.query_params["session"] = st.session_state.session_id
+        st.rerun()
 
-    audio_key = f"interview_audio_q{st.session_state.q_index}_f{st.session_state.followup_count}"
-    audio_file = st.audio_input("Record your answer (Stop to finish)", key=audio_key)
+    st.write("Generating structured feedback based on your interview...")
 
-    if audio_file is not None:
-        try:
-            audio_bytes = audio_file.getvalue()
-        except Exception:
-            try:
-                audio_bytes = audio_file.read()
-            except Exception:
-                audio_bytes = None
+    slots = {name: st.empty() for name in FEEDBACK_SECTIONS}
 
-        if not audio_bytes:
-            st.error("Could not read recorded audio. Try again.")
-        else:
-            save_bytes_to_wav_and_play(audio_bytes)
-            with st.spinner("Transcribing..."):
-                transcript = transcribe_audio_bytes(audio_bytes)
-
-            st.markdown("**Transcript:**")
-            st.write(transcript)
-
-            st.session_state.history.append({"q": st.session_state.current_question, "a": transcript})
-
-            decision_raw = call_agent_llm(
-                INTERVIEW_DECISION_PROMPT.format(
-                    role=role,
-                    difficulty=difficulty,
-                    current_question=st.session_state.current_question,
-                    user_answer=transcript,
-                    history_json=json.dumps(st.session_state.history, indent=2),
-                )
-            )
+    def on_feedback_field(path, value):
+        if len(path) == 2 and path[0] == "feedback" and path[1] in slots:
+            render_feedback_section(slots[path[1]], path[1], value)
 
-            try:
-                decision = json.loads(decision_raw)
-            except Exception:
-                repair = call_agent_llm("Return valid INTERVIEW JSON only: " + decision_raw)
-                try:
-                    decision = json.loads(repair)
-                except Exception:
-                    decision = {"action": "end"}
-
-            action = decision.get("action", "end")
-
-            if action == "end" and (st.session_state.q_index + 1) < MIN_INTERVIEW_QUESTIONS:
-                action = "next"
-
-            if action == "follow_up":
-                st.session_state.current_question = decision.get("question", "Can you expand on that?")
-                st.session_state.followup_count = st.session_state.followup_count + 1
-                speak_text(st.session_state.current_question)
-                st.rerun()
-            elif action == "next":
-                st.session_state.q_index += 1
-                st.session_state.current_question = None
-                st.session_state.followup_count = 0
-                st.rerun()
-            else:
-                st.session_state.stage = "feedback"
-                st.rerun()
-    else:
-        st.info("Click the record button above to speak your answer, then press Stop. The app will transcribe and continue the interview.")
+    data = st.session_state.feedback_data
+    if data is None:
+        with st.spinner("Collecting answer scores..."):
+            data = asyncio.run(engine.feedback(st.session_state, on_field=on_feedback_field))
+    show_warnings()
 
-else:
-    st.header("Final Feedback")
-    st.write("Generating structured feedback based on your interview...")
+    feedback = data["feedback"]
+    for name in FEEDBACK_SECTIONS:
+        default = {} if name == "scores" else [] if name in ("strengths", "improvements") else ""
+        render_feedback_section(slots[name], name, feedback.get(name, default))
 
-    history_json = json.dumps(st.session_state.history, indent=2)
-    raw = call_agent_llm(FINAL_FEEDBACK_PROMPT.format(role=role, history_json=history_json))
+    speak_text(feedback_speech_text(data))
 
-    try:
-        data = json.loads(raw)
-    except Exception:
-        repair = call_agent_llm("Return STRICT FEEDBACK JSON ONLY: " + raw)
+    if not st.session_state.get("offloaded"):
+        # Finished: make sure it is on disk, then keep only a stub in memory.
+        persist_session()
         try:
-            data = json.loads(repair)
+            get_store().flush()
         except Exception:
-            data = {
-                "feedback": {
-                    "scores": {"structure": 3, "clarity": 3, "examples": 3, "communication": 3, "confidence": 3},
-                    "strengths": ["Clear introduction."],
-                    "improvements": ["Provide more concrete examples."],
-                    "sample_answer": "Improved example answer placeholder.",
-                    "summary": "Overall solid performance."
-                }
-            }
-
-    feedback = data["feedback"]
-    st.markdown("### Scores")
-    for k, v in feedback["scores"].items():
-        st.write(f"- **{k.capitalize()}:** {v}/5")
-
-    st.markdown("### Strengths")
-    for s in feedback.get("strengths", []):
-        st.write(f"- {s}")
-
-    st.markdown("### Improvements")
-    for imp in feedback.get("improvements", []):
-        st.write(f"- {imp}")
-
-    st.markdown("### Sample Improved Answer")
-    st.write(feedback.get("sample_answer", ""))
-
-    st.markdown("### Summary")
-    st.write(feedback.get("summary", ""))
-
-    summary_speak = (
-        f"Final feedback. Structure {feedback['scores']['structure']} out of 5. "
-        f"Clarity {feedback['scores']['clarity']} out of 5. "
-        f"Strengths: {', '.join(feedback.get('strengths', []))}. "
-        f"Improvements: {', '.join(feedback.get('improvements', []))}. "
-        f"Summary: {feedback.get('summary','')}"
-    )
-    speak_text(summary_speak)
+            # Still pending; offloaded on a later rerun once it is written.
+            pass
+        else:
+            offload_session(st.session_state)
 
-    if st.button("Restart interview"):
-        st.session_state.clear()
-        ensure_session_keys()
-        st.rerun()
+persist_session()
+metrics.record(f"script.{RUN_STAGE}", time.perf_counter() - RUN_STARTED)
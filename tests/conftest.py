@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Run from anywhere: the utils/ modules import each other as `utils.x`.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
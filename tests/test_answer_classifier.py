@@ -0,0 +1,66 @@
+import pytest
+
+from utils.answer_classifier import answer_features, classify_answer, pick_follow_up, REPEAT_PROMPT, GENERIC_FOLLOW_UP
+
+# The fast path skips the model, so what it may and may not take is pinned here.
+DONT_KNOW = [
+    "I don't know.",
+    "I do not know",
+    "No idea at all",
+    "I have no idea, sorry",
+    "Sorry, I'm not sure.",
+    "Honestly I don't know the answer to that",
+    "Pass",
+    "I pass",
+    "um I pass",
+    "I'll pass, sorry",
+    "I've never done that, to be honest",
+    "Um, I have no experience with that",
+]
+NOT_DONT_KNOW = [
+    "I'm not sure which index, but I'd profile first",
+    "I haven't used Kafka but RabbitMQ is similar",
+    "Never done that in production but I know the theory",
+    "I would pass the request to a queue",
+    "Not sure it matters, we cached the results anyway",
+    "The test would pass once the mock is fixed",
+]
+
+
+@pytest.mark.parametrize("answer", DONT_KNOW)
+def test_dont_know_is_caught(answer):
+    assert answer_features(answer).dont_know
+    decision = classify_answer(answer, "How would you index this table?")
+    assert decision is not None and decision.action == "next" and decision.reason == "dont_know"
+
+
+@pytest.mark.parametrize("answer", NOT_DONT_KNOW)
+def test_substantive_answer_is_not_dont_know(answer):
+    assert not answer_features(answer).dont_know
+
+
+def test_structure_markers_match_whole_words():
+    assert answer_features("The resultant taskbar had actions firstly").structure == 0
+    assert answer_features("First, the situation was bad; as a result we measured impact").structure == 5
+
+
+@pytest.mark.parametrize("answer", ["", "Thank you.", "[music]", "(silence)"])
+def test_noise_asks_again_once(answer):
+    assert classify_answer(answer, "q").question == REPEAT_PROMPT
+    assert classify_answer(answer, "q", followup_count=1).action == "next"
+
+
+def test_short_answer_gets_follow_up():
+    follow_ups = ["What database did you pick?", "How did you test the cache?"]
+    decision = classify_answer("Caching mostly.", "Tell me about a cache you built", follow_ups=follow_ups)
+    assert decision.action == "follow_up"
+    assert decision.question == "How did you test the cache?"
+
+
+def test_middle_of_the_road_answer_goes_to_the_model():
+    answer = "We moved the reports to a nightly job because the dashboard queries were slow for big customers."
+    assert classify_answer(answer, "Tell me about a performance fix") is None
+
+
+def test_follow_ups_are_not_repeated():
+    assert pick_follow_up(["A?"], "q", "a", asked=["A?"]) == GENERIC_FOLLOW_UP
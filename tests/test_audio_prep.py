@@ -0,0 +1,51 @@
+import io
+import wave
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from utils.audio_prep import preprocess_audio, split_on_silence, TARGET_RATE
+
+
+def tone_wav(seconds, rate, channels=1):
+    t = np.arange(int(seconds * rate)) / rate
+    pcm = (np.sin(2 * np.pi * 220 * t) * 0.3 * 32767).astype("<i2")
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(np.repeat(pcm[:, None], channels, axis=1).tobytes())
+    return buf.getvalue()
+
+
+def test_downmix_and_resample_shrink_the_upload():
+    audio = tone_wav(3, 48000, channels=2)
+    prepared = preprocess_audio(audio)
+    assert prepared.report.bytes_out == len(prepared.data) < len(audio)
+
+
+def test_original_is_sent_when_re_encoding_is_not_smaller():
+    audio = tone_wav(3, 8000)
+    prepared = preprocess_audio(audio)
+    assert prepared.data == audio
+    assert prepared.report.bytes_out == len(audio)
+
+
+def test_chunked_report_counts_the_chunks():
+    prepared = preprocess_audio(tone_wav(50, 48000), chunk_seconds=20)
+    assert len(prepared.chunks) >= 3
+    assert prepared.report.bytes_out == sum(len(c.data) for c in prepared.chunks)
+
+
+def test_undecodable_audio_passes_through():
+    prepared = preprocess_audio(b"not a wav")
+    assert prepared.data == b"not a wav" and prepared.report.bytes_out == 9
+
+
+def test_split_ranges_cover_the_audio():
+    samples = np.zeros(45 * TARGET_RATE, dtype=np.float32)
+    ranges = split_on_silence(samples, TARGET_RATE, max_seconds=20, min_seconds=8)
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(samples)
+    assert all(end - start <= 20 * TARGET_RATE for start, end, _ in ranges)
@@ -0,0 +1,88 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from utils.batch_grade import candidate_sha, discover, load_checkpoint
+
+ROOT = Path(__file__).resolve().parent.parent
+QUESTIONS = ["First question?", "Second question?", "Third question?"]
+
+
+def answers(tmp_path):
+    root = tmp_path / "answers"
+    (root / "alice").mkdir(parents=True)
+    (root / "alice" / "q1.txt").write_text("I designed a REST API with pagination and caching.")
+    (root / "alice" / "q2.txt").write_text("I don't know.")
+    (root / "bob__q3.txt").write_text("I wrote unit tests and profiled the slow endpoint.")
+    return root
+
+
+def test_discover_groups_by_directory_and_prefix(tmp_path):
+    items = {i["id"]: i for i in discover(answers(tmp_path), QUESTIONS)}
+    assert set(items) == {"alice/q1.txt", "alice/q2.txt", "bob__q3.txt"}
+    assert items["alice/q2.txt"]["candidate"] == "alice"
+    assert items["alice/q2.txt"]["question"] == "Second question?"
+    assert items["bob__q3.txt"]["candidate"] == "bob"
+    assert items["bob__q3.txt"]["question"] == "Third question?"
+
+
+def test_manifest_overrides_the_layout(tmp_path):
+    root = answers(tmp_path)
+    (root / "manifest.jsonl").write_text(json.dumps({"file": "bob__q3.txt", "candidate": "carol", "question": "Why?"}))
+    items = {i["id"]: i for i in discover(root, QUESTIONS)}
+    assert items["bob__q3.txt"]["candidate"] == "carol"
+    assert items["bob__q3.txt"]["question"] == "Why?"
+
+
+def test_candidate_sha_ignores_order():
+    a, b = {"id": "a", "sha": "1"}, {"id": "b", "sha": "2"}
+    assert candidate_sha([a, b]) == candidate_sha([b, a])
+    assert candidate_sha([a, b]) != candidate_sha([a, dict(b, sha="3")])
+
+
+def test_checkpoint_skips_errors_and_torn_lines(tmp_path):
+    out = tmp_path / "grades.jsonl"
+    assert load_checkpoint(out) == {}
+    out.write_text(
+        json.dumps({"id": "a", "sha": "1"}) + "\n"
+        + json.dumps({"id": "b", "sha": "2", "error": "timeout"}) + "\n"
+        + '{"id": "c", "sh'
+    )
+    assert set(load_checkpoint(out)) == {"a"}
+
+
+def grade(root, out, *extra):
+    """Run the grader against the local Groq stand-in; returns its JSON report."""
+    env = dict(os.environ, GROQ_API_KEY="fake-key", ROLES_SOURCE=str(ROOT / "utils" / "roles.json"))
+    env.pop("GROQ_BASE_URL", None)
+    proc = subprocess.run(
+        [sys.executable, "-m", "utils.batch_grade", str(root), "--role", "software_engineer", "--out", str(out),
+         "--fake", "--chat-ms", "0", "--stt-ms", "0", "--tts-ms", "0", "--workers", "4", *extra],
+        cwd=ROOT, env=env, capture_output=True, text=True, timeout=120,
+    )
+    assert proc.returncode == 0, proc.stderr
+    return json.loads(proc.stdout)
+
+
+def test_rerun_regrades_only_changed_files(tmp_path):
+    pytest.importorskip("groq")
+    root, out = answers(tmp_path), tmp_path / "grades.jsonl"
+
+    first = grade(root, out)
+    assert (first["graded"], first["candidates"], first["errors"]) == (3, 2, 0)
+
+    again = grade(root, out)
+    assert (again["graded"], again["skipped"], again["candidates"]) == (0, 3, 0)
+
+    (root / "alice" / "q2.txt").write_text("I would add an index and check the query plan.")
+    changed = grade(root, out)
+    assert (changed["graded"], changed["candidates"]) == (1, 1)
+    latest = load_checkpoint(out)
+    assert "index" in latest["alice/q2.txt"]["transcript"]
+
+    fresh = grade(root, out, "--no-resume")
+    assert (fresh["graded"], fresh["candidates"]) == (3, 2)
@@ -0,0 +1,49 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+pytest.importorskip("groq")
+pytest.importorskip("numpy")
+
+
+def bench(tmp_path, *extra):
+    """One full interview against the local Groq stand-in; returns the JSON report."""
+    env = dict(os.environ, GROQ_API_KEY="fake-key", SESSION_DB=str(tmp_path / "sessions.db"))
+    env.pop("GROQ_BASE_URL", None)
+    proc = subprocess.run(
+        [sys.executable, "-m", "utils.bench", "--sessions", "1", "--chat-ms", "0", "--stt-ms", "0", "--tts-ms", "0",
+         "--seed", "3", *extra],
+        cwd=ROOT, env=env, capture_output=True, text=True, timeout=240,
+    )
+    assert proc.returncode == 0, proc.stderr
+    return json.loads(proc.stdout)
+
+
+def stages(report):
+    return {stage: summary["n"] for stage, summary in report["turn_latency"].items()}
+
+
+def test_full_interview(tmp_path):
+    report = bench(tmp_path)
+    turns = stages(report)
+    assert turns["warmup"] >= 1 and turns["interview"] >= 1 and turns["feedback"] == 1
+    assert report["groq"]["calls"]["chat"] > 0
+    assert report["groq"]["failures"] == {"chat": 0, "stt": 0, "tts": 0}
+
+
+def test_interview_survives_flaky_endpoint(tmp_path):
+    report = bench(tmp_path, "--fail-rate", "0.2", "--rate-limit-rate", "0.1")
+    assert sum(report["groq"]["failures"].values()) > 0
+    assert stages(report)["feedback"] == 1
+
+
+def test_streamed_answers(tmp_path):
+    report = bench(tmp_path, "--stream", "50")
+    assert stages(report)["feedback"] == 1
+    assert report["groq"]["calls"]["stt"] > stages(report)["interview"]
@@ -0,0 +1,73 @@
+import pytest
+
+from utils.json_extract import extract_json_object, parse_stage_json, needs_repair, PARSE_PATHS
+
+
+@pytest.mark.parametrize("raw", [
+    '{"action": "next"}',
+    '```json\n{"action": "next"}\n```',
+    'Sure! Here is the JSON: {"action": "next"} Hope that helps.',
+    '{"action": "next",}',
+    "{'action': 'next', 'question': None}",
+    '{"action": "next", "note": "braces } in { strings"}',
+])
+def test_local_extraction_recovers_the_object(raw):
+    assert extract_json_object(raw)["action"] == "next"
+
+
+@pytest.mark.parametrize("raw", ["", "no json here", "[1, 2]", None])
+def test_local_extraction_fails_cleanly(raw):
+    with pytest.raises(ValueError):
+        extract_json_object(raw)
+
+
+def test_paths_are_counted():
+    PARSE_PATHS.clear()
+    parse_stage_json("interview", '{"action": "next"}')
+    parse_stage_json("interview", '```{"action": "next",}```')
+    parse_stage_json("interview", "junk", partial={"action": "end"})
+    assert PARSE_PATHS == {("interview", "strict"): 1, ("interview", "local"): 1, ("interview", "partial"): 1}
+
+
+def test_repair_is_only_called_when_local_parsing_fails():
+    calls = []
+
+    def repair():
+        calls.append(1)
+        return '{"action": "follow_up", "question": "Why?"}'
+
+    assert parse_stage_json("interview", '{"action": "end"}', repair=repair) == {"action": "end", "question": None}
+    assert calls == []
+    assert parse_stage_json("interview", "garbage", repair=repair)["question"] == "Why?"
+    assert calls == [1]
+
+
+def test_failed_repair_returns_the_fallback():
+    def repair():
+        raise RuntimeError("model down")
+
+    assert parse_stage_json("interview", "garbage", repair=repair, fallback={"action": "end"}) == {"action": "end"}
+    assert parse_stage_json("interview", "garbage", repair=lambda: "still garbage", fallback="fb") == "fb"
+
+
+def test_needs_repair():
+    assert needs_repair("interview", "garbage")
+    assert not needs_repair("interview", "garbage", partial={"action": "next"})
+    assert not needs_repair("warmup", '{"next": "start_interview"}')
+
+
+@pytest.mark.parametrize("stage, raw", [
+    ("interview", '{"action": "follow_up"}'),
+    ("interview", '{"action": "maybe"}'),
+    ("warmup", '{"next": "ask_more", "question": ""}'),
+    ("feedback", '{"feedback": {"scores": {"structure": 4}}}'),
+    ("synthesis", '{"summary": "  "}'),
+])
+def test_invalid_decisions_fall_back(stage, raw):
+    assert parse_stage_json(stage, raw, fallback="fb") == "fb"
+
+
+def test_scores_are_clamped_and_lists_normalized():
+    data = parse_stage_json("feedback", '{"scores": {"structure": 9, "clarity": "2.6"}, "strengths": "one"}')
+    assert data["feedback"]["scores"] == {"structure": 5, "clarity": 3}
+    assert data["feedback"]["strengths"] == ["one"]
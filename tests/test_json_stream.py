@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from utils.json_stream import IncrementalJSONParser
+
+DOC = {
+    "feedback": {
+        "scores": {"structure": 4, "clarity": 3},
+        "strengths": ["Clear \"STAR\" answers", "Good {examples}"],
+        "summary": "Solid, with a few gaps.\nKeep going.",
+    },
+    "done": True,
+    "ratio": -1.5e2,
+    "missing": None,
+}
+TEXT = "```json\n" + json.dumps(DOC) + "\n```"
+
+
+def feed_all(chunks, max_depth=2):
+    parser = IncrementalJSONParser(max_depth=max_depth)
+    fields = []
+    for chunk in chunks:
+        fields += parser.feed(chunk)
+    return parser, fields
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, len(TEXT)])
+def test_any_chunking_yields_the_same_fields(size):
+    parser, fields = feed_all([TEXT[i:i + size] for i in range(0, len(TEXT), size)])
+    assert parser.done
+    values = dict(fields)
+    assert values[("feedback", "scores")] == DOC["feedback"]["scores"]
+    assert values[("feedback", "strengths")] == DOC["feedback"]["strengths"]
+    assert values[("feedback", "summary")] == DOC["feedback"]["summary"]
+    assert values[("done",)] is True
+    assert values[("ratio",)] == -150.0
+    assert values[("missing",)] is None
+    assert parser.get("feedback", "scores") == DOC["feedback"]["scores"]
+
+
+def test_fields_are_emitted_as_soon_as_they_close():
+    parser = IncrementalJSONParser()
+    assert parser.feed('{"action": "follow_up", "question": "Why') == [(("action",), "follow_up")]
+    assert parser.get("question") is None
+    assert parser.feed(' that?"') == [(("question",), "Why that?")]
+    assert not parser.done
+
+
+def test_deeper_fields_are_not_reported():
+    _, fields = feed_all([json.dumps(DOC)], max_depth=1)
+    assert all(len(path) == 1 for path, _ in fields)
+
+
+def test_feeding_after_the_document_ends_is_ignored():
+    parser = IncrementalJSONParser()
+    parser.feed('{"a": 1} trailing {"b": 2}')
+    assert parser.done
+    assert parser.feed('{"c": 3}') == []
+    assert parser.get("b") is None
@@ -0,0 +1,40 @@
+import pytest
+
+from utils.memo import MemoCache, content_hash
+
+
+def test_content_hash_separates_parts():
+    assert content_hash("ab", "c") != content_hash("a", "bc")
+    assert content_hash("x", b"x") == content_hash("x", "x")
+    assert content_hash("stage", 1) == content_hash("stage", 1)
+
+
+def test_lru_eviction_and_stats():
+    memo = MemoCache(max_entries=2)
+    memo.put("a", 1)
+    memo.put("b", 2)
+    assert memo.get("a") == 1  # "b" is now the oldest
+    memo.put("c", 3)
+    assert "b" not in memo and "a" in memo and "c" in memo
+    assert memo.get("b", "missing") == "missing"
+    assert memo.stats() == {"entries": 2, "hits": 1, "misses": 1, "evictions": 1}
+
+
+def test_get_or_compute_runs_once():
+    memo = MemoCache()
+    calls = []
+    for _ in range(3):
+        assert memo.get_or_compute("k", lambda: calls.append(1) or "v") == "v"
+    assert calls == [1]
+
+
+def test_errors_are_not_memoized():
+    memo = MemoCache()
+
+    def fail():
+        raise RuntimeError("transient")
+
+    with pytest.raises(RuntimeError):
+        memo.get_or_compute("k", fail)
+    assert "k" not in memo
+    assert memo.get_or_compute("k", lambda: "ok") == "ok"
@@ -0,0 +1,106 @@
+import json
+import os
+import sqlite3
+
+import pytest
+
+from utils import role_registry
+from utils.role_registry import RoleRegistry, RoleRegistryError, validate_role, _split, _to_sqlite
+
+ROLES = {
+    "backend": {"display_name": "Backend Engineer", "base_questions": ["Design a queue.", "Scale a DB."], "follow_ups": ["Why?"]},
+    "pm": {"display_name": "Product Manager", "base_questions": ["Prioritize a roadmap."], "follow_ups": []},
+}
+
+
+@pytest.fixture(autouse=True)
+def check_every_time(monkeypatch):
+    monkeypatch.setattr(role_registry, "RELOAD_CHECK_INTERVAL", 0)
+
+
+@pytest.fixture
+def roles_file(tmp_path):
+    path = tmp_path / "roles.json"
+    path.write_text(json.dumps(ROLES))
+    return path
+
+
+def touch(path):
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+
+def test_validate_role_rejects_bad_data():
+    with pytest.raises(RoleRegistryError):
+        validate_role("x", {"display_name": "X", "base_questions": []})
+    with pytest.raises(RoleRegistryError):
+        validate_role("x", {"display_name": "", "base_questions": ["q"]})
+    assert validate_role("x", {"display_name": "X", "base_questions": ["q"]})["follow_ups"] == []
+
+
+@pytest.mark.parametrize("kind", ["json", "directory", "sqlite"])
+def test_sources_serve_the_same_roles(tmp_path, roles_file, kind):
+    source = roles_file
+    if kind == "directory":
+        source = tmp_path / "roles"
+        _split(roles_file, source)
+    elif kind == "sqlite":
+        source = tmp_path / "roles.db"
+        _to_sqlite(roles_file, source)
+    registry = RoleRegistry(source)
+    assert sorted(registry.role_ids()) == ["backend", "pm"]
+    assert registry.display_name("pm") == "Product Manager"
+    assert registry.get("backend")["base_questions"] == ROLES["backend"]["base_questions"]
+    assert "pm" in registry
+
+
+def test_json_source_reloads_on_change(roles_file):
+    registry = RoleRegistry(roles_file)
+    assert "qa" not in registry.role_ids()
+    roles = dict(ROLES, qa={"display_name": "QA", "base_questions": ["Test a login form."]})
+    roles_file.write_text(json.dumps(roles))
+    touch(roles_file)
+    assert "qa" in registry.role_ids()
+
+
+def test_failed_reload_keeps_last_good_roles(roles_file):
+    registry = RoleRegistry(roles_file)
+    assert len(registry.role_ids()) == 2
+    roles_file.write_text("{broken")
+    touch(roles_file)
+    assert len(registry.role_ids()) == 2
+    assert registry.last_error is not None
+    roles_file.write_text(json.dumps(ROLES))
+    touch(roles_file)
+    registry.role_ids()
+    assert registry.last_error is None
+
+
+def test_missing_source_raises(tmp_path):
+    with pytest.raises(RoleRegistryError):
+        RoleRegistry(tmp_path / "nope.json").role_ids()
+
+
+def test_bad_shard_is_dropped_not_fatal(tmp_path, roles_file):
+    directory = tmp_path / "roles"
+    _split(roles_file, directory)
+    (directory / "pm.json").write_text(json.dumps({"display_name": "PM", "base_questions": []}))
+    (directory / "index.json").unlink()
+    registry = RoleRegistry(directory)
+    # display_name (e.g. a selectbox format_func) must not take the page down.
+    assert registry.display_name("pm") == "pm"
+    assert registry.role_ids() == ["backend"]
+    with pytest.raises(KeyError):
+        registry.get("pm")
+
+
+def test_bad_sqlite_row_is_dropped(tmp_path, roles_file):
+    db = tmp_path / "roles.db"
+    _to_sqlite(roles_file, db)
+    with sqlite3.connect(db) as conn:
+        conn.execute("UPDATE roles SET base_questions = 'not json' WHERE id = 'pm'")
+    registry = RoleRegistry(db)
+    with pytest.raises(RoleRegistryError):
+        registry.get("pm")
+    assert registry.role_ids() == ["backend"]
+    assert registry.display_name("pm") == "pm"
@@ -0,0 +1,121 @@
+import sqlite3
+
+import pytest
+
+from utils import session_store
+from utils.session_store import SessionStore, snapshot_session, restore_session, offload_session, is_finished
+from utils.answer_scoring import AnswerScorer
+from utils.history import InterviewHistory
+from utils.memo import MemoCache
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SessionStore(tmp_path / "sessions.db", flush_interval=3600)
+    yield store
+    store.close()
+
+
+def session(stage="interview", feedback=None):
+    history = InterviewHistory()
+    history.append({"q": "Tell me about yourself", "a": "I build APIs."})
+    return {
+        "stage": stage, "role": "backend", "q_index": 1, "asked_questions": [0, 2], "feedback_data": feedback,
+        "history": history, "scorer": AnswerScorer(), "memo": MemoCache(),
+    }
+
+
+def test_snapshot_round_trip():
+    snapshot = snapshot_session(session())
+    state = {}
+    restore_session(state, snapshot)
+    assert state["asked_questions"] == [0, 2]
+    assert [t["a"] for t in state["history"]] == ["I build APIs."]
+    assert snapshot_session(state) == snapshot
+
+
+def test_pending_snapshots_are_readable_before_the_flush(store):
+    store.save("s1", snapshot_session(session()))
+    assert store.load("s1")["q_index"] == 1
+    assert store.stats()["pending"] == 1
+    assert store.flush() == 1
+    assert store.load("s1")["q_index"] == 1
+    assert store.stats()["sessions"] == 1
+
+
+def test_only_the_newest_snapshot_is_written(store):
+    store.save("s1", {"stage": "warmup"})
+    store.save("s1", {"stage": "interview"})
+    assert store.flush() == 1
+    assert store.load("s1")["stage"] == "interview"
+
+
+def test_unchanged_snapshots_are_skipped(store):
+    store.save("s1", {"stage": "interview"})
+    store.flush()
+    store.save("s1", {"stage": "interview"})
+    assert store.flush() == 0
+
+
+def test_survives_a_restart(tmp_path):
+    first = SessionStore(tmp_path / "db", flush_interval=3600)
+    first.save("s1", {"stage": "feedback", "feedback_data": {"x": 1}})
+    first.close()
+    second = SessionStore(tmp_path / "db", flush_interval=3600)
+    assert is_finished(second.load("s1"))
+    assert second.stats()["finished"] == 1
+    second.close()
+
+
+class FailingConnection:
+    def __init__(self, real):
+        self.real = real
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def executemany(self, *args):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    def __getattr__(self, name):
+        return getattr(self.real, name)
+
+
+def test_failed_flush_keeps_the_batch(store):
+    store.save("s1", {"stage": "interview", "n": 1})
+    store.save("s2", {"stage": "interview"})
+    real, store._conn = store._conn, FailingConnection(store._conn)
+    with pytest.raises(sqlite3.Error):
+        store.flush()
+    # A newer snapshot saved meanwhile wins over the failed one.
+    store.save("s1", {"stage": "interview", "n": 2})
+    store._conn = real
+    assert store.flush() == 2
+    assert store.load("s1")["n"] == 2
+
+
+def test_written_hashes_are_bounded(store, monkeypatch):
+    monkeypatch.setattr(session_store, "WRITTEN_HASHES", 3)
+    for i in range(10):
+        store.save(f"s{i}", {"stage": "interview"})
+    store.flush()
+    assert len(store._written) == 3
+    store.save("s9", {"stage": "feedback", "feedback_data": {}})
+    store.flush()
+    assert "s9" not in store._written
+
+
+def test_prune(store):
+    store.save("old", {"stage": "interview"})
+    store.flush()
+    assert store.prune(older_than_seconds=-1) == 1
+    assert store.load("old") is None
+
+
+def test_offload_keeps_only_a_stub():
+    state = session("feedback", feedback={"feedback": {}})
+    offload_session(state)
+    assert len(state["history"]) == 0 and state["offloaded"]
@@ -0,0 +1,44 @@
+import os
+
+from utils.tts_cache import TTSCache
+
+
+def test_round_trip_and_miss(tmp_path):
+    cache = TTSCache(tmp_path)
+    assert cache.get("hello", "m", "v") is None
+    cache.put("hello", "m", "v", b"RIFFdata", "wav")
+    assert cache.get("hello", "m", "v") == (b"RIFFdata", "wav")
+    # Model and voice are part of the key.
+    assert cache.get("hello", "m", "other") is None
+
+
+def test_formats_are_kept(tmp_path):
+    cache = TTSCache(tmp_path)
+    cache.put("hi", "gtts", "en", b"ID3", "mp3")
+    assert cache.get("hi", "gtts", "en") == (b"ID3", "mp3")
+
+
+def test_unknown_format_and_empty_audio_are_not_stored(tmp_path):
+    cache = TTSCache(tmp_path)
+    cache.put("a", "m", "v", b"x", "ogg")
+    cache.put("b", "m", "v", b"", "wav")
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = TTSCache(tmp_path, max_bytes=25)
+    cache.put("old", "m", "v", b"x" * 10, "wav")
+    cache.put("used", "m", "v", b"x" * 10, "wav")
+    for i, name in enumerate(["old", "used"]):
+        path = cache._find(cache.key(name, "m", "v"))
+        os.utime(path, (1000 + i, 1000 + i))
+    cache.get("old", "m", "v")  # bumps its mtime past "used"
+    cache.put("new", "m", "v", b"x" * 10, "wav")
+    assert cache.get("used", "m", "v") is None
+    assert cache.get("old", "m", "v") is not None
+    assert cache.get("new", "m", "v") is not None
+
+
+def test_entries_written_by_another_process_are_found(tmp_path):
+    TTSCache(tmp_path).put("shared", "m", "v", b"RIFF", "wav")
+    assert TTSCache(tmp_path).get("shared", "m", "v") == (b"RIFF", "wav")
@@ -0,0 +1,146 @@
+"""
+Local fast path for interview decisions.
+
+Clear-cut answers (nothing transcribed, "I don't know", a few words, a
+long structured STAR answer) are decided here without an
+INTERVIEW_DECISION_PROMPT round trip; everything else is deferred to the
+LLM. Follow-ups come from the role's curated `follow_ups`.
+"""
+import os
+import re
+from collections import Counter
+from typing import NamedTuple, Optional
+
+# Set to 0 to always ask the LLM.
+ANSWER_FAST_PATH = os.getenv("ANSWER_FAST_PATH", "1") != "0"
+FAST_PATH_MIN_CONFIDENCE = float(os.getenv("FAST_PATH_MIN_CONFIDENCE", "0.8"))
+
+SHORT_ANSWER_WORDS = 6
+STRUCTURED_ANSWER_WORDS = 90
+GENERIC_FOLLOW_UP = "Can you walk me through a specific example of that?"
+REPEAT_PROMPT = "Sorry, I didn't catch that. Could you answer the question again?"
+
+# What Whisper tends to produce for silence or noise.
+_NOISE_TRANSCRIPTS = {
+    "", "you", "thank you", "thanks", "thank you for watching", "thanks for watching",
+    "bye", "okay", "ok", "um", "uh", "hmm",
+}
+_BRACKETED_RE = re.compile(r"^[\[(][^\])]*[\])]$")
+_WORD_RE = re.compile(r"[a-z0-9']+")
+# A whole answer that only says "I don't know" (with filler around it);
+# "I'm not sure which index, but I'd profile first" is a real answer.
+_FILLER = r"(?:sorry|honestly|um|uh|well|hmm|oh|so|unfortunately|to be honest|i'm afraid|really|at all|yet)"
+_DONT_KNOW = (
+    r"(?:i (?:really )?don't know|i do not know|i (?:have )?no idea|no idea|(?:i'm|i am) not sure|not sure"
+    r"|(?:i haven't|i have not|i've never|i have never|never) (?:done|used|tried|worked (?:on|with)) (?:that|this|it)"
+    r"|(?:i have )?no experience(?: (?:with|in) (?:that|this|it))?|(?:i'll |i will |i )?pass)"
+)
+_DONT_KNOW_RE = re.compile(
+    rf"^(?:{_FILLER} )*{_DONT_KNOW}(?: (?:{_FILLER}|{_DONT_KNOW}|(?:the )?answer(?: to (?:that|this))?))*$"
+)
+_HEDGES = ("i think", "maybe", "probably", "i guess", "kind of", "sort of", "not sure", "i suppose", "perhaps")
+_STRUCTURE = (
+    "situation", "task", "action", "result", "because", "so that", "as a result", "first", "then",
+    "finally", "trade-off", "tradeoff", "measured", "impact", "we decided", "i decided", "i led", "i built",
+)
+_STRUCTURE_RE = re.compile(r"\b(?:" + "|".join(re.escape(m) for m in _STRUCTURE) + r")\b")
+_STOPWORDS = frozenset(
+    "a an and are as at be but by can did do for from how i in is it me my of on or so that the this to was we what"
+    " when where which who why with you your".split()
+)
+
+# Decisions made locally vs. handed to the LLM, keyed (source, reason).
+FAST_PATH_DECISIONS = Counter()
+
+
+class AnswerFeatures(NamedTuple):
+    words: int
+    noise: bool
+    dont_know: bool
+    hedges: int
+    structure: int
+    has_numbers: bool
+
+
+class LocalDecision(NamedTuple):
+    action: str
+    question: Optional[str]
+    confidence: float
+    reason: str
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", (text or "").strip().lower()).strip(" .!?,")
+
+
+def answer_features(answer: str) -> AnswerFeatures:
+    text = _normalize(answer)
+    words = _WORD_RE.findall(text)
+    return AnswerFeatures(
+        words=len(words),
+        noise=text in _NOISE_TRANSCRIPTS or bool(_BRACKETED_RE.match(text)),
+        dont_know=len(words) <= 12 and bool(_DONT_KNOW_RE.match(" ".join(words))),
+        hedges=sum(text.count(h) for h in _HEDGES),
+        structure=len(set(_STRUCTURE_RE.findall(text))),
+        has_numbers=any(ch.isdigit() for ch in text) or "percent" in text,
+    )
+
+
+def _content_words(text: str) -> set:
+    # The first five letters are a crude stem: "debug" matches "debugging".
+    return {w[:5] for w in _WORD_RE.findall((text or "").lower()) if w not in _STOPWORDS and len(w) > 2}
+
+
+def pick_follow_up(follow_ups, question: str, answer: str, asked=()) -> str:
+    """The unasked follow-up sharing the most words with the question and answer."""
+    asked = set(asked)
+    candidates = [f for f in follow_ups or () if f not in asked]
+    if not candidates:
+        return GENERIC_FOLLOW_UP
+    context = _content_words(question) | _content_words(answer)
+    # max() keeps the first of equal scores, so ties follow roles.json order.
+    return max(candidates, key=lambda f: len(_content_words(f) & context))
+
+
+def classify_answer(answer: str, question: str, follow_ups=(), followup_count=0, asked=()) -> Optional[LocalDecision]:
+    """
+    A LocalDecision when the answer is clear-cut enough to skip the LLM,
+    else None. `asked` holds questions already put to the candidate.
+    "end" is never chosen here: moving past the last question ends the
+    interview anyway, and ending early needs the whole conversation.
+    """
+    if not ANSWER_FAST_PATH:
+        return None
+    f = answer_features(answer)
+    decision = None
+
+    if f.noise:
+        if followup_count == 0:
+            decision = LocalDecision("follow_up", REPEAT_PROMPT, 0.95, "no_answer")
+        else:
+            decision = LocalDecision("next", None, 0.9, "no_answer")
+    elif f.dont_know:
+        decision = LocalDecision("next", None, 0.9, "dont_know")
+    elif f.words < SHORT_ANSWER_WORDS:
+        if followup_count == 0:
+            decision = LocalDecision("follow_up", pick_follow_up(follow_ups, question, answer, asked), 0.85, "too_short")
+        else:
+            decision = LocalDecision("next", None, 0.85, "too_short")
+    elif f.words >= STRUCTURED_ANSWER_WORDS and f.structure >= 3 and f.has_numbers and f.hedges <= 1:
+        decision = LocalDecision("next", None, 0.8 + min(0.15, 0.03 * (f.structure - 3)), "structured")
+
+    if decision is None or decision.confidence < FAST_PATH_MIN_CONFIDENCE:
+        FAST_PATH_DECISIONS["llm", "uncertain"] += 1
+        return None
+    FAST_PATH_DECISIONS["local", decision.reason] += 1
+    return decision
+
+
+def fast_path_stats() -> dict:
+    """{"llm_calls_saved": n, "deferred": n, "reasons": {reason: n}}."""
+    local = {reason: n for (source, reason), n in FAST_PATH_DECISIONS.items() if source == "local"}
+    return {
+        "llm_calls_saved": sum(local.values()),
+        "deferred": FAST_PATH_DECISIONS["llm", "uncertain"],
+        "reasons": local,
+    }
@@ -0,0 +1,183 @@
+"""
+Per-answer scoring in the background, aggregated into final feedback.
+
+Each interview answer is scored right after its turn (a small
+ANSWER_SCORING_PROMPT call at background priority). The feedback stage
+then only averages the stored scores and makes one short
+FEEDBACK_SYNTHESIS_PROMPT call for the text, so its latency no longer
+grows with the length of the interview.
+"""
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+SCORE_DIMENSIONS = (
+    "structure",
+    "clarity",
+    "examples",
+    "communication",
+    "confidence",
+    "technical_depth",
+    "follow_up_handling",
+)
+SCORING_WORKERS = int(os.getenv("SCORING_WORKERS", "4"))
+# Notes passed to the synthesis call, so its prompt stays bounded.
+MAX_NOTES = 8
+MAX_WEAKEST_ANSWER_CHARS = 1200
+
+# Shared by all sessions: background scoring, and the rescoring a feedback
+# page waits on, kept apart so the latter never queues behind the former.
+_scoring_pool = ThreadPoolExecutor(max_workers=SCORING_WORKERS, thread_name_prefix="answer-scoring")
+_collect_pool = ThreadPoolExecutor(max_workers=SCORING_WORKERS, thread_name_prefix="answer-scoring-now")
+
+
+def score_answer(role: str, question: str, answer: str, follow_up=False, priority=None):
+    """Validated {"scores", "strength", "improvement"} for one answer, or None."""
+    from utils.llm_client import call_agent_llm
+    from utils.json_extract import parse_stage_json
+    from utils.json_prompts import ANSWER_SCORING_PROMPT
+    from utils.groq_client import GroqError
+
+    prompt = ANSWER_SCORING_PROMPT.format(
+        role=role, kind="follow-up" if follow_up else "main", question=question or "", answer=answer or ""
+    )
+    try:
+        raw = call_agent_llm(prompt, stage="scoring", priority=priority)
+    except GroqError:
+        return None
+    return parse_stage_json("scoring", raw, fallback=None)
+
+
+class AnswerScorer:
+    """
+    Scores of one session's interview answers, in answer order.
+    Pickles (and snapshots) without its in-flight futures.
+    """
+
+    def __init__(self, items=None):
+        # Each item: {"question", "answer", "follow_up", "result"}.
+        self.items = list(items or [])
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def submit(self, role: str, question: str, answer: str, follow_up=False):
+        """Start scoring an answer in the background."""
+        from utils.groq_scheduler import PriorityHandle, PRIORITY_BACKGROUND
+
+        with self._lock:
+            index = len(self.items)
+            self.items.append({"question": question, "answer": answer, "follow_up": follow_up, "result": None})
+            # Run in this session's context so token usage is attributed to it.
+            ctx = contextvars.copy_context()
+            priority = PriorityHandle(PRIORITY_BACKGROUND)
+            future = _scoring_pool.submit(ctx.run, score_answer, role, question, answer, follow_up, priority)
+            self._futures[index] = (future, priority)
+        return index
+
+    def collect(self, role: str):
+        """
+        Wait for pending scores and return the finished items. Background
+        calls still queued for a Groq slot are promoted to interactive
+        priority. Answers whose call never started, failed, or was lost in
+        a restart are scored now, in parallel on the collect pool (not
+        behind other sessions' background jobs), at interactive priority.
+        """
+        from utils.groq_scheduler import PRIORITY_INTERACTIVE
+
+        with self._lock:
+            futures, self._futures = self._futures, {}
+        running = {}
+        for index, (fut, priority) in futures.items():
+            if not fut.cancel():
+                priority.promote(PRIORITY_INTERACTIVE)
+                running[index] = fut
+
+        def rescore(i):
+            item = self.items[i]
+            return _collect_pool.submit(
+                contextvars.copy_context().run, score_answer, role, item["question"], item["answer"],
+                item["follow_up"], PRIORITY_INTERACTIVE,
+            )
+
+        retries = {i: rescore(i) for i, item in enumerate(self.items) if item["result"] is None and i not in running}
+        for index, fut in running.items():
+            result = fut.result()
+            if result is None:
+                retries[index] = rescore(index)
+            self.items[index]["result"] = result
+        for i, fut in retries.items():
+            self.items[i]["result"] = fut.result()
+        return [item for item in self.items if item["result"] is not None]
+
+    def snapshot(self) -> list:
+        with self._lock:
+            done = {i: f.result() for i, (f, _) in self._futures.items() if f.done() and not f.cancelled()}
+        return [dict(item, result=done.get(i, item["result"])) for i, item in enumerate(self.items)]
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getstate__(self):
+        return {"items": self.snapshot()}
+
+    def __setstate__(self, state):
+        self.__init__(state["items"])
+
+
+def aggregate_scores(items) -> dict:
+    """
+    Mean of each dimension over the scored answers (follow_up_handling
+    over follow-up answers when there are any), plus the notes and the
+    weakest answer for the synthesis prompt.
+    """
+    scores = {}
+    for dim in SCORE_DIMENSIONS:
+        pool = items
+        if dim == "follow_up_handling" and any(item["follow_up"] for item in items):
+            pool = [item for item in items if item["follow_up"]]
+        values = [item["result"]["scores"][dim] for item in pool if dim in item["result"]["scores"]]
+        if values:
+            scores[dim] = min(5, max(1, int(round(sum(values) / len(values)))))
+
+    def mean(item):
+        values = list(item["result"]["scores"].values())
+        return sum(values) / len(values)
+
+    weakest = min(items, key=mean)
+    return {
+        "answers": len(items),
+        "scores": scores,
+        "strengths": list(dict.fromkeys(i["result"]["strength"] for i in items if i["result"]["strength"]))[:MAX_NOTES],
+        "improvements": list(dict.fromkeys(i["result"]["improvement"] for i in items if i["result"]["improvement"]))[:MAX_NOTES],
+        "weakest": {"question": weakest["question"], "answer": weakest["answer"]},
+    }
+
+
+def synthesis_prompt(role: str, aggregate: dict) -> str:
+    from utils.history import compact_json
+    from utils.json_prompts import FEEDBACK_SYNTHESIS_PROMPT
+
+    return FEEDBACK_SYNTHESIS_PROMPT.format(
+        role=role,
+        answers=aggregate["answers"],
+        scores_json=compact_json(aggregate["scores"]),
+        notes_json=compact_json({"strengths": aggregate["strengths"], "improvements": aggregate["improvements"]}),
+        weakest_question=aggregate["weakest"]["question"] or "",
+        weakest_answer=(aggregate["weakest"]["answer"] or "")[:MAX_WEAKEST_ANSWER_CHARS],
+    )
+
+
+def synthesis_fallback(aggregate: dict) -> dict:
+    """Feedback text built from the notes alone, for when synthesis fails."""
+    return {
+        "strengths": aggregate["strengths"][:5],
+        "improvements": aggregate["improvements"][:5],
+        "sample_answer": "",
+        "summary": f"Scored across {aggregate['answers']} answers; see the strengths and improvements above.",
+    }
+
+
+def build_feedback(aggregate: dict, synthesis: dict) -> dict:
+    """The FeedbackResult shape the feedback page renders."""
+    return {"feedback": dict(synthesis, scores=aggregate["scores"])}
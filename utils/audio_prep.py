@@ -0,0 +1,213 @@
+import io
+import os
+import wave
+from typing import NamedTuple
+
+from utils.lazy_import import optional_module
+
+np = optional_module("numpy")
+sf = optional_module("soundfile")
+
+TARGET_RATE = 16000
+FRAME_MS = 30
+# A frame counts as speech when its RMS is this many times the noise floor
+# (the 10th-percentile frame), and never below ABS_SPEECH_RMS.
+SPEECH_RATIO = float(os.getenv("AUDIO_VAD_RATIO", "3.0"))
+ABS_SPEECH_RMS = float(os.getenv("AUDIO_VAD_MIN_RMS", "0.01"))
+PAD_SECONDS = 0.25
+MIN_SPEECH_SECONDS = 0.3
+# Long answers are split into chunks of at most CHUNK_SECONDS, cut at the
+# quietest point after MIN_CHUNK_SECONDS. Chunks hard-cut inside speech
+# overlap by OVERLAP_SECONDS so no word is lost at the boundary.
+CHUNK_SECONDS = float(os.getenv("STT_CHUNK_SECONDS", "20"))
+MIN_CHUNK_SECONDS = float(os.getenv("STT_MIN_CHUNK_SECONDS", "8"))
+OVERLAP_SECONDS = 0.5
+
+
+class PrepReport(NamedTuple):
+    bytes_in: int
+    bytes_out: int
+    seconds_in: float
+    seconds_out: float
+
+    def describe(self) -> str:
+        saved = 100 * (1 - self.bytes_out / self.bytes_in) if self.bytes_in else 0
+        return (
+            f"Upload {self.bytes_in / 1024:.0f} KB → {self.bytes_out / 1024:.0f} KB ({saved:.0f}% smaller), "
+            f"audio {self.seconds_in:.1f}s → {self.seconds_out:.1f}s"
+        )
+
+
+class AudioChunk(NamedTuple):
+    data: bytes
+    filename: str
+    mime: str
+    # True when this chunk starts inside speech and repeats the tail of the
+    # previous chunk; the transcripts need de-duplicating at the seam.
+    overlaps_previous: bool
+
+
+class PreparedAudio(NamedTuple):
+    data: bytes
+    filename: str
+    mime: str
+    report: PrepReport
+    chunks: tuple = ()
+
+
+def decode_wav(audio_bytes: bytes):
+    """PCM WAV bytes -> (float32 array of shape [frames, channels] in [-1, 1], rate)."""
+    with wave.open(io.BytesIO(audio_bytes), "rb") as wf:
+        channels = wf.getnchannels()
+        width = wf.getsampwidth()
+        rate = wf.getframerate()
+        raw = wf.readframes(wf.getnframes())
+    if width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif width == 2:
+        samples = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768
+    elif width == 4:
+        samples = np.frombuffer(raw, dtype="<i4").astype(np.float32) / 2147483648
+    else:
+        raise wave.Error(f"unsupported sample width {width}")
+    return samples.reshape(-1, channels), rate
+
+
+def to_mono(samples):
+    return samples.mean(axis=1) if samples.ndim == 2 else samples
+
+
+def resample(samples, rate: int, target: int = TARGET_RATE):
+    """Linear-interpolation resample, box-filtered first when downsampling."""
+    if rate == target or len(samples) == 0:
+        return samples
+    if rate > target:
+        width = int(round(rate / target))
+        if width > 1:
+            kernel = np.ones(width, dtype=np.float32) / width
+            samples = np.convolve(samples, kernel, mode="same")
+    n_out = int(round(len(samples) * target / rate))
+    x_old = np.arange(len(samples), dtype=np.float64) / rate
+    x_new = np.arange(n_out, dtype=np.float64) / target
+    return np.interp(x_new, x_old, samples).astype(np.float32)
+
+
+def frame_rms(samples, rate: int, frame_ms: int = FRAME_MS):
+    hop = max(1, rate * frame_ms // 1000)
+    n = len(samples) // hop
+    if n == 0:
+        return np.zeros(0, dtype=np.float32), hop
+    frames = samples[: n * hop].reshape(n, hop)
+    return np.sqrt((frames ** 2).mean(axis=1)), hop
+
+
+def speech_mask(samples, rate: int):
+    """Energy VAD: (boolean speech flag per frame, frame hop in samples)."""
+    rms, hop = frame_rms(samples, rate)
+    if len(rms) == 0:
+        return rms.astype(bool), hop
+    floor = float(np.percentile(rms, 10))
+    return rms > max(floor * SPEECH_RATIO, ABS_SPEECH_RMS), hop
+
+
+def trim_silence(samples, rate: int):
+    """Cut leading and trailing silence, keeping PAD_SECONDS either side."""
+    mask, hop = speech_mask(samples, rate)
+    voiced = np.flatnonzero(mask)
+    if len(voiced) == 0:
+        return samples
+    pad = int(PAD_SECONDS * rate)
+    start = max(0, voiced[0] * hop - pad)
+    end = min(len(samples), (voiced[-1] + 1) * hop + pad)
+    if (end - start) < MIN_SPEECH_SECONDS * rate:
+        return samples
+    return samples[start:end]
+
+
+def encode(samples, rate: int):
+    """16 kHz mono -> (bytes, filename, mime). FLAC when soundfile is available."""
+    pcm = (np.clip(samples, -1, 1) * 32767).astype("<i2")
+    buf = io.BytesIO()
+    if sf:
+        sf.write(buf, pcm, rate, format="FLAC", subtype="PCM_16")
+        return buf.getvalue(), "audio.flac", "audio/flac"
+    with wave.open(buf, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(pcm.tobytes())
+    return buf.getvalue(), "audio.wav", "audio/wav"
+
+
+def split_on_silence(samples, rate: int, max_seconds=CHUNK_SECONDS, min_seconds=MIN_CHUNK_SECONDS):
+    """
+    [(start, end, overlaps_previous)] sample ranges covering `samples`,
+    each at most max_seconds long. Cuts go at the quietest frame between
+    min_seconds and max_seconds into the chunk; when that frame is still
+    speech, the next chunk starts OVERLAP_SECONDS early.
+    """
+    total = len(samples)
+    max_len = int(max_seconds * rate)
+    if total <= max_len:
+        return [(0, total, False)]
+    rms, hop = frame_rms(samples, rate)
+    mask, _ = speech_mask(samples, rate)
+    min_len = int(min(min_seconds, max_seconds) * rate)
+    overlap = int(OVERLAP_SECONDS * rate)
+
+    ranges = []
+    start = 0
+    overlapped = False
+    while total - start > max_len:
+        lo = (start + min_len) // hop
+        hi = min(len(rms), (start + max_len) // hop)
+        if hi <= lo:
+            cut_frame, voiced = hi, True
+        else:
+            cut_frame = lo + int(np.argmin(rms[lo:hi]))
+            voiced = bool(mask[cut_frame])
+        cut = min(total, cut_frame * hop + hop // 2)
+        ranges.append((start, cut, overlapped))
+        overlapped = voiced
+        start = max(start + 1, cut - overlap) if voiced else cut
+    ranges.append((start, total, overlapped))
+    return ranges
+
+
+def preprocess_audio(audio_bytes: bytes, chunk_seconds=None) -> PreparedAudio:
+    """
+    Decode a recording, downmix to mono, resample to 16 kHz, trim silence
+    and re-encode compactly for upload. Anything that can't be decoded
+    (or a missing numpy) passes through unchanged, and so does a recording
+    the re-encode would not make smaller (e.g. WAV output without
+    soundfile). With chunk_seconds, audio longer than that is instead
+    split at silences into separately encoded `chunks` for parallel
+    transcription. The report counts the bytes actually uploaded.
+    """
+    unchanged = PreparedAudio(audio_bytes, "audio.wav", "audio/wav", PrepReport(len(audio_bytes), len(audio_bytes), 0.0, 0.0))
+    if not np:
+        return unchanged
+    try:
+        samples, rate = decode_wav(audio_bytes)
+    except (wave.Error, EOFError, ValueError):
+        return unchanged
+
+    seconds_in = len(samples) / rate if rate else 0.0
+    mono = resample(to_mono(samples), rate)
+    trimmed = trim_silence(mono, TARGET_RATE)
+    seconds_out = len(trimmed) / TARGET_RATE
+
+    if chunk_seconds and len(trimmed) > chunk_seconds * TARGET_RATE:
+        ranges = split_on_silence(trimmed, TARGET_RATE, max_seconds=chunk_seconds)
+        chunks = tuple(
+            AudioChunk(*encode(trimmed[start:end], TARGET_RATE), overlaps_previous=overlapped)
+            for start, end, overlapped in ranges
+        )
+        # Only the chunks are uploaded; the original stays as `data`.
+        report = PrepReport(len(audio_bytes), sum(len(c.data) for c in chunks), seconds_in, seconds_out)
+        return PreparedAudio(audio_bytes, "audio.wav", "audio/wav", report, chunks)
+
+    data, filename, mime = encode(trimmed, TARGET_RATE)
+    if len(data) >= len(audio_bytes):
+        return unchanged._replace(report=PrepReport(len(audio_bytes), len(audio_bytes), seconds_in, seconds_in))
+    return PreparedAudio(data, filename, mime, PrepReport(len(audio_bytes), len(data), seconds_in, seconds_out))
@@ -0,0 +1,373 @@
+"""
+Offline grading of a directory of recorded answers.
+
+Every answer (an audio file, or a .txt transcript) is transcribed,
+scored with ANSWER_SCORING_PROMPT and run through the interview decision
+(local fast path, then INTERVIEW_DECISION_PROMPT). Answers are then
+grouped per candidate and summarized with FEEDBACK_SYNTHESIS_PROMPT.
+Work runs on a bounded thread pool at background priority. Each result
+is appended to the JSONL output as soon as it is done, so an interrupted
+run resumes where it stopped (--resume is the default; changed files are
+regraded).
+
+    python -m utils.batch_grade --role software_engineer answers/ --out grades.jsonl
+    python -m utils.batch_grade --role data_analyst answers/ --out g.jsonl --parquet g.parquet --workers 16
+
+Layout: answers/<candidate>/<file> groups by directory; a flat directory
+uses <candidate>__<anything>.<ext> when present. A "q3" token in the file
+name (e.g. alice__q3.wav) grades it against the role's third base
+question. A manifest.jsonl of {"file", "candidate", "question"} lines
+overrides both.
+"""
+import argparse
+import hashlib
+import json
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from functools import partial
+from pathlib import Path
+
+AUDIO_TYPES = {
+    ".wav": "audio/wav",
+    ".mp3": "audio/mpeg",
+    ".m4a": "audio/mp4",
+    ".ogg": "audio/ogg",
+    ".webm": "audio/webm",
+    ".flac": "audio/flac",
+}
+TRANSCRIPT_TYPES = {".txt"}
+MANIFEST = "manifest.jsonl"
+_QUESTION_RE = re.compile(r"(?:^|[_\-.])q(\d+)(?=$|[_\-.])", re.IGNORECASE)
+
+
+def file_sha(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def discover(root: Path, questions):
+    """[{"id", "path", "candidate", "question"}] for every gradable file under `root`."""
+    manifest = {}
+    manifest_path = root / MANIFEST
+    if manifest_path.exists():
+        for line in manifest_path.read_text(encoding="utf-8").splitlines():
+            if line.strip():
+                entry = json.loads(line)
+                manifest[entry["file"]] = entry
+
+    items = []
+    for path in sorted(root.rglob("*")):
+        suffix = path.suffix.lower()
+        if not path.is_file() or (suffix not in AUDIO_TYPES and suffix not in TRANSCRIPT_TYPES):
+            continue
+        rel = path.relative_to(root).as_posix()
+        entry = manifest.get(rel, {})
+        if len(path.relative_to(root).parts) > 1:
+            candidate = path.relative_to(root).parts[0]
+        elif "__" in path.stem:
+            candidate = path.stem.split("__", 1)[0]
+        else:
+            candidate = root.name
+        question = entry.get("question")
+        if question is None:
+            match = _QUESTION_RE.search(path.stem)
+            if match and 1 <= int(match.group(1)) <= len(questions):
+                question = questions[int(match.group(1)) - 1]
+        items.append({"id": rel, "path": path, "candidate": entry.get("candidate", candidate), "question": question})
+    return items
+
+
+def candidate_sha(answers) -> str:
+    """Identifies the set of answer files a candidate's feedback was built from."""
+    return hashlib.sha256("".join(sorted(a["id"] + a["sha"] for a in answers)).encode()).hexdigest()
+
+
+def load_checkpoint(out: Path) -> dict:
+    """{id: record} of records finished without error in an earlier run."""
+    done = {}
+    if not out.exists():
+        return done
+    for line in out.read_text(encoding="utf-8").splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            # A line cut off by an interrupted run.
+            continue
+        if not record.get("error"):
+            done[record["id"]] = record
+    return done
+
+
+def transcribe_file(path: Path) -> str:
+    from utils.audio_prep import preprocess_audio, CHUNK_SECONDS
+    from utils.voice import transcribe_audio_bytes, transcribe_prepared
+
+    suffix = path.suffix.lower()
+    if suffix in TRANSCRIPT_TYPES:
+        return path.read_text(encoding="utf-8").strip()
+    data = path.read_bytes()
+    if suffix == ".wav":
+        return transcribe_prepared(preprocess_audio(data, chunk_seconds=CHUNK_SECONDS))
+    return transcribe_audio_bytes(data, filename=path.name, mime=AUDIO_TYPES[suffix])
+
+
+def decide(role: str, role_data: dict, question: str, answer: str, difficulty: str):
+    """The interviewer's next move after this answer: (decision dict, "local" | "llm")."""
+    from utils.answer_classifier import classify_answer
+    from utils.history import InterviewHistory
+    from utils.json_extract import parse_stage_json
+    from utils.json_prompts import INTERVIEW_DECISION_PROMPT
+    from utils.llm_client import call_agent_llm
+    from utils.groq_scheduler import PRIORITY_BACKGROUND
+
+    fast = classify_answer(answer, question, follow_ups=role_data["follow_ups"])
+    if fast is not None:
+        return {"action": fast.action, "question": fast.question}, "local"
+    history = InterviewHistory()
+    history.append({"q": question, "a": answer})
+    raw = call_agent_llm(
+        INTERVIEW_DECISION_PROMPT.format(
+            role=role, difficulty=difficulty, current_question=question, user_answer=answer,
+            history_json=history.to_prompt(),
+        ),
+        stage="interview",
+        priority=PRIORITY_BACKGROUND,
+    )
+    return parse_stage_json("interview", raw, fallback={"action": "next"}), "llm"
+
+
+def grade_answer(item: dict, role: str, role_data: dict, difficulty: str) -> dict:
+    """One answer's JSONL record; failures are recorded in "error" and retried on resume."""
+    from utils.answer_scoring import score_answer
+    from utils.groq_scheduler import PRIORITY_BACKGROUND
+
+    record = {
+        "kind": "answer", "id": item["id"], "sha": item["sha"], "candidate": item["candidate"],
+        "question": item["question"], "timings": {}, "error": None,
+    }
+    question = item["question"] or "(question not given)"
+    try:
+        started = time.perf_counter()
+        record["transcript"] = transcribe_file(item["path"])
+        scored = time.perf_counter()
+        record["timings"]["stt"] = scored - started
+        result = score_answer(role, question, record["transcript"], priority=PRIORITY_BACKGROUND)
+        decided = time.perf_counter()
+        record["timings"]["score"] = decided - scored
+        if result is None:
+            record["error"] = "scoring failed"
+            return record
+        record.update(scores=result["scores"], strength=result["strength"], improvement=result["improvement"])
+        record["decision"], record["decided_by"] = decide(role, role_data, question, record["transcript"], difficulty)
+        record["timings"]["decide"] = time.perf_counter() - decided
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+    return record
+
+
+def grade_candidate(candidate: str, answers, role: str) -> dict:
+    """Aggregate scores and synthesized feedback for one candidate's graded answers."""
+    from utils.answer_scoring import aggregate_scores, synthesis_prompt, synthesis_fallback, build_feedback
+    from utils.json_extract import parse_stage_json
+    from utils.llm_client import call_agent_llm
+    from utils.groq_client import GroqError
+    from utils.groq_scheduler import PRIORITY_BACKGROUND
+
+    items = [
+        {
+            "question": a["question"], "answer": a["transcript"], "follow_up": False,
+            "result": {"scores": a["scores"], "strength": a["strength"], "improvement": a["improvement"]},
+        }
+        for a in answers
+    ]
+    record = {
+        "kind": "candidate", "id": f"candidate:{candidate}", "candidate": candidate,
+        "sha": candidate_sha(answers),
+        "answers": len(answers), "timings": {}, "error": None,
+    }
+    started = time.perf_counter()
+    aggregate = aggregate_scores(items)
+    try:
+        raw = call_agent_llm(synthesis_prompt(role, aggregate), stage="synthesis", priority=PRIORITY_BACKGROUND)
+    except GroqError as e:
+        raw, record["error"] = None, f"GroqError: {e}"
+    record["feedback"] = build_feedback(
+        aggregate, parse_stage_json("synthesis", raw, fallback=synthesis_fallback(aggregate))
+    )["feedback"]
+    record["timings"]["synthesis"] = time.perf_counter() - started
+    return record
+
+
+class Grader:
+    """Runs the jobs on a bounded pool and appends each record to `out` as it completes."""
+
+    def __init__(self, out: Path, workers: int):
+        self.out = out
+        self.workers = max(1, workers)
+        self.lock = threading.Lock()
+        self.written = 0
+        self.errors = 0
+
+    def write(self, record: dict):
+        with self.lock:
+            with self.out.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self.written += 1
+            self.errors += bool(record.get("error"))
+
+    def run(self, jobs, progress=None):
+        """
+        Run `jobs` (zero-argument callables returning a record) with at most
+        2 x workers submitted at once, so huge corpora don't queue every
+        job up front. Returns the records in completion order.
+        """
+        records = []
+        jobs = iter(jobs)
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="grade") as pool:
+            running = set()
+            while True:
+                for job in jobs:
+                    running.add(pool.submit(job))
+                    if len(running) >= 2 * self.workers:
+                        break
+                if not running:
+                    break
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    record = fut.result()
+                    self.write(record)
+                    records.append(record)
+                    if progress:
+                        progress(record)
+        return records
+
+
+def write_parquet(jsonl: Path, path: Path):
+    """
+    Latest record per id from the JSONL output, as a Parquet table (needs
+    pyarrow). Nested fields are stored as JSON text so answer and
+    candidate rows share one schema.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except Exception:
+        sys.exit("--parquet needs pyarrow: pip install pyarrow")
+    latest = {}
+    for line in jsonl.read_text(encoding="utf-8").splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        latest[record["id"]] = record
+    rows = [dict(r, **{k: json.dumps(r[k]) for k in ("scores", "decision", "feedback", "timings") if k in r})
+            for r in latest.values()]
+    pq.write_table(pa.Table.from_pylist(rows), path)
+
+
+def stage_summary(records) -> dict:
+    from utils.bench import latency_summary
+
+    stages = defaultdict(list)
+    for record in records:
+        for stage, seconds in record.get("timings", {}).items():
+            stages[stage].append(seconds)
+    return {stage: latency_summary(values) for stage, values in sorted(stages.items())}
+
+
+def main():
+    from utils.bench import configure_endpoint, load_roles
+    from utils.fake_groq import add_fake_arguments
+
+    parser = argparse.ArgumentParser(description="Grade a directory of recorded answers offline.")
+    parser.add_argument("input", help="directory of answers (audio files or .txt transcripts)")
+    parser.add_argument("--role", required=True, help="role ID from the role registry")
+    parser.add_argument("--roles-file", help="role source (JSON file, directory or SQLite); default ROLES_SOURCE")
+    parser.add_argument("--difficulty", default="Medium", choices=("Easy", "Medium", "Hard"))
+    parser.add_argument("--out", default="grades.jsonl", help="JSONL results, also the checkpoint")
+    parser.add_argument("--parquet", help="also write the results here as Parquet (needs pyarrow)")
+    parser.add_argument("--workers", type=int, default=8, help="answers graded in parallel")
+    parser.add_argument("--no-resume", action="store_true", help="regrade everything, ignoring --out")
+    parser.add_argument("--fake", action="store_true", help="grade against the local Groq stand-in (for trying it out)")
+    parser.add_argument("--base-url", help="Groq-compatible endpoint to use instead of the default")
+    add_fake_arguments(parser)
+    args = parser.parse_args()
+
+    root = Path(args.input)
+    if not root.is_dir():
+        sys.exit(f"not a directory: {root}")
+    out = Path(args.out)
+    server = None
+    if args.fake or args.base_url:
+        server, _ = configure_endpoint(args)
+    try:
+        roles = load_roles(args.roles_file)
+        if args.role not in roles:
+            sys.exit(f"unknown role {args.role!r}; known: {', '.join(roles.role_ids())}")
+        role_data = roles.get(args.role)
+
+        items = discover(root, role_data["base_questions"])
+        for item in items:
+            item["sha"] = file_sha(item["path"])
+        if args.no_resume and out.exists():
+            out.unlink()
+        done = load_checkpoint(out)
+        todo = [i for i in items if done.get(i["id"], {}).get("sha") != i["sha"]]
+        print(f"{len(items)} answers, {len(items) - len(todo)} already graded, {len(todo)} to go", file=sys.stderr)
+
+        grader = Grader(out, args.workers)
+        started = time.perf_counter()
+        count = [0]
+
+        def progress(record):
+            count[0] += 1
+            if count[0] % 25 == 0 or count[0] == len(todo):
+                rate = count[0] / (time.perf_counter() - started) * 60
+                print(f"  {count[0]}/{len(todo)} answers ({rate:.1f}/min)", file=sys.stderr)
+
+        graded = grader.run((partial(grade_answer, item, args.role, role_data, args.difficulty) for item in todo), progress)
+        answers_seconds = time.perf_counter() - started
+
+        # Candidates whose set of graded answers changed get fresh feedback.
+        answers = {r["id"]: r for r in done.values() if r["kind"] == "answer"}
+        answers.update((r["id"], r) for r in graded)
+        current = {i["id"] for i in items}
+        by_candidate = defaultdict(list)
+        for record in answers.values():
+            if record["id"] in current and not record.get("error"):
+                by_candidate[record["candidate"]].append(record)
+        candidate_jobs = [
+            partial(grade_candidate, candidate, records, args.role)
+            for candidate, records in sorted(by_candidate.items())
+            if done.get(f"candidate:{candidate}", {}).get("sha") != candidate_sha(records)
+        ]
+        candidates = grader.run(candidate_jobs)
+        elapsed = time.perf_counter() - started
+
+        if args.parquet:
+            write_parquet(out, Path(args.parquet))
+    finally:
+        if server is not None:
+            server.stop()
+
+    from utils.groq_scheduler import scheduler_stats
+
+    report = {
+        "answers": len(items),
+        "graded": len(graded),
+        "skipped": len(items) - len(todo),
+        "candidates": len(candidates),
+        "errors": grader.errors,
+        "seconds": round(elapsed, 2),
+        "answers_per_min": round(len(graded) / answers_seconds * 60, 1) if answers_seconds and graded else 0,
+        "stages_ms": stage_summary(graded + candidates),
+        "scheduler": scheduler_stats(),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
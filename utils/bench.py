@@ -0,0 +1,220 @@
+"""
+Headless benchmark of the warmup -> interview -> feedback flow.
+
+Runs sessions through the engine frontend.py uses (utils.engine: audio
+preprocessing, STT, streamed decisions, JSON parsing, TTS) against the
+local Groq stand-in (utils.fake_groq), or against --base-url, and reports
+turn latency percentiles, bytes moved and call counts.
+
+    python -m utils.bench --sessions 5 --answers recordings/ --chat-ms 400
+"""
+import argparse
+import asyncio
+import io
+import itertools
+import json
+import math
+import os
+import struct
+import sys
+import time
+import wave
+from pathlib import Path
+
+MAX_TURNS = 20
+# Frame size when --stream replays recordings like a microphone.
+FRAME_SECONDS = 0.1
+
+
+def synthetic_answer(seconds: float, rate=48000, channels=2) -> bytes:
+    """A browser-like 48 kHz stereo WAV: tone bursts with pauses and silent edges."""
+    frames = bytearray()
+    total = int(seconds * rate)
+    for i in range(total):
+        t = i / rate
+        edge = t < 0.8 or t > seconds - 0.8
+        pause = int(t * 1.3) % 4 == 3
+        value = 0 if edge or pause else int(6000 * math.sin(2 * math.pi * 180 * t))
+        frames += struct.pack("<h", value) * channels
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(bytes(frames))
+    return buf.getvalue()
+
+
+def load_answers(directory=None):
+    if directory:
+        files = sorted(Path(directory).glob("*.wav"))
+        if not files:
+            sys.exit(f"no .wav files in {directory}")
+        return [f.read_bytes() for f in files]
+    return [synthetic_answer(s) for s in (4, 9, 25)]
+
+
+def run_session(role, roles, answers, experience="1-2 years", difficulty="Medium", speak=True,
+                min_questions=3, state=None, stream_speed=None):
+    """
+    Drive one interview to the end through utils.engine, as frontend.py
+    does. Returns {"turns": [...], "seconds": float} where each turn
+    records its stage and per-step latencies.
+    If `state` is a dict it is filled with the session (what frontend.py
+    would keep in st.session_state: history, memoized STT/LLM/TTS results,
+    feedback).
+    With stream_speed, answers are streamed in 100 ms frames at that many
+    times real time, as a microphone would send them, and "stt" is the
+    wait after the last frame.
+    """
+    return asyncio.run(
+        run_session_async(role, roles, answers, experience, difficulty, speak, min_questions, state, stream_speed)
+    )
+
+
+async def stream_answer(engine, session, audio: bytes, speed: float):
+    from utils.streaming_stt import StreamingTranscriber, wav_frames
+
+    rate, channels, frames = wav_frames(audio, FRAME_SECONDS)
+    transcriber = StreamingTranscriber(rate, channels)
+    for frame in frames:
+        transcriber.feed(frame)
+        await asyncio.sleep(FRAME_SECONDS / speed)
+    return await engine.answer_stream(session, transcriber)
+
+
+async def run_session_async(role, roles, answers, experience="1-2 years", difficulty="Medium", speak=True,
+                            min_questions=3, state=None, stream_speed=None):
+    from utils.engine import InterviewEngine, new_session
+
+    engine = InterviewEngine(roles, speak=speak, prefetch=speak, min_questions=min_questions)
+    session = new_session(role, experience, difficulty)
+    if state is not None:
+        state.update(session)
+        session = state
+
+    started = time.perf_counter()
+    turns = []
+    answer_iter = itertools.cycle(answers)
+    await engine.start(session)
+    while session["stage"] != "feedback" and len(turns) < MAX_TURNS:
+        stage = session["stage"]
+        audio = next(answer_iter)
+        if stream_speed:
+            result = await stream_answer(engine, session, audio, stream_speed)
+        else:
+            result = await engine.answer(session, audio)
+        timings = result["timings"]
+        turns.append({"stage": stage, "stt": timings["stt"], "llm": timings["decide"], "tts": timings["tts"],
+                      "seconds": timings["total"]})
+
+    t0 = time.perf_counter()
+    session["stage"] = "feedback"
+    await engine.feedback(session)
+    turns.append({"stage": "feedback", "llm": time.perf_counter() - t0, "seconds": time.perf_counter() - t0})
+    return {"turns": turns, "seconds": time.perf_counter() - started}
+
+
+def latency_summary(values) -> dict:
+    from utils.metrics import quantile
+
+    values = sorted(values)
+    if not values:
+        return {}
+    return {
+        "n": len(values),
+        "p50_ms": round(quantile(values, 0.5) * 1000, 1),
+        "p95_ms": round(quantile(values, 0.95) * 1000, 1),
+        "p99_ms": round(quantile(values, 0.99) * 1000, 1),
+        "max_ms": round(values[-1] * 1000, 1),
+    }
+
+
+def report(results, fake=None) -> dict:
+    from utils import metrics
+    from utils.answer_classifier import fast_path_stats
+    from utils.groq_scheduler import scheduler_stats
+    from utils.warmup_pool import get_warmup_pool
+
+    turns = [t for r in results for t in r["turns"]]
+    out = {
+        "sessions": len(results),
+        "session_seconds": latency_summary([r["seconds"] for r in results]),
+        "turn_latency": {
+            stage: latency_summary([t["seconds"] for t in turns if t["stage"] == stage])
+            for stage in ("warmup", "interview", "feedback")
+        },
+        "spans_ms": {
+            name: {"n": s["count"], "p50": round(s["p50"] * 1000, 1), "p95": round(s["p95"] * 1000, 1)}
+            for name, s in metrics.summary().items()
+        },
+    }
+    out["fast_path"] = fast_path_stats()
+    out["scheduler"] = scheduler_stats()
+    out["warmup_pool"] = get_warmup_pool().stats()
+    if fake is not None:
+        out["groq"] = fake.stats()
+    return out
+
+
+def configure_endpoint(args):
+    """Start the in-process stand-in unless --base-url points elsewhere. Returns (server, fake)."""
+    if args.base_url:
+        os.environ["GROQ_BASE_URL"] = args.base_url
+        return None, None
+    from utils.fake_groq import FakeGroqServer, fake_from_args
+
+    server = FakeGroqServer(fake_from_args(args)).start()
+    os.environ["GROQ_BASE_URL"] = server.base_url
+    os.environ.setdefault("GROQ_API_KEY", "fake-key")
+    os.environ.setdefault("STT_BACKEND", "groq")
+    return server, server.fake
+
+
+def load_roles(source=None):
+    from utils.role_registry import get_registry, ROLES_SOURCE
+
+    return get_registry(source or ROLES_SOURCE)
+
+
+def add_common_arguments(parser):
+    from utils.fake_groq import add_fake_arguments
+
+    parser.add_argument("--role", default="software_engineer")
+    parser.add_argument("--roles-file", help="role source (JSON file, directory or SQLite); default ROLES_SOURCE")
+    parser.add_argument("--answers", help="directory of recorded .wav answers (synthetic if omitted)")
+    parser.add_argument("--no-tts", action="store_true", help="skip speech synthesis")
+    parser.add_argument("--base-url", help="benchmark a real or external endpoint instead of the stand-in")
+    parser.add_argument("--out", help="write the JSON report here as well as stdout")
+    add_fake_arguments(parser)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the interview flow against a local Groq stand-in.")
+    parser.add_argument("--sessions", type=int, default=3)
+    parser.add_argument("--stream", type=float, metavar="SPEED",
+                        help="stream answers while 'recording' at SPEED x real time (incremental STT)")
+    add_common_arguments(parser)
+    args = parser.parse_args()
+
+    server, fake = configure_endpoint(args)
+    try:
+        roles = load_roles(args.roles_file)
+        answers = load_answers(args.answers)
+        results = [
+            run_session(args.role, roles, answers, speak=not args.no_tts, stream_speed=args.stream)
+            for _ in range(args.sessions)
+        ]
+        out = report(results, fake)
+    finally:
+        if server is not None:
+            server.stop()
+
+    text = json.dumps(out, indent=2)
+    print(text)
+    if args.out:
+        Path(args.out).write_text(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,542 @@
+"""
+Headless interview engine: the warmup -> interview -> feedback state
+machine, independent of any UI.
+
+A session is a plain dict holding the same keys frontend.py keeps in
+st.session_state (so utils.session_store snapshots either one). The
+engine's coroutines advance it one step at a time; the blocking work
+(audio prep, STT, LLM and TTS calls) runs in worker threads, so one
+event loop can drive many sessions. Within a turn, the audio for the
+likely next base question is synthesized while the decision call is
+still streaming, and each answer is scored in the background.
+
+Frontend.py calls it through asyncio.run() per script run; api.py serves
+it over HTTP and WebSocket.
+"""
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from utils import metrics
+from utils.answer_classifier import classify_answer
+from utils.answer_scoring import AnswerScorer, aggregate_scores, synthesis_prompt, synthesis_fallback, build_feedback
+from utils.audio_prep import preprocess_audio, CHUNK_SECONDS
+from utils.groq_client import GroqError
+from utils.history import InterviewHistory
+from utils.json_extract import parse_stage_json, needs_repair
+from utils.json_stream import IncrementalJSONParser
+from utils.memo import MemoCache, content_hash
+from utils.question_index import next_question_index
+from utils.role_registry import get_registry
+from utils.json_prompts import (
+    WARMUP_PROMPT,
+    WARMUP_CONTINUE_PROMPT,
+    INTERVIEW_DECISION_PROMPT,
+    FINAL_FEEDBACK_PROMPT,
+)
+
+MIN_INTERVIEW_QUESTIONS = 3
+MAX_WARMUP_TURNS = 3
+FIRST_WARMUP_QUESTION = "Hi — could you introduce yourself?"
+FALLBACK_FEEDBACK = {
+    "feedback": {
+        "scores": {"structure": 3, "clarity": 3, "examples": 3, "communication": 3, "confidence": 3},
+        "strengths": ["Clear introduction."],
+        "improvements": ["Provide more concrete examples."],
+        "sample_answer": "Improved example answer placeholder.",
+        "summary": "Overall solid performance."
+    }
+}
+
+# Work a step may abandon while it is still running (the next question's
+# prefetched audio, the tail of an early-stopped stream). asyncio.run(),
+# which frontend.py uses per script run, joins the default executor on
+# exit, so this work runs on its own pool that nothing waits for.
+DETACHED_WORKERS = int(os.getenv("ENGINE_DETACHED_WORKERS", "32"))
+_detached_pool = ThreadPoolExecutor(max_workers=DETACHED_WORKERS, thread_name_prefix="engine-detached")
+
+_END = object()
+
+
+async def run_detached(fn, *args):
+    """asyncio.to_thread on the detached pool (same context propagation)."""
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(_detached_pool, functools.partial(ctx.run, fn, *args))
+
+
+def new_session(role: str, experience="1-2 years", difficulty="Medium", session_id=None) -> dict:
+    """A fresh session dict at the start of the warmup."""
+    return {
+        "session_id": session_id or uuid.uuid4().hex,
+        "role": role,
+        "experience": experience,
+        "difficulty": difficulty,
+        "stage": "warmup",
+        "history": InterviewHistory(),
+        "warmup_turn": 0,
+        "warmup_question": None,
+        "q_index": 0,
+        "asked_questions": [],
+        "current_question": None,
+        "feedback_data": None,
+        "scorer": AnswerScorer(),
+        "followup_count": 0,
+        "memo": MemoCache(max_entries=64),
+        "last_turn": None,
+    }
+
+
+def current_question(state):
+    """The question the candidate should answer now, or None."""
+    if state["stage"] == "warmup":
+        return state["warmup_question"]
+    if state["stage"] == "interview":
+        return state["current_question"]
+    return None
+
+
+def top_level_fields(parser: IncrementalJSONParser) -> dict:
+    return {path[0]: value for path, value in parser.fields.items() if len(path) == 1}
+
+
+class InterviewEngine:
+    """
+    Drives sessions through the interview. `speak` synthesizes each new
+    question's audio before a step returns; `prefetch` warms the memo and
+    TTS cache with the likely next base question during the decision call.
+    """
+
+    def __init__(self, roles=None, speak=True, prefetch=True, min_questions=MIN_INTERVIEW_QUESTIONS):
+        self.roles = roles if roles is not None else get_registry()
+        self.speak = speak
+        self.prefetch = prefetch
+        self.min_questions = min_questions
+
+    # -- async building blocks -------------------------------------------
+    # The session memo is only touched from the event loop thread; worker
+    # threads get plain arguments and return plain results.
+
+    def _warn(self, state, message):
+        state.setdefault("warnings", []).append(message)
+
+    async def call_llm(self, state, prompt, stage):
+        """Memoized call_agent_llm; None (with a warning) if Groq fails."""
+        from utils.llm_client import call_agent_llm
+
+        memo = state["memo"]
+        key = ("llm", content_hash(stage, prompt))
+        cached = memo.get(key)
+        if cached is not None:
+            return cached
+        try:
+            raw = await asyncio.to_thread(call_agent_llm, prompt, stage=stage)
+        except GroqError as e:
+            self._warn(state, f"Model call failed: {e}")
+            return None
+        memo.put(key, raw)
+        return raw
+
+    async def parse(self, state, stage, raw, repair_prefix, fallback, partial=None):
+        """
+        parse_stage_json, with its last-resort repair call (skipped if the
+        first call already failed) made from the loop beforehand, so no
+        worker thread ever blocks waiting on another one.
+        """
+        repair = None
+        if raw is not None and await asyncio.to_thread(needs_repair, stage, raw, partial):
+            with metrics.span("llm.repair", stage=stage):
+                repaired = await self.call_llm(state, repair_prefix + raw, stage)
+            repair = lambda: repaired
+        return await asyncio.to_thread(parse_stage_json, stage, raw, repair, fallback, partial)
+
+    async def transcribe(self, state, audio_bytes: bytes):
+        """
+        Preprocess and transcribe once per distinct recording. Returns
+        (transcript, PrepReport); raises TranscriptionError, which is not
+        memoized so a retry can succeed.
+        """
+        from utils.voice import transcribe_prepared
+
+        memo = state["memo"]
+        key = ("stt", content_hash(audio_bytes))
+        cached = memo.get(key)
+        if cached is not None:
+            return cached
+
+        def work():
+            with metrics.span("audio_prep", bytes=len(audio_bytes)):
+                prepared = preprocess_audio(audio_bytes, chunk_seconds=CHUNK_SECONDS)
+            return transcribe_prepared(prepared), prepared.report
+
+        result = await asyncio.to_thread(work)
+        memo.put(key, result)
+        return result
+
+    @staticmethod
+    def _synthesize(text):
+        """[(audio, fmt)] for `text`, joined into one clip when possible; [] if TTS fails."""
+        from utils.voice import synthesize_speech_chunks, concat_audio
+
+        try:
+            parts = list(synthesize_speech_chunks(text))
+        except Exception:
+            return []
+        if len(parts) > 1:
+            joined = concat_audio(parts)
+            if joined[0]:
+                parts = [joined]
+        return parts
+
+    async def speech(self, state, text, detached=False):
+        """
+        Memoized audio parts for `text` (the shape frontend.speak_text
+        replays). `detached` runs the synthesis on the detached pool, for
+        prefetches that may be cancelled.
+        """
+        if not text:
+            return []
+        key = ("tts", content_hash(text))
+        parts = state["memo"].get(key)
+        if parts is None:
+            if detached:
+                parts = await run_detached(self._synthesize, text)
+            else:
+                parts = await asyncio.to_thread(self._synthesize, text)
+            if parts:
+                state["memo"].put(key, parts)
+        return parts or []
+
+    async def stream_llm(self, state, prompt, stage, on_field=None, stop_when=None):
+        """
+        Stream an LLM call through the incremental JSON parser without
+        blocking the loop: a worker thread reads the stream and hands
+        deltas over a queue. on_field(path, value) fires on the loop as
+        each field completes; stop_when(parser) can end the stream early.
+        A prompt already answered in this session is replayed from the memo.
+        Returns (raw_text, parser); raw_text is None if the Groq call failed.
+        """
+        from utils.llm_client import stream_agent_llm
+
+        parser = IncrementalJSONParser()
+        memo = state["memo"]
+        key = ("llm", content_hash(stage, prompt))
+        cached = memo.get(key)
+        if cached is not None:
+            for path, value in parser.feed(cached):
+                if on_field:
+                    on_field(path, value)
+            return cached, parser
+
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        stop = threading.Event()
+
+        def put(item):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+            except RuntimeError:
+                # The loop is gone; nobody is reading any more.
+                stop.set()
+
+        def pump():
+            try:
+                stream = stream_agent_llm(prompt, stage=stage)
+                try:
+                    for delta in stream:
+                        if stop.is_set():
+                            break
+                        put(delta)
+                finally:
+                    stream.close()
+            except GroqError as e:
+                put(e)
+            finally:
+                put(_END)
+
+        reader = asyncio.ensure_future(run_detached(pump))
+        parts = []
+        while True:
+            item = await queue.get()
+            if item is _END:
+                break
+            if isinstance(item, GroqError):
+                self._warn(state, f"Model call failed: {item}")
+                return None, parser
+            parts.append(item)
+            for path, value in parser.feed(item):
+                if on_field:
+                    on_field(path, value)
+            if stop_when and stop_when(parser):
+                stop.set()
+                break
+        if not reader.done():
+            # The reader closes the stream at its next delta; don't wait for it.
+            reader.cancel()
+        raw = "".join(parts)
+        memo.put(key, raw)
+        return raw, parser
+
+    # -- the state machine -----------------------------------------------
+
+    def _questions(self, state):
+        return self.roles.get(state["role"])["base_questions"]
+
+    def _candidate_index(self, state):
+        covered = [f"{t.get('q') or ''} {t.get('a') or ''}" for t in state["history"]]
+        return next_question_index(self._questions(state), state["asked_questions"], covered, state["difficulty"])
+
+    def _advance_interview(self, state):
+        """Ask the next base question, or move to feedback once none are left."""
+        index = self._candidate_index(state)
+        if index is None:
+            state["stage"] = "feedback"
+            state["current_question"] = None
+            return None
+        state["asked_questions"].append(index)
+        state["current_question"] = self._questions(state)[index]
+        return state["current_question"]
+
+    async def start(self, state) -> dict:
+        """
+        Make sure the session has a question to answer (the first warmup
+        question, or the next base question after a restore).
+        Returns {"stage", "question", "audio"}.
+        """
+        if state["stage"] == "warmup" and state["warmup_turn"] == 0 and not state["warmup_question"]:
+            from utils.warmup_pool import get_warmup_pool
+
+            question = await asyncio.to_thread(get_warmup_pool().pop, state["role"], state["experience"])
+            if question is None:
+                raw = await self.call_llm(
+                    state, WARMUP_PROMPT.format(role=state["role"], experience=state["experience"]), "warmup"
+                )
+                parsed = await self.parse(
+                    state, "warmup", raw, "Return warmup JSON only: ",
+                    {"question": FIRST_WARMUP_QUESTION, "next": "ask_more"},
+                )
+                question = parsed["question"] or FIRST_WARMUP_QUESTION
+            state["warmup_question"] = question
+            state["warmup_turn"] = 1
+        elif state["stage"] == "interview" and state["current_question"] is None:
+            self._advance_interview(state)
+        question = current_question(state)
+        audio = await self.speech(state, question) if self.speak else []
+        return {"stage": state["stage"], "question": question, "audio": audio}
+
+    async def _warmup_turn(self, state, transcript):
+        raw, parser = await self.stream_llm(
+            state,
+            WARMUP_CONTINUE_PROMPT.format(
+                warmup_turn=state["warmup_turn"], user_answer=transcript, history=state["history"].to_prompt()
+            ),
+            "warmup",
+            stop_when=lambda p: p.get("next") == "start_interview"
+            or (p.get("next") is not None and p.get("question") is not None),
+        )
+        decision = await self.parse(
+            state, "warmup", raw, "Return warmup JSON only: ", {"next": "start_interview"},
+            partial=None if parser.done else top_level_fields(parser),
+        )
+        if decision.get("next") == "ask_more" and state["warmup_turn"] < MAX_WARMUP_TURNS:
+            state["warmup_turn"] += 1
+            state["warmup_question"] = decision.get("question") or "Tell me more about your recent project."
+            return
+        state["stage"] = "interview"
+        state["current_question"] = None
+        state["followup_count"] = 0
+        self._advance_interview(state)
+
+    async def _interview_turn(self, state, question, transcript):
+        role = state["role"]
+        prefetch = None
+        if self.prefetch:
+            # The next base question is known before the decision is; have
+            # its audio ready in case the decision is "next".
+            index = self._candidate_index(state)
+            if index is not None:
+                prefetch = asyncio.ensure_future(self.speech(state, self._questions(state)[index], detached=True))
+
+        fast = classify_answer(
+            transcript,
+            question,
+            follow_ups=self.roles.get(role)["follow_ups"],
+            followup_count=state["followup_count"],
+            asked=[t.get("q") for t in state["history"]],
+        )
+        if fast is not None:
+            decision, decided_by = {"action": fast.action, "question": fast.question}, "local"
+        else:
+            raw, parser = await self.stream_llm(
+                state,
+                INTERVIEW_DECISION_PROMPT.format(
+                    role=role,
+                    difficulty=state["difficulty"],
+                    current_question=question,
+                    user_answer=transcript,
+                    history_json=state["history"].to_prompt(),
+                ),
+                "interview",
+                stop_when=lambda p: p.get("action") in ("next", "end")
+                or (p.get("action") == "follow_up" and p.get("question") is not None),
+            )
+            decision = await self.parse(
+                state, "interview", raw, "Return valid INTERVIEW JSON only: ", {"action": "end"},
+                partial=None if parser.done else top_level_fields(parser),
+            )
+            decided_by = "llm"
+
+        action = decision.get("action", "end")
+        if action == "end" and (state["q_index"] + 1) < self.min_questions:
+            action = "next"
+
+        if action == "follow_up":
+            state["current_question"] = decision.get("question") or "Can you expand on that?"
+            state["followup_count"] += 1
+        elif action == "next":
+            state["q_index"] += 1
+            state["followup_count"] = 0
+            self._advance_interview(state)
+        else:
+            state["stage"] = "feedback"
+            state["current_question"] = None
+
+        if prefetch is not None:
+            if action == "next":
+                await prefetch
+            else:
+                # Not waited for; whatever is synthesized still lands in the TTS disk cache.
+                prefetch.cancel()
+        return decided_by
+
+    async def answer(self, state, audio_bytes: bytes, turn_id=None) -> dict:
+        """
+        Take the candidate's recorded answer to the current question and
+        advance the session. A turn_id already applied (e.g. the same
+        recording after a rerun) is not appended to the history twice.
+        Raises TranscriptionError if the recording can't be transcribed.
+        Returns {"stage", "question", "audio", "transcript", "prep",
+        "decided_by", "timings"}.
+        """
+        self._expect_answer(state)
+        started = time.perf_counter()
+        transcript, report = await self.transcribe(state, audio_bytes)
+        if turn_id is None:
+            turn_id = content_hash(state["stage"], state["warmup_turn"], state["q_index"], state["followup_count"], audio_bytes)
+        return await self.answer_transcript(state, transcript, report.describe(), turn_id, started)
+
+    async def answer_stream(self, state, transcriber, turn_id=None) -> dict:
+        """
+        answer() for audio that was streamed into a
+        utils.streaming_stt.StreamingTranscriber while it was recorded:
+        only the segments still in flight are waited for.
+        """
+        self._expect_answer(state)
+        started = time.perf_counter()
+        transcript, report = await asyncio.to_thread(transcriber.finish)
+        if turn_id is None:
+            turn_id = content_hash(state["stage"], state["warmup_turn"], state["q_index"], state["followup_count"], transcript)
+        return await self.answer_transcript(state, transcript, report.describe(), turn_id, started)
+
+    @staticmethod
+    def _expect_answer(state):
+        if state["stage"] not in ("warmup", "interview"):
+            raise ValueError(f"no answer expected in the {state['stage']} stage")
+
+    async def answer_transcript(self, state, transcript: str, prep="", turn_id=None, started=None) -> dict:
+        """Advance the session with an already transcribed answer (see answer())."""
+        self._expect_answer(state)
+        transcribed = time.perf_counter()
+        started = transcribed if started is None else started
+        stage = state["stage"]
+        question = current_question(state)
+        if turn_id is None:
+            turn_id = content_hash(stage, state["warmup_turn"], state["q_index"], state["followup_count"], transcript)
+        if state["last_turn"] != turn_id:
+            state["history"].append({"q": question, "a": transcript})
+            if stage == "interview":
+                state["scorer"].submit(state["role"], question, transcript, follow_up=state["followup_count"] > 0)
+            state["last_turn"] = turn_id
+
+        if stage == "warmup":
+            await self._warmup_turn(state, transcript)
+            decided_by = "llm"
+        else:
+            decided_by = await self._interview_turn(state, question, transcript)
+        decided = time.perf_counter()
+
+        next_question = current_question(state)
+        audio = await self.speech(state, next_question) if self.speak else []
+        done = time.perf_counter()
+        metrics.record(f"engine.turn.{stage}", done - started)
+        return {
+            "stage": state["stage"],
+            "question": next_question,
+            "audio": audio,
+            "transcript": transcript,
+            "prep": prep,
+            "decided_by": decided_by,
+            "timings": {"stt": transcribed - started, "decide": decided - transcribed, "tts": done - decided,
+                        "total": done - started},
+        }
+
+    async def feedback(self, state, on_field=None) -> dict:
+        """
+        The final feedback (a FeedbackResult dict), generated once per
+        session. on_field(path, value) fires as sections become available.
+        """
+        if state["feedback_data"] is not None:
+            return state["feedback_data"]
+        role = state["role"]
+        scored = await asyncio.to_thread(state["scorer"].collect, role)
+        if scored:
+            # Scores come from the per-answer calls; only the text is generated now.
+            aggregate = aggregate_scores(scored)
+            if on_field:
+                on_field(("feedback", "scores"), aggregate["scores"])
+            raw, _ = await self.stream_llm(state, synthesis_prompt(role, aggregate), "synthesis", on_field=on_field)
+            synthesis = await self.parse(
+                state, "synthesis", raw, "Return STRICT FEEDBACK JSON ONLY: ", synthesis_fallback(aggregate)
+            )
+            data = build_feedback(aggregate, synthesis)
+        else:
+            raw, _ = await self.stream_llm(
+                state,
+                FINAL_FEEDBACK_PROMPT.format(role=role, history_json=state["history"].to_json()),
+                "feedback",
+                on_field=on_field,
+            )
+            data = await self.parse(state, "feedback", raw, "Return STRICT FEEDBACK JSON ONLY: ", FALLBACK_FEEDBACK)
+        state["feedback_data"] = data
+        return data
+
+
+def feedback_speech_text(data: dict) -> str:
+    """The spoken summary of a FeedbackResult."""
+    feedback = data["feedback"]
+    scores = feedback.get("scores", {})
+    return (
+        f"Final feedback. Structure {scores.get('structure', 3)} out of 5. "
+        f"Clarity {scores.get('clarity', 3)} out of 5. "
+        f"Strengths: {', '.join(feedback.get('strengths', []))}. "
+        f"Improvements: {', '.join(feedback.get('improvements', []))}. "
+        f"Summary: {feedback.get('summary','')}"
+    )
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> InterviewEngine:
+    """The process-wide engine over the default role registry."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = InterviewEngine()
+    return _engine
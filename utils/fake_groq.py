@@ -0,0 +1,353 @@
+"""
+Local stand-in for the Groq endpoints this app uses, for benchmarks and
+load tests without an API key:
+
+    POST /openai/v1/chat/completions     (plain and stream=true SSE)
+    POST /openai/v1/audio/transcriptions
+    POST /openai/v1/audio/speech
+
+Point the app at it with GROQ_BASE_URL=http://127.0.0.1:<port> and any
+GROQ_API_KEY. Latency and failures are injected per endpoint.
+
+    python -m utils.fake_groq --port 8900 --chat-ms 400 --fail-rate 0.02
+"""
+import argparse
+import io
+import itertools
+import json
+import random
+import sys
+import threading
+import time
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CHAT_PATH = "/openai/v1/chat/completions"
+STT_PATH = "/openai/v1/audio/transcriptions"
+TTS_PATH = "/openai/v1/audio/speech"
+
+DEFAULT_SCRIPT = {
+    "warmup": [
+        {"stage": "warmup", "question": "Hi! What got you interested in this role?", "next": "ask_more"},
+        {"stage": "warmup", "question": "Great — let's begin the interview.", "next": "start_interview"},
+    ],
+    "interview": [
+        {"stage": "interview", "action": "follow_up", "question": "What trade-offs did you weigh there?"},
+        {"stage": "interview", "action": "next", "question": None},
+        {"stage": "interview", "action": "next", "question": None},
+        {"stage": "interview", "action": "end", "question": None},
+    ],
+    "feedback": [
+        {
+            "stage": "feedback",
+            "feedback": {
+                "scores": {
+                    "structure": 4,
+                    "clarity": 4,
+                    "examples": 3,
+                    "communication": 4,
+                    "confidence": 3,
+                    "technical_depth": 3,
+                    "follow_up_handling": 4,
+                },
+                "strengths": ["Clear framing of the problem.", "Concrete metrics in the project answer."],
+                "improvements": ["Quantify impact earlier.", "Close answers with the result."],
+                "sample_answer": "Situation: ... Task: ... Action: ... Result: ...",
+                "summary": "Solid, structured answers; tighten the results and trade-offs.",
+            },
+        }
+    ],
+    "scoring": [
+        {
+            "stage": "scoring",
+            "scores": {"structure": 4, "clarity": 4, "examples": 3, "communication": 4, "confidence": 4,
+                       "technical_depth": 3, "follow_up_handling": 3},
+            "strength": "Concrete numbers for the outcome.",
+            "improvement": "Explain why the design was chosen over alternatives.",
+        },
+        {
+            "stage": "scoring",
+            "scores": {"structure": 3, "clarity": 4, "examples": 2, "communication": 4, "confidence": 3,
+                       "technical_depth": 3, "follow_up_handling": 4},
+            "strength": "Clear rollout plan.",
+            "improvement": "Back the claim with a specific example.",
+        },
+    ],
+    "synthesis": [
+        {
+            "stage": "feedback",
+            "feedback": {
+                "strengths": ["Quantifies impact.", "Clear rollout thinking."],
+                "improvements": ["Lead with the trade-offs.", "Use one concrete example per claim."],
+                "sample_answer": "Situation: ... Task: ... Action: ... Result: ...",
+                "summary": "Structured and clear; deepen trade-offs and examples.",
+            },
+        }
+    ],
+    "transcripts": [
+        "I led the migration of our billing service to a queue based design and cut p95 latency by forty percent.",
+        "We measured it with load tests before and after, and rolled it out behind a feature flag.",
+        "Mostly I would add better alerting and write the runbook earlier.",
+    ],
+}
+
+
+def _stage_of(messages) -> str:
+    """Which canned output to serve, judged from the user prompt."""
+    text = (messages[-1].get("content") or "").upper() if messages else ""
+    for stage in ("scoring", "synthesis", "feedback", "warmup", "interview"):
+        marker = stage.upper()
+        if f"{marker} MODE" in text or f"{marker} JSON" in text:
+            return stage
+    return "interview"
+
+
+def silent_wav(seconds: float, rate=16000) -> bytes:
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(b"\0\0" * int(seconds * rate))
+    return buf.getvalue()
+
+
+class FakeGroq:
+    """Shared state of the stand-in: script, fault injection and counters."""
+
+    def __init__(self, script=None, latency_ms=None, jitter=0.2, fail_rate=0.0, rate_limit_rate=0.0,
+                 tokens_per_second=400.0, seed=None):
+        script = script or DEFAULT_SCRIPT
+        self.cycles = {key: itertools.cycle(values) for key, values in script.items() if values}
+        self.latency_ms = {"chat": 300, "stt": 250, "tts": 200}
+        self.latency_ms.update(latency_ms or {})
+        self.jitter = jitter
+        self.fail_rate = fail_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.tokens_per_second = tokens_per_second
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calls = {"chat": 0, "stt": 0, "tts": 0}
+        self.failures = {"chat": 0, "stt": 0, "tts": 0}
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def next_output(self, key):
+        with self.lock:
+            return next(self.cycles[key])
+
+    def delay(self, endpoint) -> float:
+        base = self.latency_ms[endpoint] / 1000
+        with self.lock:
+            return max(0.0, base * (1 + self.rng.uniform(-self.jitter, self.jitter)))
+
+    def fault(self, endpoint):
+        """None, or an (status, message) to fail this request with."""
+        with self.lock:
+            self.calls[endpoint] += 1
+            roll = self.rng.random()
+            if roll < self.rate_limit_rate:
+                self.failures[endpoint] += 1
+                return 429, "rate limited (injected)"
+            if roll < self.rate_limit_rate + self.fail_rate:
+                self.failures[endpoint] += 1
+                return 503, "unavailable (injected)"
+        return None
+
+    def count_bytes(self, received=0, sent=0):
+        with self.lock:
+            self.bytes_in += received
+            self.bytes_out += sent
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "calls": dict(self.calls),
+                "failures": dict(self.failures),
+                "bytes_in": self.bytes_in,
+                "bytes_out": self.bytes_out,
+            }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    fake = None  # set per server class
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body: bytes, content_type="application/json", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+        self.fake.count_bytes(sent=len(body))
+
+    def _send_json(self, status, obj, headers=None):
+        self._send(status, json.dumps(obj).encode(), headers=headers)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        self.fake.count_bytes(received=length)
+        path = self.path.split("?")[0]
+        endpoint = {CHAT_PATH: "chat", STT_PATH: "stt", TTS_PATH: "tts"}.get(path)
+        if endpoint is None:
+            self._send_json(404, {"error": {"message": f"unknown path {path}"}})
+            return
+
+        fault = self.fake.fault(endpoint)
+        time.sleep(self.fake.delay(endpoint))
+        if fault:
+            status, message = fault
+            headers = {"retry-after": "1"} if status == 429 else None
+            self._send_json(status, {"error": {"message": message}}, headers=headers)
+            return
+
+        if endpoint == "chat":
+            self._chat(json.loads(body or b"{}"))
+        elif endpoint == "stt":
+            self._send_json(200, {"text": self.fake.next_output("transcripts")})
+        else:
+            text = json.loads(body or b"{}").get("input", "")
+            self._send(200, silent_wav(min(30.0, 0.06 * len(text))), content_type="audio/wav")
+
+    def _chat(self, request):
+        messages = request.get("messages", [])
+        stage = _stage_of(messages)
+        content = json.dumps(self.fake.next_output(stage))
+        prompt_tokens = sum(len(m.get("content") or "") for m in messages) // 4
+        completion_tokens = max(1, len(content) // 4)
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                 "total_tokens": prompt_tokens + completion_tokens}
+        base = {"id": "chatcmpl-fake", "created": int(time.time()), "model": request.get("model", "fake")}
+
+        if not request.get("stream"):
+            self._send_json(200, dict(base, object="chat.completion", usage=usage, choices=[{
+                "index": 0, "finish_reason": "stop",
+                "message": {"role": "assistant", "content": content},
+            }]))
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        # ~4 characters per token, 16 characters per chunk.
+        per_piece = 4 / self.fake.tokens_per_second
+        pieces = [content[i:i + 16] for i in range(0, len(content), 16)]
+        try:
+            for i, piece in enumerate(pieces):
+                chunk = dict(base, object="chat.completion.chunk", choices=[{
+                    "index": 0, "delta": {"content": piece},
+                    "finish_reason": "stop" if i == len(pieces) - 1 else None,
+                }])
+                if i == len(pieces) - 1:
+                    chunk["x_groq"] = {"usage": usage}
+                self._write_chunk(f"data: {json.dumps(chunk)}\n\n".encode())
+                time.sleep(per_piece)
+            self._write_chunk(b"data: [DONE]\n\n")
+            self._write_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            # Client stopped reading early (e.g. decision already parsed).
+            self.close_connection = True
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+        self.fake.count_bytes(sent=len(data))
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients hang up mid-stream on purpose (early-stopped decisions);
+        # anything else is still reported.
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class FakeGroqServer:
+    """
+    Run the stand-in on a background thread:
+
+        with FakeGroqServer(FakeGroq(latency_ms={"chat": 50})) as server:
+            os.environ["GROQ_BASE_URL"] = server.base_url
+    """
+
+    def __init__(self, fake=None, host="127.0.0.1", port=0):
+        self.fake = fake or FakeGroq()
+        handler = type("FakeGroqHandler", (_Handler,), {"fake": self.fake})
+        self.httpd = _Server((host, port), handler)
+        self.thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="fake-groq", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def add_fake_arguments(parser):
+    parser.add_argument("--script", help="JSON file with canned outputs keyed by stage (warmup, interview, feedback, "
+                        "scoring, synthesis) and transcripts")
+    parser.add_argument("--chat-ms", type=float, default=300)
+    parser.add_argument("--stt-ms", type=float, default=250)
+    parser.add_argument("--tts-ms", type=float, default=200)
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument("--seed", type=int)
+
+
+def fake_from_args(args) -> FakeGroq:
+    script = None
+    if args.script:
+        with open(args.script, encoding="utf-8") as f:
+            script = dict(DEFAULT_SCRIPT, **json.load(f))
+    return FakeGroq(
+        script=script,
+        latency_ms={"chat": args.chat_ms, "stt": args.stt_ms, "tts": args.tts_ms},
+        fail_rate=args.fail_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        seed=args.seed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the Groq API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    add_fake_arguments(parser)
+    args = parser.parse_args()
+
+    server = FakeGroqServer(fake_from_args(args), host=args.host, port=args.port)
+    print(f"fake Groq listening on {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print(json.dumps(server.fake.stats()))
+
+
+if __name__ == "__main__":
+    main()
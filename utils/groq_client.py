@@ -0,0 +1,164 @@
+import os
+import random
+import threading
+import time
+from pathlib import Path
+
+from utils import groq_scheduler
+from utils.lazy_import import optional_module
+
+# The SDK and its HTTP stack are imported when the first client is built.
+groq = optional_module("groq")
+httpx = optional_module("httpx")
+
+
+def load_env():
+    """Load the nearest .env above this package; python-dotenv is only imported if there is one."""
+    here = Path(__file__).resolve().parent
+    for directory in (here, *here.parents):
+        if (directory / ".env").is_file():
+            from dotenv import load_dotenv
+
+            load_dotenv(directory / ".env")
+            return True
+    return False
+
+
+load_env()
+GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+
+# Per-operation request timeouts, in seconds.
+TIMEOUTS = {
+    "chat": float(os.getenv("GROQ_CHAT_TIMEOUT", "30")),
+    "stt": float(os.getenv("GROQ_STT_TIMEOUT", "60")),
+    "tts": float(os.getenv("GROQ_TTS_TIMEOUT", "30")),
+}
+CONNECT_TIMEOUT = float(os.getenv("GROQ_CONNECT_TIMEOUT", "5"))
+MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", "3"))
+BACKOFF_BASE = float(os.getenv("GROQ_BACKOFF_BASE", "0.5"))
+BACKOFF_CAP = float(os.getenv("GROQ_BACKOFF_CAP", "8"))
+MAX_CONNECTIONS = int(os.getenv("GROQ_MAX_CONNECTIONS", "32"))
+MAX_KEEPALIVE = int(os.getenv("GROQ_MAX_KEEPALIVE", "16"))
+KEEPALIVE_EXPIRY = float(os.getenv("GROQ_KEEPALIVE_EXPIRY", "60"))
+
+
+class GroqError(Exception):
+    """Base class for every failure talking to Groq."""
+
+
+class GroqNotConfigured(GroqError):
+    """The groq package or GROQ_API_KEY is missing."""
+
+
+class GroqTimeout(GroqError):
+    pass
+
+
+class GroqRateLimited(GroqError):
+    pass
+
+
+class GroqServerError(GroqError):
+    """5xx responses and dropped connections."""
+
+
+class GroqRequestError(GroqError):
+    """Non-retryable 4xx responses (bad request, auth, ...)."""
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """The process-wide Groq client, created on first use."""
+    global _client
+    if _client is not None:
+        return _client
+    with _client_lock:
+        if _client is None:
+            if not groq:
+                raise GroqNotConfigured("groq package is not installed")
+            if not GROQ_API_KEY:
+                raise GroqNotConfigured("GROQ_API_KEY is not set")
+            http_client = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=MAX_CONNECTIONS,
+                    max_keepalive_connections=MAX_KEEPALIVE,
+                    keepalive_expiry=KEEPALIVE_EXPIRY,
+                ),
+                timeout=httpx.Timeout(TIMEOUTS["chat"], connect=CONNECT_TIMEOUT),
+            )
+            # Retries are handled by call_with_retry so every operation
+            # shares one policy.
+            _client = groq.Groq(api_key=GROQ_API_KEY, http_client=http_client, max_retries=0)
+    return _client
+
+
+def is_configured() -> bool:
+    return bool(groq) and bool(GROQ_API_KEY)
+
+
+def _retry_after(exc):
+    response = getattr(exc, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def translate_error(exc) -> GroqError:
+    """Map a groq SDK exception onto our typed errors."""
+    if isinstance(exc, GroqError):
+        return exc
+    if groq.loaded:
+        if isinstance(exc, groq.APITimeoutError):
+            return GroqTimeout(str(exc))
+        if isinstance(exc, groq.RateLimitError):
+            return GroqRateLimited(str(exc))
+        if isinstance(exc, groq.APIConnectionError):
+            return GroqServerError(str(exc))
+        if isinstance(exc, groq.APIStatusError):
+            if exc.status_code >= 500:
+                return GroqServerError(f"{exc.status_code}: {exc}")
+            return GroqRequestError(f"{exc.status_code}: {exc}")
+    return GroqError(str(exc))
+
+
+def backoff_delay(attempt: int, retry_after=None) -> float:
+    """Full-jitter exponential backoff, never shorter than Retry-After."""
+    delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)))
+    if retry_after:
+        delay = max(delay, min(retry_after, BACKOFF_CAP))
+    return delay
+
+
+def call_with_retry(op: str, fn, max_retries=MAX_RETRIES, priority=None):
+    """
+    Run fn(client) with the timeout for `op` ("chat", "stt" or "tts"),
+    retrying timeouts, 429s and 5xx with jittered backoff.
+    Each attempt waits for a groq_scheduler slot at `priority` (the op's
+    default when None); a 429 pauses the whole endpoint.
+    Raises a GroqError subclass when retries are exhausted.
+    """
+    client = get_client().with_options(timeout=TIMEOUTS[op])
+    attempt = 0
+    while True:
+        try:
+            with groq_scheduler.slot(op, priority):
+                return fn(client)
+        except Exception as exc:
+            err = translate_error(exc)
+            retryable = isinstance(err, (GroqTimeout, GroqRateLimited, GroqServerError))
+            if not retryable or attempt >= max_retries:
+                raise err from exc
+            delay = backoff_delay(attempt, _retry_after(exc))
+            attempt += 1
+            if isinstance(err, GroqRateLimited):
+                # Everyone queued for this endpoint waits it out, then
+                # resumes in priority order through the scheduler.
+                groq_scheduler.pause(op, delay)
+            else:
+                time.sleep(delay)
@@ -0,0 +1,209 @@
+"""
+Process-wide admission control for Groq requests.
+
+Every request made through groq_client.call_with_retry first takes a
+slot for its endpoint ("chat", "stt", "tts"). Per endpoint there is:
+  - a token bucket (GROQ_<OP>_RPM requests per minute, bursts of
+    GROQ_<OP>_BURST; RPM 0 means unlimited)
+  - a cap on requests in flight (GROQ_<OP>_CONCURRENCY)
+  - a strict priority queue: PRIORITY_INTERACTIVE (STT and decisions a
+    candidate is waiting on) before PRIORITY_SPEECH (TTS) before
+    PRIORITY_BACKGROUND (cache warming, prefetching)
+A request queued with a PriorityHandle can be promoted while it waits
+(e.g. background scoring the candidate is now waiting on).
+A 429 pauses the whole endpoint for the Retry-After period, so waiting
+callers resume in priority order instead of all retrying at once.
+
+A streamed completion holds its slot until the response starts, not
+until the stream is read to the end.
+"""
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from utils import metrics
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_SPEECH = 1
+PRIORITY_BACKGROUND = 2
+
+DEFAULT_PRIORITY = {"chat": PRIORITY_INTERACTIVE, "stt": PRIORITY_INTERACTIVE, "tts": PRIORITY_SPEECH}
+_DEFAULT_CONCURRENCY = {"chat": 16, "stt": 8, "tts": 8}
+
+
+def _limits(op):
+    prefix = f"GROQ_{op.upper()}"
+    rpm = float(os.getenv(f"{prefix}_RPM", "0"))
+    burst = float(os.getenv(f"{prefix}_BURST", str(max(1.0, rpm / 6))))
+    concurrency = int(os.getenv(f"{prefix}_CONCURRENCY", str(_DEFAULT_CONCURRENCY.get(op, 8))))
+    return rpm, burst, concurrency
+
+
+class TokenBucket:
+    def __init__(self, per_second: float, burst: float):
+        self.rate = per_second
+        self.capacity = max(1.0, burst)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def take(self, now: float) -> float:
+        """Take one token and return 0, or return the seconds until one is available."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class PriorityHandle:
+    """A priority that can be raised while its request is still queued."""
+
+    def __init__(self, value=PRIORITY_BACKGROUND):
+        self.value = value
+        self._lock = threading.Lock()
+        self._waiting_on = None
+
+    def promote(self, value=PRIORITY_INTERACTIVE):
+        with self._lock:
+            if value >= self.value:
+                return
+            self.value = value
+            endpoint = self._waiting_on
+        if endpoint is not None:
+            with endpoint.cond:
+                endpoint.cond.notify_all()
+
+    def _wait_on(self, endpoint):
+        with self._lock:
+            self._waiting_on = endpoint
+
+
+def _level(priority) -> int:
+    return priority.value if isinstance(priority, PriorityHandle) else priority
+
+
+class EndpointScheduler:
+    """Priority queue, concurrency cap and rate limit for one endpoint."""
+
+    def __init__(self, op: str, rpm=0.0, burst=1.0, max_concurrency=8):
+        self.op = op
+        self.bucket = TokenBucket(rpm / 60, burst) if rpm > 0 else None
+        self.max_concurrency = max(1, max_concurrency)
+        self.cond = threading.Condition()
+        self.waiting = []
+        self.active = 0
+        self.blocked_until = 0.0
+        self.admitted = 0
+        self.throttled = 0
+        self.max_queued = 0
+        self._seq = itertools.count()
+
+    def _publish(self):
+        metrics.set_gauge(f"groq.{self.op}.queued", len(self.waiting))
+        metrics.set_gauge(f"groq.{self.op}.active", self.active)
+
+    def acquire(self, priority=PRIORITY_INTERACTIVE):
+        """Wait for a slot; `priority` is a PRIORITY_* level or a PriorityHandle."""
+        started = time.monotonic()
+        handle = priority if isinstance(priority, PriorityHandle) else None
+        if handle is not None:
+            handle._wait_on(self)
+        with self.cond:
+            ticket = (_level(priority), next(self._seq))
+            heapq.heappush(self.waiting, ticket)
+            self.max_queued = max(self.max_queued, len(self.waiting))
+            self._publish()
+            try:
+                while True:
+                    if handle is not None and handle.value < ticket[0]:
+                        # Promoted while queued: keep the place among equals by sequence.
+                        self.waiting.remove(ticket)
+                        ticket = (handle.value, ticket[1])
+                        self.waiting.append(ticket)
+                        heapq.heapify(self.waiting)
+                    if self.waiting[0] != ticket or self.active >= self.max_concurrency:
+                        self.cond.wait()
+                        continue
+                    wait = self.blocked_until - time.monotonic()
+                    if wait <= 0 and self.bucket is not None:
+                        wait = self.bucket.take(time.monotonic())
+                    if wait <= 0:
+                        break
+                    self.cond.wait(wait)
+            except BaseException:
+                self.waiting.remove(ticket)
+                heapq.heapify(self.waiting)
+                self.cond.notify_all()
+                raise
+            finally:
+                if handle is not None:
+                    handle._wait_on(None)
+            heapq.heappop(self.waiting)
+            self.active += 1
+            self.admitted += 1
+            self._publish()
+            # The next in line may also fit under the cap.
+            self.cond.notify_all()
+        metrics.record(f"groq.queue.{self.op}", time.monotonic() - started, priority=ticket[0])
+
+    def release(self):
+        with self.cond:
+            self.active -= 1
+            self._publish()
+            self.cond.notify_all()
+
+    def pause(self, seconds: float):
+        """Hold every queued request for `seconds` (e.g. after a 429)."""
+        with self.cond:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.throttled += 1
+            self.cond.notify_all()
+
+    def stats(self) -> dict:
+        with self.cond:
+            return {
+                "queued": len(self.waiting),
+                "active": self.active,
+                "max_queued": self.max_queued,
+                "admitted": self.admitted,
+                "throttled": self.throttled,
+            }
+
+
+_endpoints = {}
+_endpoints_lock = threading.Lock()
+
+
+def get_endpoint(op: str) -> EndpointScheduler:
+    with _endpoints_lock:
+        endpoint = _endpoints.get(op)
+        if endpoint is None:
+            rpm, burst, concurrency = _limits(op)
+            endpoint = _endpoints[op] = EndpointScheduler(op, rpm, burst, concurrency)
+    return endpoint
+
+
+@contextmanager
+def slot(op: str, priority=None):
+    """Hold one admitted request slot for `op` while the block runs."""
+    endpoint = get_endpoint(op)
+    endpoint.acquire(DEFAULT_PRIORITY.get(op, PRIORITY_INTERACTIVE) if priority is None else priority)
+    try:
+        yield endpoint
+    finally:
+        endpoint.release()
+
+
+def pause(op: str, seconds: float):
+    get_endpoint(op).pause(seconds)
+
+
+def scheduler_stats() -> dict:
+    """{op: {queued, active, max_queued, admitted, throttled}}."""
+    with _endpoints_lock:
+        endpoints = dict(_endpoints)
+    return {op: e.stats() for op, e in sorted(endpoints.items())}
@@ -0,0 +1,104 @@
+import json
+import os
+import re
+
+HISTORY_KEEP_TURNS = int(os.getenv("HISTORY_KEEP_TURNS", "4"))
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "800"))
+SUMMARY_CHARS = 160
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English)."""
+    return (len(text) + 3) // 4
+
+
+def compact_json(obj) -> str:
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+def _shorten(text: str, limit: int) -> str:
+    text = " ".join((text or "").split())
+    if len(text) <= limit:
+        return text
+    first = _SENTENCE_END.split(text, 1)[0]
+    if len(first) <= limit:
+        return first
+    return text[:limit - 1].rstrip() + "…"
+
+
+class InterviewHistory:
+    """
+    Q&A history for one session.
+
+    `turns` keeps every answer verbatim (final feedback needs them all).
+    The prompt view keeps only the last `keep_turns` verbatim and folds
+    older turns into one compact summary line each, dropping the oldest
+    lines once the view exceeds `token_budget`. Each fold only touches
+    the turn being folded, and the serialized view is cached until the
+    next append.
+    """
+
+    def __init__(self, keep_turns=HISTORY_KEEP_TURNS, token_budget=HISTORY_TOKEN_BUDGET):
+        self.keep_turns = max(1, keep_turns)
+        self.token_budget = token_budget
+        self.turns = []
+        self.summary = []
+        self.omitted = 0
+        self._folded = 0
+        self._prompt = None
+
+    def append(self, turn: dict):
+        self.turns.append({"q": turn.get("q"), "a": turn.get("a")})
+        self._prompt = None
+        self._fold()
+
+    def __len__(self):
+        return len(self.turns)
+
+    def __iter__(self):
+        return iter(self.turns)
+
+    def __getitem__(self, index):
+        return self.turns[index]
+
+    @property
+    def recent(self):
+        return self.turns[self._folded:]
+
+    def _summary_tokens(self):
+        return sum(estimate_tokens(line) for line in self.summary)
+
+    def _fold(self):
+        recent_tokens = estimate_tokens(compact_json(self.recent))
+        while len(self.recent) > self.keep_turns or (
+            len(self.recent) > 1 and recent_tokens + self._summary_tokens() > self.token_budget
+        ):
+            turn = self.turns[self._folded]
+            self.summary.append(
+                f"Q: {_shorten(turn['q'], SUMMARY_CHARS // 2)} A: {_shorten(turn['a'], SUMMARY_CHARS)}"
+            )
+            self._folded += 1
+            recent_tokens = estimate_tokens(compact_json(self.recent))
+
+        while self.summary and recent_tokens + self._summary_tokens() > self.token_budget:
+            self.summary.pop(0)
+            self.omitted += 1
+
+    def to_prompt(self) -> str:
+        """Compact JSON for WARMUP_CONTINUE_PROMPT / INTERVIEW_DECISION_PROMPT."""
+        if self._prompt is None:
+            view = {"recent": self.recent}
+            if self.summary or self.omitted:
+                view = {
+                    "earlier_turns": len(self.summary) + self.omitted,
+                    "summary": self.summary,
+                    "recent": self.recent,
+                }
+            self._prompt = compact_json(view)
+        return self._prompt
+
+    def to_json(self) -> str:
+        """Every turn verbatim, compactly serialized."""
+        return compact_json(self.turns)
@@ -0,0 +1,299 @@
+import json
+import re
+from collections import Counter
+from typing import List, Optional, TypedDict
+
+# How each stage's model output got turned into a dict:
+#   partial  - fields parsed from a stream that was stopped early
+#   strict   - json.loads on the raw text
+#   local    - tolerant local extraction (fences, trailing commas, quotes)
+#   repair   - a second LLM "return JSON only" call
+#   fallback - hard-coded default, nothing usable came back
+PARSE_PATHS = Counter()
+
+
+class WarmupDecision(TypedDict):
+    question: str
+    next: str
+
+
+class InterviewDecision(TypedDict):
+    action: str
+    question: Optional[str]
+
+
+class Feedback(TypedDict):
+    scores: dict
+    strengths: List[str]
+    improvements: List[str]
+    sample_answer: str
+    summary: str
+
+
+class FeedbackResult(TypedDict):
+    feedback: Feedback
+
+
+class AnswerScore(TypedDict):
+    scores: dict
+    strength: str
+    improvement: str
+
+
+class FeedbackSynthesis(TypedDict):
+    strengths: List[str]
+    improvements: List[str]
+    sample_answer: str
+    summary: str
+
+
+WARMUP_NEXT = ("ask_more", "start_interview")
+INTERVIEW_ACTIONS = ("follow_up", "next", "end")
+
+_FENCE_RE = re.compile(r"^\s*```[a-zA-Z]*\s*|\s*```\s*$")
+_TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+_PY_LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+
+def _outermost_object(text: str) -> str:
+    """Slice from the first '{' to its matching '}', ignoring braces in strings."""
+    start = text.find("{")
+    if start < 0:
+        raise ValueError("no JSON object found")
+    depth = 0
+    quote = None
+    escape = False
+    for i in range(start, len(text)):
+        c = text[i]
+        if quote:
+            if escape:
+                escape = False
+            elif c == "\\":
+                escape = True
+            elif c == quote:
+                quote = None
+        elif c in "\"'":
+            quote = c
+        elif c == "{":
+            depth += 1
+        elif c == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    # Truncated output: close whatever is still open and let json decide.
+    return text[start:] + "}" * depth
+
+
+def _normalize_quotes(text: str) -> str:
+    """Rewrite single-quoted strings and Python literals as JSON."""
+    out = []
+    i = 0
+    n = len(text)
+    while i < n:
+        c = text[i]
+        if c in "\"'":
+            quote = c
+            j = i + 1
+            chars = []
+            while j < n and text[j] != quote:
+                if text[j] == "\\" and j + 1 < n:
+                    if quote == "'" and text[j + 1] == "'":
+                        chars.append("'")
+                    else:
+                        chars.append(text[j:j + 2])
+                    j += 2
+                    continue
+                if quote == "'" and text[j] == '"':
+                    chars.append('\\"')
+                else:
+                    chars.append(text[j])
+                j += 1
+            out.append('"' + "".join(chars) + '"')
+            i = j + 1
+            continue
+        if c.isalpha():
+            j = i
+            while j < n and (text[j].isalnum() or text[j] == "_"):
+                j += 1
+            word = text[i:j]
+            out.append(_PY_LITERALS.get(word, word))
+            i = j
+            continue
+        out.append(c)
+        i += 1
+    return "".join(out)
+
+
+def extract_json_object(raw: str) -> dict:
+    """
+    Best-effort local recovery of a JSON object from model output.
+    Raises ValueError when nothing parseable is found.
+    """
+    if not isinstance(raw, str):
+        raise ValueError("model output is not text")
+    text = _FENCE_RE.sub("", raw.strip())
+    candidate = _outermost_object(text)
+    for attempt in (
+        lambda s: s,
+        lambda s: _TRAILING_COMMA_RE.sub(r"\1", s),
+        lambda s: _TRAILING_COMMA_RE.sub(r"\1", _normalize_quotes(s)),
+    ):
+        try:
+            parsed = json.loads(attempt(candidate))
+        except ValueError:
+            continue
+        if isinstance(parsed, dict):
+            return parsed
+    raise ValueError("could not recover a JSON object")
+
+
+def validate_warmup(data: dict) -> WarmupDecision:
+    nxt = data.get("next", "start_interview")
+    if nxt not in WARMUP_NEXT:
+        raise ValueError(f"invalid warmup next: {nxt!r}")
+    question = data.get("question")
+    if not isinstance(question, str) or not question.strip():
+        if nxt == "ask_more":
+            raise ValueError("warmup question missing")
+        question = ""
+    return {"question": question.strip(), "next": nxt}
+
+
+def validate_interview(data: dict) -> InterviewDecision:
+    action = data.get("action")
+    if action not in INTERVIEW_ACTIONS:
+        raise ValueError(f"invalid interview action: {action!r}")
+    question = data.get("question")
+    if action == "follow_up":
+        if not isinstance(question, str) or not question.strip():
+            raise ValueError("follow_up without a question")
+        question = question.strip()
+    else:
+        question = None
+    return {"action": action, "question": question}
+
+
+def _score(value) -> int:
+    try:
+        score = int(round(float(value)))
+    except (TypeError, ValueError):
+        raise ValueError(f"invalid score: {value!r}")
+    return min(5, max(1, score))
+
+
+def _str_list(value) -> List[str]:
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list):
+        raise ValueError("expected a list of strings")
+    return [str(v).strip() for v in value if str(v).strip()]
+
+
+def validate_feedback(data: dict) -> FeedbackResult:
+    fb = data.get("feedback", data)
+    if not isinstance(fb, dict) or not isinstance(fb.get("scores"), dict):
+        raise ValueError("feedback scores missing")
+    scores = {k: _score(v) for k, v in fb["scores"].items()}
+    for key in ("structure", "clarity"):
+        if key not in scores:
+            raise ValueError(f"feedback score {key!r} missing")
+    return {
+        "feedback": {
+            "scores": scores,
+            "strengths": _str_list(fb.get("strengths", [])),
+            "improvements": _str_list(fb.get("improvements", [])),
+            "sample_answer": str(fb.get("sample_answer") or ""),
+            "summary": str(fb.get("summary") or ""),
+        }
+    }
+
+
+def validate_answer_score(data: dict) -> AnswerScore:
+    if not isinstance(data.get("scores"), dict):
+        raise ValueError("answer scores missing")
+    scores = {k: _score(v) for k, v in data["scores"].items()}
+    for key in ("structure", "clarity"):
+        if key not in scores:
+            raise ValueError(f"answer score {key!r} missing")
+    return {
+        "scores": scores,
+        "strength": str(data.get("strength") or "").strip(),
+        "improvement": str(data.get("improvement") or "").strip(),
+    }
+
+
+def validate_synthesis(data: dict) -> FeedbackSynthesis:
+    fb = data.get("feedback", data)
+    if not isinstance(fb, dict) or not str(fb.get("summary") or "").strip():
+        raise ValueError("feedback summary missing")
+    return {
+        "strengths": _str_list(fb.get("strengths", [])),
+        "improvements": _str_list(fb.get("improvements", [])),
+        "sample_answer": str(fb.get("sample_answer") or ""),
+        "summary": str(fb["summary"]).strip(),
+    }
+
+
+VALIDATORS = {
+    "warmup": validate_warmup,
+    "interview": validate_interview,
+    "feedback": validate_feedback,
+    "scoring": validate_answer_score,
+    "synthesis": validate_synthesis,
+}
+
+
+def _parse(raw, validate):
+    try:
+        return "strict", validate(json.loads(raw))
+    except Exception:
+        pass
+    try:
+        return "local", validate(extract_json_object(raw))
+    except Exception:
+        return None, None
+
+
+def _parse_local(stage, raw, partial):
+    validate = VALIDATORS[stage]
+    if partial:
+        try:
+            return "partial", validate(partial)
+        except ValueError:
+            pass
+    return _parse(raw, validate)
+
+
+def needs_repair(stage: str, raw: str, partial=None) -> bool:
+    """True if parse_stage_json would have to call `repair` for this output."""
+    return _parse_local(stage, raw, partial)[1] is None
+
+
+def parse_stage_json(stage: str, raw: str, repair=None, fallback=None, partial=None):
+    """
+    Turn raw model output into a validated dict for `stage`.
+    Tries the `partial` fields from an early-stopped stream, strict JSON,
+    then local extraction, and only then calls `repair()` (a second LLM
+    call returning new raw text). Returns `fallback` if all of those fail.
+    Every outcome is counted in PARSE_PATHS.
+    """
+    path, data = _parse_local(stage, raw, partial)
+    if data is None and repair is not None:
+        try:
+            _, data = _parse(repair(), VALIDATORS[stage])
+        except Exception:
+            data = None
+        path = "repair" if data is not None else None
+    if data is None:
+        PARSE_PATHS[(stage, "fallback")] += 1
+        return fallback
+    PARSE_PATHS[(stage, path)] += 1
+    return data
+
+
+def parse_stats() -> dict:
+    """{stage: {path: count}} snapshot of PARSE_PATHS."""
+    stats = {}
+    for (stage, path), count in PARSE_PATHS.items():
+        stats.setdefault(stage, {})[path] = count
+    return stats
@@ -0,0 +1,144 @@
+import json
+
+
+class IncrementalJSONParser:
+    """
+    Feed a JSON document chunk by chunk and get back every field whose value
+    is complete, as soon as its closing character arrives.
+
+    Fields are reported as (path, value) where path is a tuple of keys/indexes
+    from the root object, e.g. ("feedback", "scores"). Only fields up to
+    `max_depth` levels deep are reported. Leading junk such as markdown fences
+    is skipped until the first "{".
+    """
+
+    def __init__(self, max_depth=2):
+        self.max_depth = max_depth
+        self.buf = ""
+        self.pos = 0
+        self.stack = []
+        self.in_string = False
+        self.escape = False
+        self.string_start = None
+        self.string_is_key = False
+        self.started = False
+        self.done = False
+        self.fields = {}
+
+    def feed(self, chunk):
+        """Consume a chunk of text; return newly completed (path, value) pairs."""
+        if not chunk or self.done:
+            return []
+        self.buf += chunk
+        completed = []
+        buf = self.buf
+        i = self.pos
+        while i < len(buf) and not self.done:
+            c = buf[i]
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif c == "\\":
+                    self.escape = True
+                elif c == '"':
+                    self.in_string = False
+                    self._end_string(i, completed)
+                i += 1
+                continue
+
+            if not self.started:
+                if c == "{":
+                    self.started = True
+                    self.stack.append(self._frame("{", i, ()))
+                i += 1
+                continue
+
+            top = self.stack[-1]
+            if c in "{[":
+                path = self._child_path(top)
+                top["val_start"] = i
+                self.stack.append(self._frame(c, i, path))
+            elif c in "}]":
+                self._end_scalar(top, i, completed)
+                frame = self.stack.pop()
+                if self.stack:
+                    parent = self.stack[-1]
+                    self._emit(frame["path"], buf[frame["start"]:i + 1], completed)
+                    parent["val_start"] = None
+                    parent["closed_child"] = True
+                else:
+                    self.done = True
+            elif c == '"':
+                self.in_string = True
+                self.string_start = i
+                self.string_is_key = top["kind"] == "{" and top["expect"] == "key"
+                if not self.string_is_key:
+                    top["val_start"] = i
+            elif c == ":":
+                top["expect"] = "value"
+            elif c == ",":
+                self._end_scalar(top, i, completed)
+                top["closed_child"] = False
+                if top["kind"] == "{":
+                    top["expect"] = "key"
+                else:
+                    top["index"] += 1
+            elif not c.isspace():
+                if top["val_start"] is None and not top["closed_child"]:
+                    top["val_start"] = i
+            i += 1
+        self.pos = i
+        return completed
+
+    def get(self, *path, default=None):
+        return self.fields.get(tuple(path), default)
+
+    def _frame(self, kind, start, path):
+        return {
+            "kind": kind,
+            "start": start,
+            "path": path,
+            "key": None,
+            "index": 0,
+            "expect": "key" if kind == "{" else "value",
+            "val_start": None,
+            "closed_child": False,
+        }
+
+    def _child_path(self, frame):
+        if frame["kind"] == "{":
+            return frame["path"] + (frame["key"],)
+        return frame["path"] + (frame["index"],)
+
+    def _end_string(self, i, completed):
+        top = self.stack[-1]
+        text = self.buf[self.string_start:i + 1]
+        if self.string_is_key:
+            try:
+                top["key"] = json.loads(text)
+            except ValueError:
+                top["key"] = text.strip('"')
+            return
+        self._emit(self._child_path(top), text, completed)
+        top["val_start"] = None
+        top["closed_child"] = True
+
+    def _end_scalar(self, frame, i, completed):
+        start = frame["val_start"]
+        if start is None:
+            return
+        text = self.buf[start:i].strip()
+        frame["val_start"] = None
+        if text:
+            self._emit(self._child_path(frame), text, completed)
+            frame["closed_child"] = True
+
+    def _emit(self, path, text, completed):
+        if len(path) > self.max_depth:
+            return
+        try:
+            value = json.loads(text)
+        except ValueError:
+            return
+        self.fields[path] = value
+        completed.append((path, value))
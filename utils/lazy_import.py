@@ -0,0 +1,100 @@
+"""
+Optional dependencies that are imported on first use.
+
+    np = optional_module("numpy")
+    if np:                      # installed? (checked without importing it)
+        np.zeros(3)             # the real import happens here, once
+
+This replaces the `try: import x / except Exception: x = None` pattern
+for heavy packages (groq, numpy, gtts, faster-whisper, soundfile), so a
+cold start only pays for what the first request actually uses. Each
+deferred import is timed into IMPORT_TIMES and the metrics summary
+(span "import.<module>").
+"""
+import importlib
+import importlib.util
+import threading
+import time
+
+from utils import metrics
+
+# Seconds each lazily imported module took, in import order.
+IMPORT_TIMES = {}
+# Guards the registry of LazyModules; each one has its own import lock, so
+# a slow import (e.g. a preload of groq) does not hold up unrelated ones.
+_lock = threading.Lock()
+
+
+class LazyModule:
+    """Stands in for a module until an attribute is used. Falsy when the module is not installed."""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+        self._available = None
+        self._lock = threading.RLock()
+
+    def _load(self):
+        module = self._module
+        if module is None:
+            with self._lock:
+                if self._module is None:
+                    started = time.perf_counter()
+                    self._module = importlib.import_module(self._name)
+                    seconds = time.perf_counter() - started
+                    IMPORT_TIMES[self._name] = seconds
+                    metrics.record(f"import.{self._name}", seconds)
+                module = self._module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __bool__(self):
+        if self._available is None:
+            try:
+                self._available = self._module is not None or importlib.util.find_spec(self._name) is not None
+            except (ImportError, ValueError):
+                self._available = False
+        return self._available
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+    def __repr__(self):
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+_modules = {}
+
+
+def optional_module(name: str) -> LazyModule:
+    """The process-wide LazyModule for `name`."""
+    with _lock:
+        module = _modules.get(name)
+        if module is None:
+            module = _modules[name] = LazyModule(name)
+    return module
+
+
+def preload(*names) -> threading.Thread:
+    """
+    Import the installed ones of `names` on a background thread, so the
+    first page renders without them and the first request usually finds
+    them loaded.
+    """
+    def run():
+        for name in names:
+            module = optional_module(name)
+            if module:
+                try:
+                    module._load()
+                except Exception:
+                    # Reported again, with its traceback, at first real use.
+                    pass
+
+    thread = threading.Thread(target=run, name="preload", daemon=True)
+    thread.start()
+    return thread
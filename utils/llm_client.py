@@ -1,27 +1,112 @@
-import os
-from groq import Groq
-from dotenv import load_dotenv
-from utils.json_prompts import STRICT_JSON_SYSTEM_PROMPT
+import time
 
-load_dotenv()
+from utils.json_prompts import STRICT_JSON_SYSTEM_PROMPT, SYSTEM_PROMPTS
+from utils.groq_client import call_with_retry, translate_error
+from utils.history import estimate_tokens
+from utils import token_usage, metrics
 
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+MODEL = "meta-llama/llama-4-scout-17b-16e-instruct"
 
-def call_agent_llm(user_prompt, temperature=0.2):
+_FULL_SYSTEM_TOKENS = estimate_tokens(STRICT_JSON_SYSTEM_PROMPT)
+# Stages whose trimmed prompt replaced the all-modes one; the others
+# (scoring, synthesis) never sent it, so they save nothing.
+_TRIMMED_STAGES = ("warmup", "interview", "feedback")
+
+
+def _system_prompt(stage):
+    """The trimmed prompt for `stage`, or the all-modes prompt; plus tokens saved."""
+    system = SYSTEM_PROMPTS.get(stage, STRICT_JSON_SYSTEM_PROMPT)
+    saved = _FULL_SYSTEM_TOKENS - estimate_tokens(system) if stage in _TRIMMED_STAGES else 0
+    return system, saved
+
+
+def _messages(user_prompt, system):
+    return [
+        {"role": "system", "content": system},
+        {"role": "user", "content": user_prompt},
+    ]
+
+
+def call_agent_llm(user_prompt, temperature=0.2, json_mode=True, stage=None, priority=None):
     """
     Calls Groq model with STRICT JSON system prompt.
+    stage ("warmup", "interview", "feedback") selects a system prompt that
+    only carries that mode's instructions.
+    json_mode asks the provider to constrain output to a JSON object.
+    priority is the groq_scheduler class; candidate-facing by default.
+    Raises utils.groq_client.GroqError on failure.
     """
-    try:
-        response = client.chat.completions.create(
-            model="meta-llama/llama-4-scout-17b-16e-instruct",
-            messages=[
-                {"role": "system", "content": STRICT_JSON_SYSTEM_PROMPT},
-                {"role": "user", "content": user_prompt},
-            ],
-            temperature=temperature
+    system, saved = _system_prompt(stage)
+    messages = _messages(user_prompt, system)
+    extra = {"response_format": {"type": "json_object"}} if json_mode else {}
+    with metrics.span(f"llm.{stage or 'unstaged'}"):
+        response = call_with_retry(
+            "chat",
+            lambda client: client.chat.completions.create(
+                model=MODEL,
+                messages=messages,
+                temperature=temperature,
+                **extra
+            ),
+            priority=priority,
         )
+    content = response.choices[0].message.content
+    usage = token_usage.usage_from_response(response)
+    if usage:
+        token_usage.record(stage, *usage, system_tokens_saved=saved)
+    else:
+        token_usage.record_estimate(stage, messages, content or "", system_tokens_saved=saved)
+    return content
+
 
-        return response.choices[0].message.content
+def stream_agent_llm(user_prompt, temperature=0.2, stage=None, priority=None):
+    """
+    Same as call_agent_llm, but yields the completion text as it arrives.
+    Groq's JSON mode does not support streaming, so output is checked
+    locally by utils.json_extract instead.
+    Retries only happen before the first token; a stream that breaks
+    midway raises utils.groq_client.GroqError.
+    """
+    system, saved = _system_prompt(stage)
+    messages = _messages(user_prompt, system)
+    span_name = f"llm.stream.{stage or 'unstaged'}"
+    started = time.perf_counter()
+    stream = call_with_retry(
+        "chat",
+        lambda client: client.chat.completions.create(
+            model=MODEL,
+            messages=messages,
+            temperature=temperature,
+            stream=True,
+        ),
+        priority=priority,
+    )
+    parts = []
+    usage = None
+    ok = True
+    try:
+        for chunk in stream:
+            usage = token_usage.usage_from_response(chunk) or usage
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                if not parts:
+                    metrics.record(span_name + ".ttft", time.perf_counter() - started)
+                parts.append(delta)
+                yield delta
 
     except Exception as e:
-        return f"Groq API Error: {str(e)}"
+        ok = False
+        raise translate_error(e) from e
+
+    finally:
+        # Stopping early (e.g. once the decision field is known) drops the
+        # rest of the generation instead of reading it off the wire.
+        if hasattr(stream, "close"):
+            stream.close()
+        metrics.record(span_name, time.perf_counter() - started, ok)
+        if usage:
+            token_usage.record(stage, *usage, system_tokens_saved=saved)
+        else:
+            token_usage.record_estimate(stage, messages, "".join(parts), system_tokens_saved=saved)
@@ -0,0 +1,141 @@
+"""
+Concurrent-session load test of the interview flow against the local
+Groq stand-in (or --base-url).
+
+For each concurrency level, N worker threads each run full interviews
+(utils.bench.run_session) back to back, the way N candidates share one
+Streamlit process. Reports throughput, per-turn tail latency, the
+approximate per-session st.session_state footprint, process RSS, and
+the first level where p95 turn latency collapses.
+
+    python -m utils.loadgen --concurrency 1,4,16,32 --sessions-per-worker 2
+"""
+import argparse
+import json
+import pickle
+import resource
+import threading
+import time
+from pathlib import Path
+
+from utils.bench import add_common_arguments, configure_endpoint, latency_summary, load_answers, load_roles
+
+# A level "collapses" when its p95 turn latency exceeds this multiple of
+# the lowest level's p95.
+COLLAPSE_FACTOR = 2.0
+
+
+def rss_mb() -> float:
+    """Current resident set size, from /proc when available."""
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is the peak, in KB on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def state_bytes(state: dict) -> int:
+    """Approximate footprint of one session's state, as its pickled size."""
+    try:
+        return len(pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 0
+
+
+def run_level(concurrency, sessions_per_worker, role, roles, answers, speak):
+    from utils.bench import run_session
+
+    results, states, errors = [], [], []
+    lock = threading.Lock()
+    peak_rss = [rss_mb()]
+
+    def worker():
+        for _ in range(sessions_per_worker):
+            state = {}
+            try:
+                result = run_session(role, roles, answers, speak=speak, state=state)
+            except Exception as e:
+                with lock:
+                    errors.append(repr(e))
+                continue
+            with lock:
+                results.append(result)
+                states.append(state_bytes(state))
+                peak_rss[0] = max(peak_rss[0], rss_mb())
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, name=f"session-{i}") for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    turns = [t for r in results for t in r["turns"]]
+    interactive = [t["seconds"] for t in turns if t["stage"] != "feedback"]
+    return {
+        "concurrency": concurrency,
+        "sessions": len(results),
+        "errors": len(errors),
+        "error_samples": errors[:3],
+        "seconds": round(elapsed, 2),
+        "sessions_per_min": round(len(results) / elapsed * 60, 2) if elapsed else 0,
+        "turns_per_sec": round(len(turns) / elapsed, 2) if elapsed else 0,
+        "turn_latency": latency_summary(interactive),
+        "feedback_latency": latency_summary([t["seconds"] for t in turns if t["stage"] == "feedback"]),
+        "session_state_kb": {
+            "mean": round(sum(states) / len(states) / 1024, 1),
+            "max": round(max(states) / 1024, 1),
+        } if states else {},
+        "peak_rss_mb": round(peak_rss[0], 1),
+    }
+
+
+def find_collapse(levels):
+    """First concurrency whose p95 turn latency exceeds COLLAPSE_FACTOR x the baseline."""
+    measured = [lv for lv in levels if lv["turn_latency"]]
+    if not measured:
+        return None
+    baseline = measured[0]["turn_latency"]["p95_ms"]
+    for lv in measured[1:]:
+        if lv["turn_latency"]["p95_ms"] > COLLAPSE_FACTOR * baseline:
+            return lv["concurrency"]
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test concurrent interview sessions.")
+    parser.add_argument("--concurrency", default="1,2,4,8,16", help="comma-separated session counts to sweep")
+    parser.add_argument("--sessions-per-worker", type=int, default=2)
+    add_common_arguments(parser)
+    args = parser.parse_args()
+
+    server, fake = configure_endpoint(args)
+    try:
+        roles = load_roles(args.roles_file)
+        answers = load_answers(args.answers)
+        levels = []
+        for n in (int(x) for x in args.concurrency.split(",") if x.strip()):
+            levels.append(run_level(n, args.sessions_per_worker, args.role, roles, answers, not args.no_tts))
+            print(json.dumps(levels[-1]), flush=True)
+        out = {"levels": levels, "collapse_at": find_collapse(levels), "final_rss_mb": round(rss_mb(), 1)}
+        from utils.groq_scheduler import scheduler_stats
+
+        out["scheduler"] = scheduler_stats()
+        if fake is not None:
+            out["groq"] = fake.stats()
+    finally:
+        if server is not None:
+            server.stop()
+
+    text = json.dumps(out, indent=2)
+    print(text)
+    if args.out:
+        Path(args.out).write_text(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# JSONL file receiving one record per span; unset disables it.
+METRICS_LOG = os.getenv("METRICS_LOG")
+# Prometheus textfile-collector target, rewritten at most every
+# METRICS_PROM_INTERVAL seconds; unset disables it.
+METRICS_PROM_FILE = os.getenv("METRICS_PROM_FILE")
+METRICS_PROM_INTERVAL = float(os.getenv("METRICS_PROM_INTERVAL", "10"))
+# Durations kept per span name for percentiles.
+RESERVOIR_SIZE = 1024
+
+_lock = threading.Lock()
+_series = {}
+_gauges = {}
+_last_prom_write = 0.0
+
+
+class _Series:
+    __slots__ = ("samples", "count", "total", "errors")
+
+    def __init__(self):
+        self.samples = deque(maxlen=RESERVOIR_SIZE)
+        self.count = 0
+        self.total = 0.0
+        self.errors = 0
+
+
+def record(name: str, seconds: float, ok=True, **attrs):
+    """Record one timed operation."""
+    global _last_prom_write
+    with _lock:
+        series = _series.get(name)
+        if series is None:
+            series = _series[name] = _Series()
+        series.samples.append(seconds)
+        series.count += 1
+        series.total += seconds
+        series.errors += 0 if ok else 1
+        write_prom = METRICS_PROM_FILE and time.monotonic() - _last_prom_write >= METRICS_PROM_INTERVAL
+        if write_prom:
+            _last_prom_write = time.monotonic()
+
+    if METRICS_LOG:
+        line = {"ts": time.time(), "span": name, "ms": round(seconds * 1000, 3), "ok": ok}
+        line.update(attrs)
+        try:
+            with open(METRICS_LOG, "a", encoding="utf-8") as f:
+                f.write(json.dumps(line, default=str) + "\n")
+        except OSError:
+            pass
+    if write_prom:
+        write_prometheus(METRICS_PROM_FILE)
+
+
+def set_gauge(name: str, value: float):
+    """Set a point-in-time value (queue depth, requests in flight)."""
+    with _lock:
+        _gauges[name] = value
+
+
+def gauges() -> dict:
+    with _lock:
+        return dict(sorted(_gauges.items()))
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """
+    Time a block. The yielded dict can be updated with extra attributes
+    for the JSONL record before the block ends.
+    """
+    start = time.perf_counter()
+    ok = True
+    try:
+        yield attrs
+    except BaseException:
+        ok = False
+        raise
+    finally:
+        record(name, time.perf_counter() - start, ok, **attrs)
+
+
+def timed(name: str):
+    """Decorator form of span()."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def quantile(sorted_samples, q):
+    if not sorted_samples:
+        return 0.0
+    idx = min(len(sorted_samples) - 1, int(round(q * (len(sorted_samples) - 1))))
+    return sorted_samples[idx]
+
+
+def summary() -> dict:
+    """{span: {count, errors, mean, p50, p95}} in seconds, for this process."""
+    with _lock:
+        snapshot = {name: (sorted(s.samples), s.count, s.total, s.errors) for name, s in _series.items()}
+    return {
+        name: {
+            "count": count,
+            "errors": errors,
+            "mean": total / count if count else 0.0,
+            "p50": quantile(samples, 0.5),
+            "p95": quantile(samples, 0.95),
+        }
+        for name, (samples, count, total, errors) in sorted(snapshot.items())
+    }
+
+
+def prometheus_text() -> str:
+    """Prometheus text exposition of every span as a summary metric."""
+    lines = [
+        "# HELP interview_span_seconds Duration of interview pipeline operations.",
+        "# TYPE interview_span_seconds summary",
+    ]
+    errors = []
+    for name, s in summary().items():
+        label = name.replace("\\", "\\\\").replace('"', '\\"')
+        for q in ("0.5", "0.95"):
+            value = s["p50"] if q == "0.5" else s["p95"]
+            lines.append(f'interview_span_seconds{{span="{label}",quantile="{q}"}} {value:.6f}')
+        lines.append(f'interview_span_seconds_sum{{span="{label}"}} {s["mean"] * s["count"]:.6f}')
+        lines.append(f'interview_span_seconds_count{{span="{label}"}} {s["count"]}')
+        errors.append(f'interview_span_errors_total{{span="{label}"}} {s["errors"]}')
+    lines += [
+        "# HELP interview_span_errors_total Operations that raised.",
+        "# TYPE interview_span_errors_total counter",
+    ] + errors
+    lines += [
+        "# HELP interview_gauge Point-in-time values such as Groq queue depth.",
+        "# TYPE interview_gauge gauge",
+    ] + [
+        f'interview_gauge{{name="{name}"}} {value}'
+        for name, value in gauges().items()
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path: str):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(prometheus_text())
+        os.replace(tmp, path)
+    except OSError:
+        pass
@@ -0,0 +1,111 @@
+"""
+Adaptive next-question selection over a role's question bank.
+
+Each bank is embedded once per process as hashed TF-IDF vectors (words
+and word bigrams hashed into HASH_DIM buckets, L2-normalized). The next
+question is the unasked one least similar to what the conversation has
+already covered, nudged towards the chosen difficulty. Without numpy the
+bank is walked in order.
+"""
+import functools
+import re
+import zlib
+
+from utils.lazy_import import optional_module
+
+np = optional_module("numpy")
+
+HASH_DIM = 1024
+REDUNDANCY_WEIGHT = 1.0
+DIFFICULTY_WEIGHT = 0.5
+DIFFICULTY_TARGETS = {"Easy": 0.2, "Medium": 0.5, "Hard": 0.8}
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be but by can did do for from how i in is it me my of on or so that the this to was we what"
+    " when where which who why with you your".split()
+)
+# Cues for how demanding a question is; roles.json carries no difficulty.
+_HARD_CUES = (
+    "design", "scalab", "architect", "trade-off", "optimi", "performance", "secure", "distributed",
+    "strategy", "complex", "root cause", "end-to-end", "system",
+)
+_EASY_CUES = ("tell me about", "introduce", "what do you enjoy", "why do you", "your approach", "what motivates")
+
+
+def _terms(text: str):
+    words = [w for w in _WORD_RE.findall(text.lower()) if w not in _STOPWORDS]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def _bucket(term: str) -> int:
+    return zlib.crc32(term.encode("utf-8")) % HASH_DIM
+
+
+def question_difficulty(question: str) -> float:
+    """0 (easy) .. 1 (hard), from wording cues."""
+    text = question.lower()
+    hard = sum(1 for cue in _HARD_CUES if cue in text)
+    easy = sum(1 for cue in _EASY_CUES if cue in text)
+    return min(1.0, max(0.0, 0.4 + 0.15 * hard - 0.2 * easy))
+
+
+class QuestionIndex:
+    """Hashed TF-IDF matrix for one question bank."""
+
+    def __init__(self, questions):
+        self.questions = list(questions)
+        self.difficulty = np.array([question_difficulty(q) for q in self.questions])
+        df = np.zeros(HASH_DIM)
+        rows = []
+        for q in self.questions:
+            buckets = [_bucket(t) for t in _terms(q)]
+            rows.append(buckets)
+            df[list(set(buckets))] += 1
+        self.idf = np.log((1 + len(self.questions)) / (1 + df)) + 1.0
+        self.matrix = np.stack([self._vector(b) for b in rows]) if rows else np.zeros((0, HASH_DIM))
+
+    def _vector(self, buckets):
+        v = np.zeros(HASH_DIM)
+        np.add.at(v, buckets, 1.0)
+        v *= self.idf
+        norm = np.linalg.norm(v)
+        return v / norm if norm else v
+
+    def embed(self, texts):
+        return np.stack([self._vector([_bucket(t) for t in _terms(text)]) for text in texts])
+
+    def select_next(self, asked, covered=(), difficulty="Medium"):
+        """
+        Index of the next question, or None once every question is asked.
+        `asked` holds indices already used; `covered` holds conversation
+        text (questions and answers) the next question should not repeat.
+        """
+        remaining = [i for i in range(len(self.questions)) if i not in set(asked)]
+        if not remaining:
+            return None
+        redundancy = np.zeros(len(remaining))
+        covered = [t for t in covered if t]
+        if covered:
+            redundancy = (self.matrix[remaining] @ self.embed(covered).T).max(axis=1)
+        target = DIFFICULTY_TARGETS.get(difficulty, 0.5)
+        cost = REDUNDANCY_WEIGHT * redundancy + DIFFICULTY_WEIGHT * np.abs(self.difficulty[remaining] - target)
+        # argmin keeps the first of equal costs, so ties follow bank order.
+        return remaining[int(np.argmin(cost))]
+
+
+@functools.lru_cache(maxsize=256)
+def _cached_index(questions: tuple) -> QuestionIndex:
+    return QuestionIndex(questions)
+
+
+def get_index(questions) -> "QuestionIndex":
+    """The process-wide index for this exact bank (rebuilt if it changes)."""
+    return _cached_index(tuple(questions))
+
+
+def next_question_index(questions, asked, covered=(), difficulty="Medium"):
+    """select_next() on the cached index; the first unasked question without numpy."""
+    if not np:
+        return next((i for i in range(len(questions)) if i not in set(asked)), None)
+    return get_index(questions).select_next(asked, covered, difficulty)
@@ -0,0 +1,343 @@
+"""
+Process-wide registry of interview roles and their question banks.
+
+The source (ROLES_SOURCE, default utils/roles.json) can be:
+  - a single JSON file {role_id: {display_name, base_questions, follow_ups}}
+  - a directory with one <role_id>.json per role (plus an optional
+    index.json {role_id: display_name}); roles are parsed on first use
+  - a SQLite file (.db/.sqlite) with a `roles` table; rows are read on
+    first use
+
+Sources are reloaded when their mtime changes. Shard an existing file:
+
+    python -m utils.role_registry split utils/roles.json roles/
+    python -m utils.role_registry sqlite utils/roles.json roles.db
+"""
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+ROLES_SOURCE = os.getenv("ROLES_SOURCE", "utils/roles.json")
+# Seconds between mtime checks.
+RELOAD_CHECK_INTERVAL = float(os.getenv("ROLES_RELOAD_INTERVAL", "2"))
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+EXPERIENCE_LEVELS = ("Fresher", "1-2 years", "3-5 years", "Senior")
+
+logger = logging.getLogger(__name__)
+
+
+class RoleRegistryError(ValueError):
+    """The role source is missing, unparseable or fails validation."""
+
+
+def validate_role(role_id: str, data) -> dict:
+    if not isinstance(data, dict):
+        raise RoleRegistryError(f"role {role_id!r}: expected an object")
+    name = data.get("display_name")
+    if not isinstance(name, str) or not name.strip():
+        raise RoleRegistryError(f"role {role_id!r}: display_name missing")
+    questions = data.get("base_questions")
+    if not isinstance(questions, list) or not questions or not all(isinstance(q, str) and q.strip() for q in questions):
+        raise RoleRegistryError(f"role {role_id!r}: base_questions must be a non-empty list of strings")
+    follow_ups = data.get("follow_ups", [])
+    if not isinstance(follow_ups, list) or not all(isinstance(q, str) for q in follow_ups):
+        raise RoleRegistryError(f"role {role_id!r}: follow_ups must be a list of strings")
+    return {"display_name": name, "base_questions": list(questions), "follow_ups": list(follow_ups)}
+
+
+class _JSONFileSource:
+    def __init__(self, path: Path):
+        self.path = path
+        self.roles = {}
+
+    def mtime(self):
+        return self.path.stat().st_mtime_ns
+
+    def load(self):
+        try:
+            raw = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            raise RoleRegistryError(f"{self.path}: {e}") from e
+        if not isinstance(raw, dict) or not raw:
+            raise RoleRegistryError(f"{self.path}: expected a non-empty object of roles")
+        self.roles = {role_id: validate_role(role_id, data) for role_id, data in raw.items()}
+
+    def role_ids(self):
+        return list(self.roles)
+
+    def display_name(self, role_id):
+        return self.roles[role_id]["display_name"]
+
+    def get(self, role_id):
+        return self.roles[role_id]
+
+
+def _drop_role(source, role_id, message) -> RoleRegistryError:
+    """
+    Unlist a lazily loaded role that failed validation, the way a bad role
+    in a JSON file is rejected at load; it is tried again after a reload.
+    """
+    source.names.pop(role_id, None)
+    logger.warning("dropping role %r: %s", role_id, message)
+    return RoleRegistryError(message)
+
+
+class _DirectorySource:
+    def __init__(self, path: Path):
+        self.path = path
+        self.names = {}
+        self.roles = {}
+
+    def mtime(self):
+        # Adding/removing a shard changes the directory mtime; editing one
+        # in place changes its own, so take the newest of both.
+        newest = self.path.stat().st_mtime_ns
+        for f in self.path.glob("*.json"):
+            newest = max(newest, f.stat().st_mtime_ns)
+        return newest
+
+    def load(self):
+        if not self.path.is_dir():
+            raise RoleRegistryError(f"{self.path}: not a directory")
+        self.roles = {}
+        index = self.path / "index.json"
+        if index.exists():
+            try:
+                self.names = json.loads(index.read_text(encoding="utf-8"))
+            except ValueError as e:
+                raise RoleRegistryError(f"{index}: {e}") from e
+        else:
+            self.names = {f.stem: None for f in sorted(self.path.glob("*.json"))}
+        if not self.names:
+            raise RoleRegistryError(f"{self.path}: no role files")
+
+    def role_ids(self):
+        return list(self.names)
+
+    def display_name(self, role_id):
+        return self.names.get(role_id) or self.get(role_id)["display_name"]
+
+    def get(self, role_id):
+        role = self.roles.get(role_id)
+        if role is None:
+            if role_id not in self.names:
+                raise KeyError(role_id)
+            shard = self.path / f"{role_id}.json"
+            try:
+                role = validate_role(role_id, json.loads(shard.read_text(encoding="utf-8")))
+            except (OSError, ValueError) as e:
+                raise _drop_role(self, role_id, f"{shard}: {e}") from e
+            self.roles[role_id] = role
+        return role
+
+
+class _SQLiteSource:
+    def __init__(self, path: Path):
+        self.path = path
+        self.names = {}
+        self.roles = {}
+        self.conn = None
+
+    def mtime(self):
+        return self.path.stat().st_mtime_ns
+
+    def load(self):
+        if self.conn is not None:
+            self.conn.close()
+        try:
+            self.conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+            rows = self.conn.execute("SELECT id, display_name FROM roles ORDER BY id").fetchall()
+        except sqlite3.Error as e:
+            raise RoleRegistryError(f"{self.path}: {e}") from e
+        if not rows:
+            raise RoleRegistryError(f"{self.path}: no roles")
+        self.names = dict(rows)
+        self.roles = {}
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def role_ids(self):
+        return list(self.names)
+
+    def display_name(self, role_id):
+        return self.names[role_id]
+
+    def get(self, role_id):
+        role = self.roles.get(role_id)
+        if role is None:
+            row = self.conn.execute(
+                "SELECT display_name, base_questions, follow_ups FROM roles WHERE id = ?", (role_id,)
+            ).fetchone()
+            if row is None:
+                raise KeyError(role_id)
+            try:
+                data = {"display_name": row[0], "base_questions": json.loads(row[1]), "follow_ups": json.loads(row[2] or "[]")}
+                role = validate_role(role_id, data)
+            except (TypeError, ValueError) as e:
+                raise _drop_role(self, role_id, f"{self.path} role {role_id!r}: {e}") from e
+            self.roles[role_id] = role
+        return role
+
+
+class RoleRegistry:
+    """
+    Validated, lazily loaded, mtime-reloaded view of one role source.
+    A reload that fails (a file caught mid-write, a bad edit) keeps the
+    last good roles, records the error in last_error and is retried at the
+    next check; only a source that never loaded raises.
+    """
+
+    def __init__(self, source=ROLES_SOURCE):
+        self.path = Path(source)
+        self._source = self._open()
+        self._lock = threading.RLock()
+        self._mtime = None
+        self._checked = 0.0
+        self.version = 0
+        self.last_error = None
+
+    def _open(self):
+        if self.path.is_dir():
+            return _DirectorySource(self.path)
+        if self.path.suffix in SQLITE_SUFFIXES:
+            return _SQLiteSource(self.path)
+        return _JSONFileSource(self.path)
+
+    def _refresh(self):
+        now = time.monotonic()
+        if self._mtime is not None and now - self._checked < RELOAD_CHECK_INTERVAL:
+            return
+        with self._lock:
+            self._checked = now
+            try:
+                mtime = self._source.mtime()
+            except OSError as e:
+                if self._mtime is None:
+                    raise RoleRegistryError(f"{self.path}: {e}") from e
+                return
+            if mtime == self._mtime:
+                return
+            # Load into a fresh source so a failure leaves the current one intact.
+            source = self._open() if self._mtime is not None else self._source
+            try:
+                source.load()
+            except RoleRegistryError as e:
+                if self._mtime is None:
+                    raise
+                if str(e) != str(self.last_error):
+                    logger.warning("keeping the previous roles, reload failed: %s", e)
+                self.last_error = e
+                return
+            old, self._source = self._source, source
+            if old is not source and hasattr(old, "close"):
+                old.close()
+            self._mtime = mtime
+            self.last_error = None
+            self.version += 1
+
+    def role_ids(self):
+        self._refresh()
+        with self._lock:
+            return self._source.role_ids()
+
+    def display_name(self, role_id):
+        """The role's display name; its id if the role can't be loaded."""
+        self._refresh()
+        with self._lock:
+            try:
+                return self._source.display_name(role_id)
+            except (KeyError, RoleRegistryError):
+                return role_id
+
+    def get(self, role_id):
+        self._refresh()
+        with self._lock:
+            return self._source.get(role_id)
+
+    def __contains__(self, role_id):
+        return role_id in self.role_ids()
+
+    def items(self):
+        for role_id in self.role_ids():
+            yield role_id, self.get(role_id)
+
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+def get_registry(source=ROLES_SOURCE) -> RoleRegistry:
+    """The process-wide registry for `source`."""
+    key = str(source)
+    with _registries_lock:
+        registry = _registries.get(key)
+        if registry is None:
+            registry = _registries[key] = RoleRegistry(source)
+    return registry
+
+
+def _split(src, out_dir):
+    roles = json.loads(Path(src).read_text(encoding="utf-8"))
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    for role_id, data in roles.items():
+        validate_role(role_id, data)
+        (out / f"{role_id}.json").write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+    (out / "index.json").write_text(
+        json.dumps({k: v["display_name"] for k, v in roles.items()}, indent=2, ensure_ascii=False), encoding="utf-8"
+    )
+    return len(roles)
+
+
+def _to_sqlite(src, db_path):
+    roles = json.loads(Path(src).read_text(encoding="utf-8"))
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS roles ("
+            "id TEXT PRIMARY KEY, display_name TEXT NOT NULL, base_questions TEXT NOT NULL, follow_ups TEXT)"
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO roles VALUES (?, ?, ?, ?)",
+            [
+                (role_id, r["display_name"], json.dumps(r["base_questions"]), json.dumps(r["follow_ups"]))
+                for role_id, r in ((k, validate_role(k, v)) for k, v in roles.items())
+            ],
+        )
+    conn.close()
+    return len(roles)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate or shard the role question bank.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    check = sub.add_parser("check", help="validate a role source")
+    check.add_argument("source", nargs="?", default=ROLES_SOURCE)
+    split = sub.add_parser("split", help="write one JSON file per role plus index.json")
+    split.add_argument("src")
+    split.add_argument("out_dir")
+    to_db = sub.add_parser("sqlite", help="write roles into a SQLite store")
+    to_db.add_argument("src")
+    to_db.add_argument("db")
+    args = parser.parse_args()
+
+    if args.cmd == "check":
+        registry = RoleRegistry(args.source)
+        count = sum(1 for _ in registry.items())
+        print(f"{args.source}: {count} roles OK")
+    elif args.cmd == "split":
+        print(f"wrote {_split(args.src, args.out_dir)} roles to {args.out_dir}")
+    else:
+        print(f"wrote {_to_sqlite(args.src, args.db)} roles to {args.db}")
+
+
+if __name__ == "__main__":
+    main()
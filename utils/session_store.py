@@ -0,0 +1,231 @@
+"""
+Durable interview sessions in SQLite.
+
+Snapshots of the interview state (stage, counters, history, feedback)
+are queued in memory and written in batches by a background thread, in
+WAL mode so writes never block readers. A session can be resumed by ID
+after a process restart or a dropped websocket; finished sessions are
+offloaded so the process keeps only a small stub of them.
+"""
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from utils.answer_scoring import AnswerScorer
+from utils.history import InterviewHistory
+from utils.memo import MemoCache, content_hash
+
+SESSION_DB = os.getenv("SESSION_DB", ".cache/sessions.db")
+# Pending snapshots are written at most this many seconds after save().
+SESSION_FLUSH_INTERVAL = float(os.getenv("SESSION_FLUSH_INTERVAL", "1.0"))
+# ... or as soon as this many sessions are waiting.
+SESSION_FLUSH_BATCH = int(os.getenv("SESSION_FLUSH_BATCH", "64"))
+# Sessions whose last written snapshot hash is remembered, to skip
+# rewriting an unchanged one; older ones are simply written again.
+WRITTEN_HASHES = int(os.getenv("SESSION_WRITTEN_HASHES", "10000"))
+# Memo entries kept by an offloaded (finished) session.
+OFFLOADED_MEMO_ENTRIES = 4
+
+PERSISTED_KEYS = (
+    "stage",
+    "role",
+    "experience",
+    "difficulty",
+    "warmup_turn",
+    "warmup_question",
+    "q_index",
+    "asked_questions",
+    "current_question",
+    "followup_count",
+    "feedback_data",
+    "last_turn",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    updated REAL NOT NULL,
+    stage TEXT,
+    finished INTEGER NOT NULL DEFAULT 0,
+    state TEXT NOT NULL
+)
+"""
+
+
+def snapshot_session(state) -> dict:
+    """The persisted part of a session (st.session_state or a plain dict)."""
+    snapshot = {k: state.get(k) for k in PERSISTED_KEYS if k in state}
+    history = state.get("history")
+    snapshot["history"] = list(history.turns) if history is not None else []
+    scorer = state.get("scorer")
+    snapshot["answer_scores"] = scorer.snapshot() if scorer is not None else []
+    return snapshot
+
+
+def restore_session(state, snapshot: dict):
+    """Load a snapshot back into `state`, rebuilding the history view."""
+    history = InterviewHistory()
+    for turn in snapshot.get("history", []):
+        history.append(turn)
+    for k in PERSISTED_KEYS:
+        if k in snapshot:
+            state[k] = snapshot[k]
+    state["history"] = history
+    state["scorer"] = AnswerScorer(snapshot.get("answer_scores", []))
+
+
+def is_finished(snapshot: dict) -> bool:
+    return snapshot.get("stage") == "feedback" and snapshot.get("feedback_data") is not None
+
+
+def offload_session(state):
+    """
+    Drop a finished session's bulky in-memory parts (history, answer
+    scores, memoized audio); they are in SQLite and the TTS disk cache.
+    """
+    state["history"] = InterviewHistory()
+    state["scorer"] = AnswerScorer()
+    state["memo"] = MemoCache(max_entries=OFFLOADED_MEMO_ENTRIES)
+    state["offloaded"] = True
+
+
+class SessionStore:
+    def __init__(self, path=SESSION_DB, flush_interval=SESSION_FLUSH_INTERVAL, flush_batch=SESSION_FLUSH_BATCH):
+        self.path = str(path)
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.flush_interval = flush_interval
+        self.flush_batch = flush_batch
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+        self._db_lock = threading.Lock()
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        # Hash of the last written snapshot per session (LRU), to skip unchanged ones.
+        self._written = OrderedDict()
+        self._wake = threading.Event()
+        self._closed = False
+        self.writes = 0
+        self.flushes = 0
+        self._thread = threading.Thread(target=self._flush_loop, name="session-store", daemon=True)
+        self._thread.start()
+
+    def save(self, session_id: str, snapshot: dict):
+        """Queue a snapshot; only the newest one per session is written."""
+        text = json.dumps(snapshot, ensure_ascii=False, default=str)
+        digest = content_hash(text)
+        with self._pending_lock:
+            if self._written.get(session_id) == digest and session_id not in self._pending:
+                self._written.move_to_end(session_id)
+                return
+            self._pending[session_id] = (time.time(), snapshot.get("stage"), is_finished(snapshot), text)
+            if len(self._pending) >= self.flush_batch:
+                self._wake.set()
+
+    def load(self, session_id: str):
+        """The latest snapshot for `session_id`, or None."""
+        with self._pending_lock:
+            pending = self._pending.get(session_id)
+        if pending is not None:
+            return json.loads(pending[3])
+        with self._db_lock:
+            row = self._conn.execute("SELECT state FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def flush(self):
+        """
+        Write every pending snapshot in one transaction. On sqlite3.Error
+        the batch goes back to pending (behind any newer snapshot of the
+        same session) and the error is raised.
+        """
+        with self._pending_lock:
+            batch, self._pending = self._pending, {}
+        if not batch:
+            return 0
+        rows = [(sid, ts, stage, int(finished), text) for sid, (ts, stage, finished, text) in batch.items()]
+        try:
+            with self._db_lock:
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT INTO sessions (id, updated, stage, finished, state) VALUES (?, ?, ?, ?, ?) "
+                        "ON CONFLICT(id) DO UPDATE SET updated=excluded.updated, stage=excluded.stage, "
+                        "finished=excluded.finished, state=excluded.state",
+                        rows,
+                    )
+        except sqlite3.Error:
+            with self._pending_lock:
+                for sid, entry in batch.items():
+                    self._pending.setdefault(sid, entry)
+            raise
+        with self._pending_lock:
+            for sid, (_, _, finished, text) in batch.items():
+                if finished:
+                    # Finished sessions stop changing; don't track them.
+                    self._written.pop(sid, None)
+                else:
+                    self._written[sid] = content_hash(text)
+                    self._written.move_to_end(sid)
+            while len(self._written) > WRITTEN_HASHES:
+                self._written.popitem(last=False)
+        self.writes += len(rows)
+        self.flushes += 1
+        return len(rows)
+
+    def _flush_loop(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except sqlite3.Error:
+                # The batch stays pending and is retried on the next flush.
+                pass
+
+    def prune(self, older_than_seconds: float) -> int:
+        """Delete sessions untouched for longer than `older_than_seconds`."""
+        self.flush()
+        with self._db_lock:
+            with self._conn:
+                cur = self._conn.execute("DELETE FROM sessions WHERE updated < ?", (time.time() - older_than_seconds,))
+        return cur.rowcount
+
+    def stats(self) -> dict:
+        with self._db_lock:
+            total, finished = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(finished), 0) FROM sessions"
+            ).fetchone()
+        with self._pending_lock:
+            pending = len(self._pending)
+        return {"sessions": total, "finished": finished, "pending": pending, "writes": self.writes, "flushes": self.flushes}
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join(timeout=5)
+        self.flush()
+        with self._db_lock:
+            self._conn.close()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> SessionStore:
+    """The process-wide store at SESSION_DB, flushed on exit."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SessionStore()
+            atexit.register(_store.close)
+    return _store
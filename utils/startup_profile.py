@@ -0,0 +1,144 @@
+"""
+Where cold-start time goes.
+
+    python -m utils.startup_profile                      # frontend.py's imports
+    python -m utils.startup_profile utils.engine api --top 15 --init
+
+Each target is imported in a fresh interpreter under `-X importtime`, and
+the report lists the modules with the largest cumulative and self import
+time. For a script (frontend.py) its top-level imports are collected and
+imported together, without running the page. --init also times, in this
+process, the first construction of the process-wide resources a request
+needs (role registry, session store, TTS cache, STT backend, Groq client,
+warmup pool, engine) and the lazy imports they trigger.
+"""
+import argparse
+import ast
+import os
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+IMPORT_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def script_imports(path) -> list:
+    """Modules imported at the top level of a script."""
+    tree = ast.parse(Path(path).read_text(encoding="utf-8"))
+    names = []
+    for node in tree.body:
+        if isinstance(node, ast.Try):
+            # Optional imports are still imported at startup.
+            body = node.body
+        else:
+            body = [node]
+        for stmt in body:
+            if isinstance(stmt, ast.Import):
+                names += [alias.name for alias in stmt.names]
+            elif isinstance(stmt, ast.ImportFrom) and stmt.module and not stmt.level:
+                names.append(stmt.module)
+    return list(dict.fromkeys(names))
+
+
+def import_profile(target: str):
+    """
+    Import `target` (a module name or a .py script) in a fresh interpreter.
+    Returns (wall seconds, [(module, self seconds, cumulative seconds, depth)]).
+    """
+    if target.endswith(".py"):
+        modules = script_imports(ROOT / target)
+    else:
+        modules = [target]
+    code = "\n".join(
+        f"try:\n    import {name}\nexcept Exception as e:\n    print('skipped {name}:', e)" for name in modules
+    )
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, env=dict(os.environ, PYTHONDONTWRITEBYTECODE="1"),
+    )
+    wall = time.perf_counter() - started
+    for line in proc.stdout.splitlines():
+        print(f"  {line}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, int(self_us) / 1e6, int(cumulative_us) / 1e6, (len(indent) - 1) // 2))
+    return wall, rows
+
+
+def report_imports(target: str, top: int):
+    wall, rows = import_profile(target)
+    total = sum(cumulative for _, _, cumulative, depth in rows if depth == 0)
+    print(f"{target}: {total * 1000:.0f} ms importing {len(rows)} modules ({wall * 1000:.0f} ms with interpreter start)")
+    if not rows:
+        return
+    print(f"  {'cumulative':>10} {'self':>8}  module")
+    for name, self_s, cumulative, _ in sorted(rows, key=lambda r: -r[2])[:top]:
+        print(f"  {cumulative * 1000:8.1f}ms {self_s * 1000:6.1f}ms  {name}")
+    packages = {}
+    for name, self_s, _, _ in rows:
+        packages[name.split(".")[0]] = packages.get(name.split(".")[0], 0.0) + self_s
+    print("  by package (self time): " + ", ".join(
+        f"{name} {seconds * 1000:.0f} ms" for name, seconds in sorted(packages.items(), key=lambda kv: -kv[1])[:top]
+    ))
+
+
+def init_profile() -> list:
+    """Seconds taken by the first construction of each process-wide resource, in order."""
+    sys.path.insert(0, str(ROOT))
+    from utils.lazy_import import IMPORT_TIMES
+
+    steps = []
+
+    def step(name, fn):
+        started = time.perf_counter()
+        before = dict(IMPORT_TIMES)
+        try:
+            fn()
+            error = None
+        except Exception as e:
+            error = e
+        seconds = time.perf_counter() - started
+        lazy = [m for m in IMPORT_TIMES if m not in before]
+        steps.append((name, seconds, lazy, error))
+
+    step("import utils.engine", lambda: __import__("utils.engine"))
+    from utils import engine, groq_client, role_registry, session_store, stt_backends, tts_cache, warmup_pool
+
+    step("role registry", role_registry.get_registry)
+    step("session store", session_store.get_store)
+    step("tts cache", tts_cache.get_tts_cache)
+    step("stt backend", stt_backends.get_backend)
+    if groq_client.is_configured():
+        step("groq client", groq_client.get_client)
+    step("warmup pool", warmup_pool.get_warmup_pool)
+    step("engine", engine.get_engine)
+    return steps
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report import and initialization time at startup.")
+    parser.add_argument("targets", nargs="*", default=["frontend.py"], help="module names or scripts (default frontend.py)")
+    parser.add_argument("--top", type=int, default=10, help="modules to list per target")
+    parser.add_argument("--init", action="store_true", help="also time the first construction of cached resources")
+    args = parser.parse_args()
+
+    for target in args.targets:
+        report_imports(target, args.top)
+    if args.init:
+        print("initialization:")
+        for name, seconds, lazy, error in init_profile():
+            extra = f" (imports {', '.join(lazy)})" if lazy else ""
+            if error is not None:
+                extra += f" failed: {error}"
+            print(f"  {seconds * 1000:8.1f}ms  {name}{extra}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Incremental transcription of an answer while it is being recorded.
+
+Audio arrives as small PCM16 frames (from the browser over the API's
+WebSocket, or from streamlit-webrtc). Frames are downmixed and resampled
+to 16 kHz as they come in, and an energy VAD with the audio_prep
+thresholds closes a segment at the first pause of STREAM_PAUSE_SECONDS
+once it is STREAM_MIN_SEGMENT_SECONDS long, or hard at CHUNK_SECONDS.
+Each closed segment is trimmed, encoded and sent to STT on the shared
+pool while the candidate keeps talking, so when they stop only the last
+few seconds are still being transcribed. Without numpy the frames are
+buffered and transcribed in one go at the end.
+"""
+import io
+import os
+import time
+import wave
+from collections import deque
+
+from utils import metrics
+from utils.audio_prep import (
+    np,
+    preprocess_audio,
+    resample,
+    trim_silence,
+    encode,
+    PrepReport,
+    TARGET_RATE,
+    FRAME_MS,
+    SPEECH_RATIO,
+    ABS_SPEECH_RMS,
+    CHUNK_SECONDS,
+    OVERLAP_SECONDS,
+)
+
+STREAM_PAUSE_SECONDS = float(os.getenv("STREAM_PAUSE_SECONDS", "0.6"))
+STREAM_MIN_SEGMENT_SECONDS = float(os.getenv("STREAM_MIN_SEGMENT_SECONDS", "3"))
+# Frames the running noise floor is estimated over (10 s at FRAME_MS).
+NOISE_WINDOW_FRAMES = 10000 // FRAME_MS
+
+
+def wav_frames(audio_bytes: bytes, frame_seconds=0.1):
+    """Split a PCM16 WAV into (rate, channels, [pcm bytes per frame]), as a client would stream it."""
+    with wave.open(io.BytesIO(audio_bytes), "rb") as wf:
+        rate, channels, width = wf.getframerate(), wf.getnchannels(), wf.getsampwidth()
+        raw = wf.readframes(wf.getnframes())
+    if width != 2:
+        raise wave.Error(f"unsupported sample width {width}")
+    step = max(1, int(rate * frame_seconds)) * channels * 2
+    return rate, channels, [raw[i:i + step] for i in range(0, len(raw), step)]
+
+
+class StreamingTranscriber:
+    """
+    One answer's audio, transcribed segment by segment as it is fed.
+    feed() from a single thread; finish() returns (transcript, PrepReport)
+    and raises TranscriptionError if any segment failed.
+    """
+
+    def __init__(self, sample_rate=48000, channels=1, backend=None):
+        self.rate = int(sample_rate)
+        self.channels = max(1, int(channels))
+        self.backend = backend
+        self.hop = TARGET_RATE * FRAME_MS // 1000
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.seconds_out = 0.0
+        # (future, overlaps_previous) per submitted segment, in order.
+        self.segments = []
+        self._raw = []
+        self._pending = np.zeros(0, dtype=np.float32) if np else None
+        self._segment = []
+        self._segment_len = 0
+        self._voiced = False
+        self._silent_frames = 0
+        self._overlaps = False
+        self._noise = deque(maxlen=NOISE_WINDOW_FRAMES)
+        self._finished = None
+
+    @property
+    def seconds_in(self) -> float:
+        return self.bytes_in / (2 * self.channels * self.rate)
+
+    def feed(self, pcm: bytes):
+        """Add interleaved little-endian PCM16 frames."""
+        if not pcm or self._finished is not None:
+            return
+        self.bytes_in += len(pcm)
+        if not np:
+            self._raw.append(pcm)
+            return
+        samples = np.frombuffer(pcm[: len(pcm) - len(pcm) % (2 * self.channels)], dtype="<i2")
+        samples = samples.astype(np.float32).reshape(-1, self.channels).mean(axis=1) / 32768
+        self._pending = np.concatenate([self._pending, resample(samples, self.rate)])
+        n = len(self._pending) // self.hop
+        if n == 0:
+            return
+        frames = self._pending[: n * self.hop].reshape(n, self.hop)
+        self._pending = self._pending[n * self.hop:]
+        for frame in frames:
+            self._add_frame(frame)
+
+    def _add_frame(self, frame):
+        rms = float(np.sqrt((frame ** 2).mean()))
+        self._noise.append(rms)
+        floor = float(np.percentile(self._noise, 10))
+        speech = rms > max(floor * SPEECH_RATIO, ABS_SPEECH_RMS)
+        self._segment.append(frame)
+        self._segment_len += len(frame)
+        self._voiced = self._voiced or speech
+        self._silent_frames = 0 if speech else self._silent_frames + 1
+
+        seconds = self._segment_len / TARGET_RATE
+        paused = self._silent_frames * FRAME_MS / 1000 >= STREAM_PAUSE_SECONDS
+        if paused and seconds >= STREAM_MIN_SEGMENT_SECONDS:
+            self._close_segment(carry=0)
+        elif seconds >= CHUNK_SECONDS:
+            # Cut inside speech: repeat the tail so no word is lost at the seam.
+            self._close_segment(carry=int(OVERLAP_SECONDS * TARGET_RATE) if speech else 0)
+
+    def _close_segment(self, carry: int):
+        from utils.voice import submit_transcription
+
+        samples = np.concatenate(self._segment) if self._segment else np.zeros(0, dtype=np.float32)
+        if self._voiced and len(samples):
+            trimmed = trim_silence(samples, TARGET_RATE)
+            data, filename, mime = encode(trimmed, TARGET_RATE)
+            self.bytes_out += len(data)
+            self.seconds_out += len(trimmed) / TARGET_RATE
+            submitted = time.perf_counter()
+            future = submit_transcription(data, filename, mime, self.backend)
+            future.add_done_callback(
+                lambda f: metrics.record("stt.stream.segment", time.perf_counter() - submitted, ok=f.exception() is None)
+            )
+            self.segments.append((future, self._overlaps))
+        tail = samples[len(samples) - carry:] if carry and self._voiced else np.zeros(0, dtype=np.float32)
+        self._overlaps = len(tail) > 0
+        self._segment = [tail] if len(tail) else []
+        self._segment_len = len(tail)
+        self._voiced = self._overlaps
+        self._silent_frames = 0
+
+    def ready_text(self) -> str:
+        """Transcript of the leading segments that are already done (for live captions)."""
+        from utils.voice import stitch_transcripts
+
+        parts, overlaps = [], []
+        for future, overlapped in self.segments:
+            if not future.done() or future.exception() is not None:
+                break
+            parts.append(future.result())
+            overlaps.append(overlapped)
+        return stitch_transcripts(parts, overlaps)
+
+    def finish(self):
+        """
+        Flush the last segment and wait for every transcript. Returns
+        (transcript, PrepReport); calling it again returns the same result.
+        """
+        from utils.voice import stitch_transcripts, transcribe_prepared
+
+        if self._finished is not None:
+            return self._finished
+        stopped = time.perf_counter()
+        if not np:
+            prepared = preprocess_audio(self._wav(b"".join(self._raw)), chunk_seconds=CHUNK_SECONDS)
+            transcript = transcribe_prepared(prepared, backend=self.backend)
+            report = prepared.report
+        else:
+            if len(self._pending):
+                self._segment.append(self._pending)
+                self._segment_len += len(self._pending)
+                self._pending = np.zeros(0, dtype=np.float32)
+            self._close_segment(carry=0)
+            transcript = stitch_transcripts([f.result() for f, _ in self.segments], [o for _, o in self.segments])
+            report = PrepReport(self.bytes_in, self.bytes_out, self.seconds_in, self.seconds_out)
+        metrics.record("stt.stream.finish", time.perf_counter() - stopped, segments=len(self.segments))
+        self._finished = (transcript, report)
+        return self._finished
+
+    def _wav(self, pcm: bytes) -> bytes:
+        buf = io.BytesIO()
+        with wave.open(buf, "wb") as wf:
+            wf.setnchannels(self.channels)
+            wf.setsampwidth(2)
+            wf.setframerate(self.rate)
+            wf.writeframes(pcm)
+        return buf.getvalue()
+
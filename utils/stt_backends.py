@@ -0,0 +1,133 @@
+import io
+import os
+import threading
+
+from utils.groq_client import call_with_retry, is_configured, GroqError
+
+from utils.lazy_import import optional_module
+
+# Imports CTranslate2 and friends; only loaded with the local backend.
+faster_whisper = optional_module("faster_whisper")
+
+# groq | local | auto (local when faster-whisper is installed, else groq)
+STT_BACKEND = os.getenv("STT_BACKEND", "groq")
+GROQ_STT_MODEL = os.getenv("GROQ_STT_MODEL", "whisper-large-v3")
+LOCAL_WHISPER_MODEL = os.getenv("LOCAL_WHISPER_MODEL", "small.en")
+LOCAL_WHISPER_COMPUTE = os.getenv("LOCAL_WHISPER_COMPUTE", "int8")
+LOCAL_WHISPER_THREADS = int(os.getenv("LOCAL_WHISPER_THREADS", "0"))
+
+
+class TranscriptionError(Exception):
+    """Speech-to-text failed; the transcript must not be used."""
+
+
+class GroqWhisperBackend:
+    """Hosted Whisper through the shared Groq client."""
+
+    name = "groq"
+
+    def __init__(self, model=GROQ_STT_MODEL):
+        self.model = model
+
+    @staticmethod
+    def available() -> bool:
+        return is_configured()
+
+    def transcribe(self, audio_bytes: bytes, filename="audio.wav", mime="audio/wav") -> str:
+        if not self.available():
+            raise TranscriptionError("Groq client not configured")
+        try:
+            response = call_with_retry(
+                "stt",
+                lambda client: client.audio.transcriptions.create(
+                    file=(filename, audio_bytes, mime),
+                    model=self.model
+                ),
+            )
+        except GroqError as e:
+            raise TranscriptionError(str(e)) from e
+        if isinstance(response, dict) and "text" in response:
+            return response["text"]
+        if hasattr(response, "text"):
+            return response.text
+        return str(response)
+
+
+class LocalWhisperBackend:
+    """
+    CPU Whisper via faster-whisper (CTranslate2, int8 by default).
+    The model is loaded on first use and shared by every session in the
+    process; CTranslate2 releases the GIL, so concurrent calls overlap.
+    """
+
+    name = "local"
+
+    def __init__(self, model=LOCAL_WHISPER_MODEL, compute_type=LOCAL_WHISPER_COMPUTE, cpu_threads=LOCAL_WHISPER_THREADS):
+        self.model_name = model
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self._model = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def available() -> bool:
+        return bool(faster_whisper)
+
+    def load(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    if not faster_whisper:
+                        raise TranscriptionError("faster-whisper is not installed")
+                    try:
+                        self._model = faster_whisper.WhisperModel(
+                            self.model_name,
+                            device="cpu",
+                            compute_type=self.compute_type,
+                            cpu_threads=self.cpu_threads,
+                        )
+                    except Exception as e:
+                        # Download or CTranslate2 failure; the next call tries again.
+                        raise TranscriptionError(f"could not load Whisper model {self.model_name!r}: {e}") from e
+        return self._model
+
+    def transcribe(self, audio_bytes: bytes, filename="audio.wav", mime="audio/wav") -> str:
+        model = self.load()
+        try:
+            segments, _ = model.transcribe(io.BytesIO(audio_bytes), beam_size=1, language="en")
+            return " ".join(seg.text.strip() for seg in segments).strip()
+        except Exception as e:
+            raise TranscriptionError(str(e)) from e
+
+
+BACKENDS = {
+    GroqWhisperBackend.name: GroqWhisperBackend,
+    LocalWhisperBackend.name: LocalWhisperBackend,
+}
+
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+def register_backend(name: str, cls):
+    """Make a backend class selectable through STT_BACKEND / get_backend(name)."""
+    BACKENDS[name] = cls
+
+
+def resolve_backend_name(name=None) -> str:
+    name = name or STT_BACKEND
+    if name == "auto":
+        return LocalWhisperBackend.name if LocalWhisperBackend.available() else GroqWhisperBackend.name
+    if name not in BACKENDS:
+        raise TranscriptionError(f"unknown STT backend {name!r}")
+    return name
+
+
+def get_backend(name=None):
+    """The process-wide instance of the selected backend."""
+    name = resolve_backend_name(name)
+    with _instances_lock:
+        backend = _instances.get(name)
+        if backend is None:
+            backend = _instances[name] = BACKENDS[name]()
+    return backend
@@ -0,0 +1,103 @@
+import contextvars
+import logging
+import threading
+from collections import OrderedDict
+
+from utils.history import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+MAX_TRACKED_SESSIONS = 1000
+
+_current_session = contextvars.ContextVar("token_usage_session", default=None)
+
+
+class TokenLedger:
+    """Prompt/completion token totals, overall and per stage."""
+
+    def __init__(self):
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.system_tokens_saved = 0
+        self.estimated_calls = 0
+        self.by_stage = {}
+
+    def add(self, stage, prompt_tokens, completion_tokens, system_tokens_saved, estimated):
+        self.calls += 1
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        self.system_tokens_saved += system_tokens_saved
+        self.estimated_calls += int(estimated)
+        row = self.by_stage.setdefault(stage, {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0})
+        row["calls"] += 1
+        row["prompt_tokens"] += prompt_tokens
+        row["completion_tokens"] += completion_tokens
+
+    def as_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "system_tokens_saved": self.system_tokens_saved,
+            "estimated_calls": self.estimated_calls,
+            "by_stage": {k: dict(v) for k, v in self.by_stage.items()},
+        }
+
+
+PROCESS_USAGE = TokenLedger()
+_sessions = OrderedDict()
+_lock = threading.Lock()
+
+
+def set_session(session_id):
+    """Attribute LLM calls made from this thread/context to `session_id`."""
+    _current_session.set(session_id)
+
+
+def session_usage(session_id=None) -> TokenLedger:
+    session_id = session_id or _current_session.get()
+    with _lock:
+        ledger = _sessions.get(session_id)
+    return ledger or TokenLedger()
+
+
+def usage_from_response(obj):
+    """(prompt_tokens, completion_tokens) from a response/chunk, or None."""
+    usage = getattr(obj, "usage", None)
+    if usage is None:
+        x_groq = getattr(obj, "x_groq", None)
+        usage = getattr(x_groq, "usage", None)
+    if usage is None:
+        return None
+    return getattr(usage, "prompt_tokens", 0) or 0, getattr(usage, "completion_tokens", 0) or 0
+
+
+def record(stage, prompt_tokens, completion_tokens, system_tokens_saved=0, estimated=False):
+    stage = stage or "unstaged"
+    session_id = _current_session.get()
+    with _lock:
+        PROCESS_USAGE.add(stage, prompt_tokens, completion_tokens, system_tokens_saved, estimated)
+        if session_id is not None:
+            ledger = _sessions.get(session_id)
+            if ledger is None:
+                ledger = _sessions[session_id] = TokenLedger()
+                while len(_sessions) > MAX_TRACKED_SESSIONS:
+                    _sessions.popitem(last=False)
+            _sessions.move_to_end(session_id)
+            ledger.add(stage, prompt_tokens, completion_tokens, system_tokens_saved, estimated)
+    logger.info(
+        "llm tokens stage=%s session=%s prompt=%d completion=%d system_saved=%d%s",
+        stage,
+        session_id,
+        prompt_tokens,
+        completion_tokens,
+        system_tokens_saved,
+        " (estimated)" if estimated else "",
+    )
+
+
+def record_estimate(stage, messages, completion_text, system_tokens_saved=0):
+    """Fallback when the provider did not report usage (e.g. a stream cut short)."""
+    prompt_tokens = sum(estimate_tokens(m["content"]) for m in messages)
+    record(stage, prompt_tokens, estimate_tokens(completion_text), system_tokens_saved, estimated=True)
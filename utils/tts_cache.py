@@ -0,0 +1,158 @@
+import argparse
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", ".cache/tts")
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Audio produced by the gTTS fallback is stored under its own key so it is
+# never served in place of the configured Groq voice.
+GTTS_MODEL = "gtts"
+GTTS_VOICE = "en"
+# Formats an entry can be stored in; a lookup probes these names directly.
+FORMATS = ("wav", "mp3")
+
+
+class TTSCache:
+    """
+    On-disk, size-bounded LRU cache of synthesized speech.
+    Entries are content addressed by sha256(model, voice, text); recency is
+    the file mtime, bumped on every hit.
+    """
+
+    def __init__(self, root=TTS_CACHE_DIR, max_bytes=TTS_CACHE_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size = None
+
+    @staticmethod
+    def key(text: str, model: str, voice: str) -> str:
+        h = hashlib.sha256()
+        for part in (model, voice, text):
+            h.update(part.encode("utf-8"))
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def _find(self, key):
+        for fmt in FORMATS:
+            path = self.root / f"{key}.{fmt}"
+            if path.is_file():
+                return path
+        return None
+
+    def get(self, text: str, model: str, voice: str):
+        """Return (audio_bytes, fmt) or None."""
+        path = self._find(self.key(text, model, voice))
+        if path is None:
+            return None
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+        except OSError:
+            return None
+        return data, path.suffix.lstrip(".")
+
+    def put(self, text: str, model: str, voice: str, audio: bytes, fmt: str):
+        if not audio or fmt not in FORMATS:
+            return
+        key = self.key(text, model, voice)
+        path = self.root / f"{key}.{fmt}"
+        tmp = self.root / f"{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            tmp.write_bytes(audio)
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+            return
+        with self._lock:
+            if self._size is not None:
+                self._size += len(audio)
+            self._evict()
+
+    def _entries(self):
+        entries = []
+        for path in self.root.glob("*.*"):
+            if path.name.endswith(".tmp"):
+                continue
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def _evict(self):
+        if self._size is not None and self._size <= self.max_bytes:
+            return
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+                total -= size
+            except OSError:
+                pass
+        self._size = total
+
+
+_cache = None
+
+
+def get_tts_cache() -> TTSCache:
+    global _cache
+    if _cache is None:
+        _cache = TTSCache()
+    return _cache
+
+
+def question_bank(roles_source=None):
+    """Every static interviewer line in the role registry, deduplicated."""
+    from utils.role_registry import RoleRegistry, ROLES_SOURCE
+
+    texts = []
+    for _, role in RoleRegistry(roles_source or ROLES_SOURCE).items():
+        texts.extend(role["base_questions"])
+        texts.extend(role["follow_ups"])
+    return list(dict.fromkeys(texts))
+
+
+def warm_cache(texts, workers=8):
+    """Synthesize every text not yet cached, in parallel. Returns counts."""
+    from utils.voice import cached_synthesize_speech
+    from utils.groq_scheduler import PRIORITY_BACKGROUND
+
+    counts = {"synthesized": 0, "failed": 0}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(cached_synthesize_speech, text, priority=PRIORITY_BACKGROUND): text for text in texts}
+        for fut in as_completed(futures):
+            try:
+                audio, _ = fut.result()
+            except Exception:
+                audio = None
+            counts["synthesized" if audio else "failed"] += 1
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prerender the roles.json question bank into the TTS cache.")
+    parser.add_argument("--roles", help="role source (JSON file, directory or SQLite); default ROLES_SOURCE")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    texts = question_bank(args.roles)
+    counts = warm_cache(texts, workers=args.workers)
+    print(f"{len(texts)} prompts: {counts['synthesized']} cached, {counts['failed']} failed -> {get_tts_cache().root}")
+
+
+if __name__ == "__main__":
+    main()
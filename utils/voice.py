@@ -1,51 +1,107 @@
+import io
 import os
+import re
+import time
+import wave
 import base64
-import tempfile
-from gtts import gTTS
-from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor
+from utils.tts_cache import get_tts_cache, GTTS_MODEL, GTTS_VOICE
+from utils.groq_client import call_with_retry, is_configured, GroqError
+from utils.stt_backends import get_backend, TranscriptionError
+from utils import metrics
+from utils.lazy_import import optional_module
 
-try:
-    from groq import Groq
-except Exception:
-    Groq = None
+gtts = optional_module("gtts")
 
-load_dotenv()
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 
-client = None
-if Groq and GROQ_API_KEY:
-    try:
-        client = Groq(api_key=GROQ_API_KEY)
-    except:
-        client = None
+def transcribe_audio_bytes(audio_bytes: bytes, filename="audio.wav", mime="audio/wav", backend=None):
+    """
+    Transcribe with the configured STT backend (see utils.stt_backends).
+    Raises TranscriptionError instead of returning an error as text.
+    """
+    stt = get_backend(backend)
+    with metrics.span(f"stt.{stt.name}", bytes=len(audio_bytes)):
+        return stt.transcribe(audio_bytes, filename=filename, mime=mime)
 
 
-def transcribe_audio_bytes(audio_bytes: bytes, model="whisper-large-v3"):
-    if client is None:
-        return "[STT error: Groq client not configured]"
-    try:
-        response = client.audio.transcriptions.create(
-            file=("audio.wav", audio_bytes, "audio/wav"),
-            model=model
-        )
-        if isinstance(response, dict) and "text" in response:
-            return response["text"]
-        if hasattr(response, "text"):
-            return response.text
-        return str(response)
-    except Exception as e:
-        return f"[STT error: {str(e)}]"
-
-
-
-def synthesize_speech_bytes(text: str, model="playai-tts", voice="alloy"):
-    if client:
+STT_CHUNK_WORKERS = int(os.getenv("STT_CHUNK_WORKERS", "4"))
+# Shared by all sessions, so chunk fan-out is bounded per process.
+_stt_pool = ThreadPoolExecutor(max_workers=STT_CHUNK_WORKERS, thread_name_prefix="stt-chunk")
+
+_WORD_RE = re.compile(r"[a-z0-9']+")
+MAX_SEAM_WORDS = 12
+
+
+def _norm_words(text: str):
+    return [_WORD_RE.findall(w.lower()) for w in text.split()]
+
+
+def stitch_transcripts(parts, overlaps):
+    """
+    Join chunk transcripts in order. Where a chunk overlaps the previous
+    one, drop the longest run of its leading words that repeats the
+    previous chunk's trailing words.
+    """
+    words = []
+    for text, overlapped in zip(parts, overlaps):
+        new = text.split()
+        if overlapped and words:
+            prev = [tuple(w) for w in _norm_words(" ".join(words[-MAX_SEAM_WORDS:]))]
+            cur = [tuple(w) for w in _norm_words(" ".join(new[:MAX_SEAM_WORDS]))]
+            for k in range(min(len(prev), len(cur)), 0, -1):
+                if prev[-k:] == cur[:k]:
+                    new = new[k:]
+                    break
+        words.extend(new)
+    return " ".join(words)
+
+
+def submit_transcription(audio_bytes: bytes, filename="audio.wav", mime="audio/wav", backend=None):
+    """transcribe_audio_bytes on the shared chunk pool; returns a Future."""
+    return _stt_pool.submit(transcribe_audio_bytes, audio_bytes, filename, mime, backend)
+
+
+def transcribe_prepared(prepared, backend=None):
+    """
+    Transcribe a utils.audio_prep.PreparedAudio. Long recordings that were
+    split into chunks are transcribed concurrently and stitched in order,
+    so wall time is roughly that of the slowest chunk.
+    """
+    if not prepared.chunks:
+        return transcribe_audio_bytes(prepared.data, filename=prepared.filename, mime=prepared.mime, backend=backend)
+    with metrics.span("stt.chunked", chunks=len(prepared.chunks)):
+        futures = [submit_transcription(chunk.data, chunk.filename, chunk.mime, backend) for chunk in prepared.chunks]
+        parts = [f.result() for f in futures]
+        return stitch_transcripts(parts, [chunk.overlaps_previous for chunk in prepared.chunks])
+
+
+def synthesize_speech_bytes(text: str, model="playai-tts", voice="alloy", priority=None):
+    """
+    Returns (audio_bytes, fmt), trying Groq TTS before gTTS, or (None, None).
+    `priority` is the groq_scheduler class (PRIORITY_SPEECH by default).
+    """
+    audio, fmt = _groq_speech(text, model, voice, priority)
+    if audio:
+        return audio, fmt
+    return _gtts_speech(text)
+
+
+def _groq_speech(text: str, model: str, voice: str, priority=None):
+    if is_configured():
         try:
-            response = client.audio.speech.create(
-                model=model,
-                input=text,
-                voice=voice
-            )
+            with metrics.span("tts.groq", chars=len(text)):
+                response = call_with_retry(
+                    "tts",
+                    lambda client: client.audio.speech.create(
+                        model=model,
+                        input=text,
+                        voice=voice,
+                        response_format="wav"
+                    ),
+                    priority=priority,
+                )
+                if hasattr(response, "read"):
+                    return response.read(), "wav"
 
             if isinstance(response, dict):
                 audio_b64 = response.get("audio")
@@ -54,16 +110,135 @@ def synthesize_speech_bytes(text: str, model="playai-tts", voice="alloy"):
 
             if audio_b64:
                 return base64.b64decode(audio_b64), "wav"
-        except:
+        except GroqError:
             pass
+    return None, None
+
 
+def _gtts_speech(text: str):
     try:
-        tts = gTTS(text, lang="en")
-        tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".mp3")
-        tts.save(tmp.name)
-        with open(tmp.name, "rb") as f:
-            audio_bytes = f.read()
-        os.remove(tmp.name)
-        return audio_bytes, "mp3"
+        with metrics.span("tts.gtts", chars=len(text)):
+            buf = io.BytesIO()
+            gtts.gTTS(text, lang="en").write_to_fp(buf)
+            return buf.getvalue(), "mp3"
     except:
         return None, None
+
+
+def _cached_speech(text: str, model: str, voice: str):
+    cache = get_tts_cache()
+    hit = cache.get(text, model, voice)
+    if hit is None and not is_configured():
+        hit = cache.get(text, GTTS_MODEL, GTTS_VOICE)
+    return hit
+
+
+def _cache_speech(text: str, model: str, voice: str, audio: bytes, fmt: str):
+    if fmt == "mp3":
+        get_tts_cache().put(text, GTTS_MODEL, GTTS_VOICE, audio, fmt)
+    else:
+        get_tts_cache().put(text, model, voice, audio, fmt)
+
+
+def cached_synthesize_speech(text: str, model="playai-tts", voice="alloy", priority=None):
+    """synthesize_speech_bytes behind the on-disk TTS cache."""
+    hit = _cached_speech(text, model, voice)
+    if hit is not None:
+        return hit
+
+    audio, fmt = _groq_speech(text, model, voice, priority)
+    if not audio:
+        # Groq TTS is off or failing: reuse an earlier gTTS rendering.
+        hit = get_tts_cache().get(text, GTTS_MODEL, GTTS_VOICE)
+        if hit is not None:
+            return hit
+        audio, fmt = _gtts_speech(text)
+    if audio:
+        _cache_speech(text, model, voice, audio, fmt)
+    return audio, fmt
+
+
+# Texts longer than TTS_CHUNK_CHARS are synthesized as sentence chunks
+# of at most that size, TTS_CHUNK_WORKERS at a time per process.
+TTS_CHUNK_CHARS = int(os.getenv("TTS_CHUNK_CHARS", "240"))
+TTS_CHUNK_WORKERS = int(os.getenv("TTS_CHUNK_WORKERS", "4"))
+_tts_pool = ThreadPoolExecutor(max_workers=TTS_CHUNK_WORKERS, thread_name_prefix="tts-chunk")
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def split_sentences(text: str, max_chars=TTS_CHUNK_CHARS):
+    """Greedily pack whole sentences into chunks of at most max_chars."""
+    chunks, current = [], ""
+    for sentence in _SENTENCE_RE.split(text.strip()):
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            chunks.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}".strip()
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def concat_audio(parts):
+    """Join (audio, fmt) parts of one format into one clip; (None, None) if they can't be joined."""
+    formats = {fmt for _, fmt in parts}
+    if not parts or len(formats) != 1 or not all(audio for audio, _ in parts):
+        return None, None
+    fmt = formats.pop()
+    if fmt == "mp3":
+        # MP3 is a plain sequence of frames.
+        return b"".join(audio for audio, _ in parts), fmt
+    if fmt != "wav":
+        return None, None
+    out = io.BytesIO()
+    try:
+        params = None
+        frames = []
+        for audio, _ in parts:
+            with wave.open(io.BytesIO(audio)) as r:
+                p = (r.getnchannels(), r.getsampwidth(), r.getframerate())
+                if params is not None and p != params:
+                    return None, None
+                params = p
+                frames.append(r.readframes(r.getnframes()))
+        with wave.open(out, "wb") as w:
+            w.setnchannels(params[0])
+            w.setsampwidth(params[1])
+            w.setframerate(params[2])
+            w.writeframes(b"".join(frames))
+    except (wave.Error, EOFError):
+        return None, None
+    return out.getvalue(), fmt
+
+
+def synthesize_speech_chunks(text: str, model="playai-tts", voice="alloy", priority=None):
+    """
+    Yield (audio, fmt) for `text` in playback order. A cached or short text
+    comes back as one clip; a long one as sentence chunks synthesized in
+    parallel, each yielded as soon as it and the ones before it are ready.
+    The joined clip is cached, so the same text is synthesized only once.
+    """
+    hit = _cached_speech(text, model, voice)
+    chunks = split_sentences(text) if hit is None else []
+    if len(chunks) <= 1:
+        part = hit or cached_synthesize_speech(text, model=model, voice=voice, priority=priority)
+        if part[0]:
+            yield part
+        return
+
+    started = time.perf_counter()
+    futures = [_tts_pool.submit(cached_synthesize_speech, chunk, model, voice, priority) for chunk in chunks]
+    parts = []
+    for i, fut in enumerate(futures):
+        part = fut.result()
+        if i == 0:
+            metrics.record("tts.chunked.first", time.perf_counter() - started, chunks=len(chunks))
+        parts.append(part)
+        if part[0]:
+            yield part
+    metrics.record("tts.chunked", time.perf_counter() - started, chunks=len(chunks))
+    audio, fmt = concat_audio(parts)
+    if audio:
+        _cache_speech(text, model, voice, audio, fmt)
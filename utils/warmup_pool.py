@@ -0,0 +1,194 @@
+"""
+Pregenerated first warmup questions per (role, experience).
+
+WARMUP_PROMPT only depends on the role and experience level, so its
+output is generated ahead of time in the background, validated, and
+kept in memory and under WARMUP_POOL_DIR. A new session pops a question
+instantly; once a pool drops below WARMUP_POOL_LOW_WATERMARK it is
+refilled to WARMUP_POOL_TARGET at background priority.
+
+    python -m utils.warmup_pool            # fill every pool
+"""
+import argparse
+import json
+import os
+import re
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+WARMUP_POOL_DIR = os.getenv("WARMUP_POOL_DIR", ".cache/warmup")
+WARMUP_POOL_TARGET = int(os.getenv("WARMUP_POOL_TARGET", "8"))
+WARMUP_POOL_LOW_WATERMARK = int(os.getenv("WARMUP_POOL_LOW_WATERMARK", "3"))
+WARMUP_POOL_WORKERS = int(os.getenv("WARMUP_POOL_WORKERS", "2"))
+# Sampling temperature for pooled questions, so a pool is not one question repeated.
+WARMUP_POOL_TEMPERATURE = 0.9
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-") or "default"
+
+
+def generate_warmup_question(role: str, experience: str, priority=None):
+    """One validated first warmup question from the LLM, or None."""
+    from utils.llm_client import call_agent_llm
+    from utils.json_extract import parse_stage_json
+    from utils.json_prompts import WARMUP_PROMPT
+
+    raw = call_agent_llm(
+        WARMUP_PROMPT.format(role=role, experience=experience),
+        temperature=WARMUP_POOL_TEMPERATURE,
+        stage="warmup",
+        priority=priority,
+    )
+    parsed = parse_stage_json("warmup", raw, fallback={"question": "", "next": "start_interview"})
+    question = (parsed.get("question") or "").strip()
+    return question if parsed.get("next") == "ask_more" and question else None
+
+
+class WarmupPool:
+    def __init__(self, root=WARMUP_POOL_DIR, target=WARMUP_POOL_TARGET, low_watermark=WARMUP_POOL_LOW_WATERMARK,
+                 workers=WARMUP_POOL_WORKERS, prerender_audio=True):
+        self.root = Path(root)
+        self.target = target
+        self.low_watermark = low_watermark
+        self.prerender_audio = prerender_audio
+        self._pools = {}
+        self._refilling = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="warmup-pool")
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        role, experience = key
+        return self.root / f"{_slug(role)}__{_slug(experience)}.json"
+
+    def _pool(self, key) -> deque:
+        # Caller holds self._lock.
+        pool = self._pools.get(key)
+        if pool is None:
+            questions = []
+            try:
+                questions = json.loads(self._path(key).read_text(encoding="utf-8")).get("questions", [])
+            except (OSError, ValueError, AttributeError):
+                pass
+            pool = self._pools[key] = deque(q for q in questions if isinstance(q, str) and q.strip())
+        return pool
+
+    def _save(self, key):
+        # Caller holds self._lock.
+        path = self._path(key)
+        tmp = path.with_suffix(".tmp")
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            payload = {"role": key[0], "experience": key[1], "questions": list(self._pools[key])}
+            tmp.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+    def pop(self, role: str, experience: str):
+        """A pregenerated question (and a refill if the pool ran low), or None."""
+        key = (role, experience)
+        with self._lock:
+            pool = self._pool(key)
+            question = pool.popleft() if pool else None
+            if question is not None:
+                self._save(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+            low = len(pool) < self.low_watermark
+        if low:
+            self.refill(role, experience)
+        return question
+
+    def size(self, role: str, experience: str) -> int:
+        with self._lock:
+            return len(self._pool((role, experience)))
+
+    def refill(self, role: str, experience: str):
+        """Top the pool up to `target` in the background; returns the Future, or None if one is running."""
+        key = (role, experience)
+        with self._lock:
+            if key in self._refilling:
+                return None
+            self._refilling.add(key)
+        return self._executor.submit(self._refill, key)
+
+    def _refill(self, key):
+        from utils.groq_client import GroqError
+        from utils.groq_scheduler import PRIORITY_BACKGROUND
+
+        role, experience = key
+        try:
+            # Bounded so a model that keeps repeating itself can't loop forever.
+            for _ in range(self.target * 2):
+                with self._lock:
+                    if len(self._pool(key)) >= self.target:
+                        break
+                try:
+                    question = generate_warmup_question(role, experience, priority=PRIORITY_BACKGROUND)
+                except GroqError:
+                    break
+                if not question:
+                    continue
+                with self._lock:
+                    pool = self._pool(key)
+                    if question in pool:
+                        continue
+                    pool.append(question)
+                    self._save(key)
+                if self.prerender_audio:
+                    from utils.voice import cached_synthesize_speech
+
+                    cached_synthesize_speech(question, priority=PRIORITY_BACKGROUND)
+        finally:
+            with self._lock:
+                self._refilling.discard(key)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "pools": {f"{r}/{e}": len(p) for (r, e), p in self._pools.items()},
+            }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_warmup_pool() -> WarmupPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = WarmupPool()
+    return _pool
+
+
+def main():
+    from utils.role_registry import get_registry, EXPERIENCE_LEVELS
+
+    parser = argparse.ArgumentParser(description="Pregenerate first warmup questions for every role and experience level.")
+    parser.add_argument("--role", action="append", help="only this role (repeatable)")
+    parser.add_argument("--no-audio", action="store_true", help="don't prerender the questions into the TTS cache")
+    args = parser.parse_args()
+
+    pool = WarmupPool(prerender_audio=not args.no_audio)
+    futures = [
+        pool.refill(role, experience)
+        for role in (args.role or get_registry().role_ids())
+        for experience in EXPERIENCE_LEVELS
+    ]
+    for fut in futures:
+        if fut is not None:
+            fut.result()
+    print(json.dumps(pool.stats()["pools"], indent=2))
+
+
+if __name__ == "__main__":
+    main()